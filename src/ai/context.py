@@ -0,0 +1,274 @@
+"""Compact, token-budgeted market context for AI prompts."""
+
+import json
+import math
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from ..config.env import get_settings
+from ..indicators.engine import IndicatorEngine, IndicatorParams
+from ..logging import get_logger
+from ..metrics import get_metrics
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Rough size of one token in compact JSON, used to estimate prompt cost
+CHARS_PER_TOKEN = 4
+MIN_POINTS = 8
+# Per-series budgets are rounded down to this many tokens so small changes
+# in the position block do not invalidate cached market summaries
+BUDGET_QUANTUM = 32
+# Smallest per-series budget, enough for a summary without its close path
+MIN_SERIES_TOKENS = 2 * BUDGET_QUANTUM
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Estimated token count of ``payload`` serialized the way prompts are."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, separators=(",", ":"))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def round_sig(value: float, digits: int) -> Union[int, float, None]:
+    """Round to ``digits`` significant figures; NaN and infinities become None.
+
+    Whole results are returned as ``int`` so they serialize without ``.0``.
+    """
+    if value is None or not math.isfinite(value):
+        return None
+    if value == 0:
+        return 0
+    rounded = round(value, digits - 1 - int(math.floor(math.log10(abs(value)))))
+    return int(rounded) if float(rounded).is_integer() else rounded
+
+
+def downsample(close: np.ndarray, points: int) -> Tuple[np.ndarray, int]:
+    """Closes at the end of ``points`` equal buckets ending on the newest candle.
+
+    Returns the sampled closes and the bucket size in candles. Leftover
+    candles that do not fill a bucket are dropped from the oldest end.
+    """
+    if len(close) <= points:
+        return close, 1
+    step = len(close) // points
+    return close[len(close) - 1::-step][:points][::-1], step
+
+
+def base_asset(symbol: str) -> str:
+    """Base currency of a ccxt market symbol, e.g. ``BTC`` for ``BTC/USDT``."""
+    return symbol.split("/")[0].split(":")[0].upper()
+
+
+class ContextBuilder:
+    """Summarize candle series into compact, deterministic prompt context.
+
+    Each series becomes a downsampled close path, an indicator snapshot and
+    a few summary statistics, all computed from closed candles only and
+    rounded to a fixed number of significant figures. The market summary is
+    cached per series, parameters and budget until a newer candle closes;
+    the least recently used summaries are evicted past ``max_entries``.
+    Position deltas come from the portfolio engine and are recomputed on
+    every build, relative to the quantities seen by the same caller's
+    previous build.
+    """
+
+    def __init__(self, indicators: Optional[IndicatorEngine] = None,
+                 max_points: Optional[int] = None, digits: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        """Initialize the builder from settings unless overridden.
+
+        The builder keeps its own indicator engine by default: it feeds
+        closed candles only, and sharing state with callers that include
+        the open candle would force a full rebuild on every call.
+        """
+        self.indicators = indicators or IndicatorEngine()
+        self.max_points = max_points or settings.ai_context_points
+        self.digits = digits or settings.ai_context_digits
+        self.max_entries = max_entries or settings.ai_context_cache_size
+        self._market: "OrderedDict[Tuple, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        self._seen_quantities: Dict[Tuple[Hashable, str], float] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def market(self, key: Hashable, timeframe: str, series: Any, params: IndicatorParams,
+               budget: int) -> Dict[str, Any]:
+        """Market summary of one candle series that fits ``budget`` tokens.
+
+        ``series`` is anything with OHLCV arrays, such as a ``CandleSeries``;
+        its last candle is treated as still open and left out.
+        """
+        closed = len(series.timestamp) - 1
+        if closed < 2:
+            raise ValueError(f"Not enough closed candles for {key}")
+        last_closed = int(series.timestamp[closed - 1])
+
+        cache_key = (key, params.key(), budget)
+        cached = self._market.get(cache_key)
+        if cached is not None and cached[0] == last_closed:
+            self._market.move_to_end(cache_key)
+            self.hits += 1
+            get_metrics().record_cache("ai_context", True)
+            return cached[1]
+        self.misses += 1
+        get_metrics().record_cache("ai_context", False)
+
+        ts = np.array(series.timestamp[:closed], dtype=np.int64)
+        high, low, close, volume = (
+            np.array(getattr(series, name)[:closed], dtype=float)
+            for name in ("high", "low", "close", "volume")
+        )
+        # The engine peeks at the newest candle it is given, here the last closed one
+        values = self.indicators.latest(key, ts, high, low, close, volume, params)
+        summary = self._fit(timeframe, ts, high, low, close, volume, values, budget)
+        self._market[cache_key] = (last_closed, summary)
+        self._market.move_to_end(cache_key)
+        while len(self._market) > self.max_entries:
+            self._market.popitem(last=False)
+        return summary
+
+    def _fit(self, timeframe: str, ts: np.ndarray, high: np.ndarray, low: np.ndarray,
+             close: np.ndarray, volume: np.ndarray, values: Dict[str, float],
+             budget: int) -> Dict[str, Any]:
+        """Shrink the close path until the summary fits ``budget`` tokens."""
+        def r(value):
+            return round_sig(float(value), self.digits)
+
+        summary: Dict[str, Any] = {
+            "tf": timeframe,
+            "t": int(ts[-1]),
+            "px": r(close[-1]),
+            "chg_pct": r((close[-1] / close[0] - 1.0) * 100.0) if close[0] else None,
+            "hi": r(high.max()),
+            "lo": r(low.min()),
+            "vol": r(volume.sum()),
+            "ind": {name: r(value) for name, value in values.items()},
+        }
+
+        points = min(self.max_points, len(close))
+        while True:
+            sampled, step = downsample(close, points)
+            candidate = {**summary, "step": step, "close": [r(c) for c in sampled]}
+            if estimate_tokens(candidate) <= budget:
+                return candidate
+            if points <= MIN_POINTS:
+                break
+            points = max(points // 2, MIN_POINTS)
+        if estimate_tokens(summary) > budget:
+            log.debug(f"Market context over budget ({estimate_tokens(summary)} > {budget} tokens)")
+        return summary
+
+    def positions(self, symbols: List[str], positions: List[Dict[str, Any]],
+                  caller: Hashable = None) -> Dict[str, Any]:
+        """Held quantity, value and change since the previous build per base asset.
+
+        ``positions`` is the ``PortfolioEngine.positions`` table. Assets
+        without a holding are omitted. Each ``caller`` has its own baseline,
+        so one consumer's builds do not reset the deltas another one sees.
+        """
+        totals: Dict[str, List[float]] = {}
+        wanted = {base_asset(s) for s in symbols}
+        for row in positions:
+            asset = row["asset"].upper()
+            if asset in wanted:
+                total = totals.setdefault(asset, [0.0, 0.0])
+                total[0] += row["quantity"]
+                total[1] += row["value_usd"] or 0.0
+
+        result = {}
+        for asset in sorted(totals):
+            quantity, value = totals[asset]
+            previous = self._seen_quantities.get((caller, asset), quantity)
+            self._seen_quantities[(caller, asset)] = quantity
+            result[asset] = {
+                "qty": round_sig(quantity, self.digits),
+                "usd": round_sig(value, self.digits),
+                "d_qty": round_sig(quantity - previous, self.digits),
+            }
+        return result
+
+    def build(self, series: Dict[Tuple[str, str, str], Any], params: IndicatorParams,
+              positions: Optional[List[Dict[str, Any]]] = None,
+              budget: Optional[int] = None, caller: Hashable = None) -> Dict[str, Any]:
+        """Context for many ``(venue, symbol, timeframe)`` series within one token budget.
+
+        Position deltas are measured and reserved first; what remains of the
+        budget is split evenly between the series, each getting at least
+        ``MIN_SERIES_TOKENS``. Series that still do not fit are left out,
+        last first, and listed under ``omitted``.
+        """
+        budget = budget or settings.ai_context_tokens
+        context: Dict[str, Any] = {}
+        if positions is not None:
+            context["pos"] = self.positions([symbol for _, symbol, _ in series], positions, caller)
+
+        remaining = budget - estimate_tokens(context)
+        per_series = max(remaining // max(len(series), 1), 0)
+        per_series = max(per_series - per_series % BUDGET_QUANTUM, MIN_SERIES_TOKENS)
+        markets = context["markets"] = {
+            "/".join(key): self.market(key, key[2], s, params, per_series)
+            for key, s in sorted(series.items())
+        }
+        # The token count itself is part of the context; size it at its widest
+        context["tokens"] = budget
+        omitted: List[str] = []
+        while markets and estimate_tokens(context) > budget:
+            name = next(reversed(markets))
+            del markets[name]
+            omitted.insert(0, name)
+            context["omitted"] = omitted
+        context["tokens"] = estimate_tokens(context)
+        return context
+
+    def clear(self) -> None:
+        """Drop cached market summaries and position baselines."""
+        self._market.clear()
+        self._seen_quantities.clear()
+
+
+async def market_context(keys: List[Tuple[str, str, str]], params: Optional[IndicatorParams] = None,
+                         budget: Optional[int] = None, include_positions: bool = True,
+                         caller: Hashable = None) -> Dict[str, Any]:
+    """Build context for ``(venue, symbol, timeframe)`` keys from the shared candle cache.
+
+    Keys whose candles cannot be fetched are listed under ``errors``.
+    Positions come from the shared portfolio engine as last valued, with
+    deltas since ``caller``'s previous build.
+    """
+    from ..cex.candles import get_candle_store
+    from ..cex.pool import get_exchange_pool
+
+    params = params or IndicatorParams()
+    fetched = await get_candle_store().fetch_many(
+        get_exchange_pool(), keys, limit=max(settings.candle_cache_size, params.warmup + 2)
+    )
+    series, errors = {}, {}
+    for key, result in fetched.items():
+        if isinstance(result, BaseException):
+            errors["/".join(key)] = str(result)
+        elif len(result) < 3:
+            errors["/".join(key)] = "Not enough candles"
+        else:
+            series[key] = result
+    positions = None
+    if include_positions:
+        from ..portfolio.engine import get_portfolio_engine
+        positions = get_portfolio_engine().positions()
+
+    context = get_context_builder().build(series, params, positions, budget, caller)
+    if errors:
+        context["errors"] = errors
+    return context
+
+
+# Global builder instance
+_builder: Optional[ContextBuilder] = None
+
+
+def get_context_builder() -> ContextBuilder:
+    """Get the shared context builder instance."""
+    global _builder
+    if _builder is None:
+        _builder = ContextBuilder()
+    return _builder
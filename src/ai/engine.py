@@ -1,15 +1,28 @@
 """AI decision engine for trading recommendations."""
 
-from typing import Dict, Any, Optional
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, List, Optional, Tuple
 from enum import Enum
+
+import aiohttp
 from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from ..metrics import get_metrics
 
 log = get_logger(__name__)
 settings = get_settings()
 
+# Latency samples kept per provider for hedge timing
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 10
+
 
 class AIProvider(Enum):
     """Available AI providers."""
@@ -18,12 +31,89 @@ class AIProvider(Enum):
     DEEPSEEK = "deepseek"
 
 
+def cache_key(prompt: str, context: Optional[Dict[str, Any]] = None,
+              provider: Optional[str] = None) -> str:
+    """Hash of a whitespace-normalized prompt, its canonical JSON context and,
+    for answers that must come from one provider, that provider's name."""
+    normalized = re.sub(r"\s+", " ", prompt).strip()
+    payload = json.dumps([provider, normalized, context], sort_keys=True, separators=(",", ":"),
+                         default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """LRU cache of AI responses that expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        """Initialize an empty cache."""
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            get_metrics().record_cache("ai_response", False)
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        get_metrics().record_cache("ai_response", True)
+        return entry[1]
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LatencyTracker:
+    """Recent response times of one provider."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """Initialize an empty sample window."""
+        self.samples: deque = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency at quantile ``q``, or None until enough samples exist."""
+        if len(self.samples) < MIN_LATENCY_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
 class AIDecisionEngine:
-    """AI decision engine for trading recommendations."""
+    """AI decision engine for trading recommendations.
+    
+    Responses are cached by prompt and context hash, each provider has its
+    own concurrency limit, and ``query`` can hedge a slow request to a
+    second provider, returning whichever answer arrives first, or fail
+    over to it when the first provider errors.
+    """
     
     def __init__(self):
         """Initialize the AI decision engine."""
         self.providers = {}
+        self.cache = ResponseCache(settings.ai_cache_size, settings.ai_cache_ttl_seconds)
+        self.latency: Dict[AIProvider, LatencyTracker] = {}
+        self._limits: Dict[AIProvider, asyncio.Semaphore] = {}
+        # In-flight requests by provider-scoped cache key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
         self._initialize_providers()
     
     def _initialize_providers(self):
@@ -39,18 +129,202 @@ class AIDecisionEngine:
         if settings.deepseek_api_key:
             self.providers[AIProvider.DEEPSEEK] = settings.deepseek_api_key
             log.info("DeepSeek provider initialized")
+        
+        for provider in self.providers:
+            self.latency[provider] = LatencyTracker()
+            self._limits[provider] = asyncio.Semaphore(settings.ai_provider_concurrency)
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=settings.ai_timeout)
+            )
+        return self._session
+    
+    async def _post(self, url: str, payload: Dict[str, Any],
+                    headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        async with self._get_session().post(url, json=payload, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json()
+    
+    async def _complete(self, provider: AIProvider, prompt: str) -> str:
+        """Send one prompt to a provider's API and return the text answer."""
+        api_key = self.providers[provider]
+        if provider is AIProvider.GEMINI:
+            body = await self._post(
+                f"{settings.gemini_base_url}/models/{settings.gemini_model}:generateContent",
+                {"contents": [{"parts": [{"text": prompt}]}]},
+                {"x-goog-api-key": api_key},
+            )
+            return body["candidates"][0]["content"]["parts"][0]["text"]
+        
+        # OpenAI and DeepSeek share the chat completions API
+        base_url, model = (
+            (settings.openai_base_url, settings.openai_model) if provider is AIProvider.OPENAI
+            else (settings.deepseek_base_url, settings.deepseek_model)
+        )
+        body = await self._post(
+            f"{base_url}/chat/completions",
+            {"model": model, "messages": [{"role": "user", "content": prompt}]},
+            {"Authorization": f"Bearer {api_key}"},
+        )
+        return body["choices"][0]["message"]["content"]
     
-    async def query_provider(self, provider: str, prompt: str) -> str:
-        """Query a specific AI provider."""
+    @staticmethod
+    def _compose(prompt: str, context: Optional[Dict[str, Any]]) -> str:
+        if not context:
+            return prompt
+        return f"{prompt}\n\nContext:\n{json.dumps(context, separators=(',', ':'), default=str)}"
+    
+    async def _timed(self, provider: AIProvider, prompt: str) -> str:
+        async with self._limits[provider]:
+            started = time.monotonic()
+            with get_metrics().track("ai", provider.value):
+                response = await self._complete(provider, prompt)
+            self.latency[provider].record(time.monotonic() - started)
+            return response
+    
+    def _resolve(self, provider: str) -> AIProvider:
+        provider_enum = AIProvider(provider.lower())
+        if provider_enum not in self.providers:
+            raise ValueError(f"Provider {provider} not configured")
+        return provider_enum
+    
+    async def _ask(self, provider: AIProvider, prompt: str,
+                   context: Optional[Dict[str, Any]] = None) -> str:
+        """Query one provider, sharing the request with identical in-flight queries to it."""
+        key = cache_key(prompt, context, provider.value)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._timed(provider, self._compose(prompt, context)))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+    
+    async def query_provider(self, provider: str, prompt: str,
+                             context: Optional[Dict[str, Any]] = None) -> str:
+        """Query a specific AI provider, answering repeated queries from cache."""
         try:
-            provider_enum = AIProvider(provider.lower())
-            if provider_enum not in self.providers:
-                raise ValueError(f"Provider {provider} not configured")
+            provider_enum = self._resolve(provider)
+            key = cache_key(prompt, context, provider_enum.value)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached["response"]
             
-            # Mock response for now - would implement actual API calls
-            response = f"AI analysis from {provider}: Based on the provided context, this appears to be a standard market analysis request."
+            response = await self._ask(provider_enum, prompt, context)
+            self.cache.put(key, {"provider": provider_enum.value, "response": response})
             log.info(f"AI query completed using {provider}")
             return response
         except Exception as e:
             log.error(f"Failed to query AI provider {provider}: {e}")
             raise
+    
+    def hedge_delay(self, provider: AIProvider) -> float:
+        """Seconds to wait for ``provider`` before hedging to another one."""
+        observed = self.latency[provider].percentile(settings.ai_hedge_percentile)
+        return settings.ai_hedge_default_delay if observed is None else observed
+    
+    async def query(self, prompt: str, context: Optional[Dict[str, Any]] = None,
+                    provider: Optional[str] = None, hedge: Optional[bool] = None) -> Dict[str, Any]:
+        """Query the primary provider, hedging to a second one when it is slow.
+        
+        The primary is ``provider`` or the first configured one. If it has not
+        answered within its recent ``ai_hedge_percentile`` latency, the same
+        query goes to the next configured provider and the first successful
+        answer wins. If every request sent so far has failed, the next
+        provider is tried right away. The losing request is left to finish
+        in the background, since identical queries may share it, and its
+        latency is still recorded. Without ``hedge`` only the primary is
+        asked.
+        """
+        if not self.providers:
+            raise ValueError("No AI provider configured")
+        primary = self._resolve(provider) if provider else next(iter(self.providers))
+        hedge = settings.ai_hedge if hedge is None else hedge
+        key = cache_key(prompt, context)
+        
+        # An answer from another provider, e.g. a hedge winner, does not
+        # satisfy a caller that pinned one
+        cached = self.cache.get(key)
+        if cached is not None and (provider is None or cached["provider"] == primary.value):
+            return {**cached, "cached": True, "hedged": False}
+        
+        backups: List[AIProvider] = [p for p in self.providers if p is not primary] if hedge else []
+        tasks: Dict[asyncio.Future, AIProvider] = {}
+        hedged = False
+        
+        def ask(provider: AIProvider) -> asyncio.Future:
+            task = asyncio.ensure_future(self._ask(provider, prompt, context))
+            tasks[task] = provider
+            return task
+        
+        try:
+            errors = []
+            pending = {ask(primary)}
+            while pending:
+                timeout = self.hedge_delay(primary) if backups and not hedged else None
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    self.hedges += 1
+                    log.info(f"{primary.value} slower than its p{settings.ai_hedge_percentile * 100:g}, "
+                             f"hedging to {backups[0].value}")
+                    pending.add(ask(backups.pop(0)))
+                    continue
+                for task in done:
+                    if task.exception() is None:
+                        winner = tasks[task]
+                        self.hedge_wins += hedged and winner is not primary
+                        result = {"provider": winner.value, "response": task.result()}
+                        self.cache.put(key, result)
+                        return {**result, "cached": False, "hedged": hedged}
+                    errors.append(f"{tasks[task].value}: {task.exception()}")
+                if not pending and backups:
+                    # Every request so far failed; do not wait for the hedge delay
+                    self.failovers += 1
+                    log.info(f"{errors[-1]}; failing over to {backups[0].value}")
+                    pending.add(ask(backups.pop(0)))
+            raise Exception(f"All AI providers failed ({'; '.join(errors)})")
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache hit ratio, hedging and failover counts and latency percentiles per provider."""
+        lookups = self.cache.hits + self.cache.misses
+        return {
+            "cache_entries": len(self.cache),
+            "cache_hit_ratio": self.cache.hits / lookups if lookups else None,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "latency_p50": {p.value: t.percentile(0.5) for p, t in self.latency.items()},
+            "latency_p95": {p.value: t.percentile(0.95) for p, t in self.latency.items()},
+        }
+    
+    async def close(self):
+        """Close the HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+# Global engine instance
+_engine: Optional[AIDecisionEngine] = None
+
+
+def get_ai_engine() -> AIDecisionEngine:
+    """Get the shared AI decision engine instance."""
+    global _engine
+    if _engine is None:
+        _engine = AIDecisionEngine()
+    return _engine
+
+
+async def close_ai_engine() -> None:
+    """Close the shared AI engine if it was created."""
+    global _engine
+    if _engine is not None:
+        await _engine.close()
+        _engine = None
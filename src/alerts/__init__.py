@@ -0,0 +1 @@
+# Price alerts package
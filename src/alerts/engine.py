@@ -0,0 +1,255 @@
+"""Price alert engine with per-symbol threshold heaps."""
+
+import asyncio
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+DIRECTIONS = ("above", "below")
+
+AlertSink = Callable[[Dict[str, Any]], None]
+
+
+class SymbolAlerts:
+    """Pending alerts of one symbol, indexed by threshold.
+
+    ``above`` is a min-heap of thresholds that fire once the price reaches
+    them from below; ``below`` is a max-heap (stored negated) of thresholds
+    that fire once the price falls to them. Crossed alerts are always at
+    the top, so a tick costs O(log n) per fired alert and O(1) otherwise.
+    Cancelled alerts stay in the heaps until popped or compacted.
+    """
+
+    __slots__ = ("above", "below", "last_price", "dead")
+
+    def __init__(self):
+        self.above: List[Tuple[float, int]] = []
+        self.below: List[Tuple[float, int]] = []
+        self.last_price: Optional[float] = None
+        self.dead = 0
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below) - self.dead
+
+
+class AlertEngine:
+    """One-shot price alerts for many chats and symbols.
+
+    ``on_price`` fires every alert whose threshold the new price has
+    reached and hands each one to ``notify``. ``start`` polls the client's
+    batched ``get_prices`` for every symbol with pending alerts.
+    """
+
+    def __init__(self, notify: Optional[AlertSink] = None):
+        """Initialize an engine with no alerts."""
+        self.notify = notify
+        self.alerts: Dict[int, Dict[str, Any]] = {}
+        self._symbols: Dict[str, SymbolAlerts] = {}
+        self._next_id = 1
+        self.triggered = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    @property
+    def running(self) -> bool:
+        """Whether background price polling is on."""
+        return self._task is not None
+
+    def add(self, chat_id: Optional[int], symbol: str, threshold: float,
+            direction: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
+        """Register an alert and return it.
+
+        Without ``direction`` the alert fires when the price crosses
+        ``threshold`` from where it was last seen, so the symbol must have
+        been priced before.
+        """
+        book = self._symbols.setdefault(symbol, SymbolAlerts())
+        if direction is None:
+            if book.last_price is None:
+                raise ValueError(f"No price seen for {symbol}; give a direction")
+            direction = "above" if threshold > book.last_price else "below"
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Direction must be one of {DIRECTIONS}")
+
+        alert = {
+            "id": self._next_id,
+            "chat_id": chat_id,
+            "symbol": symbol,
+            "direction": direction,
+            "threshold": float(threshold),
+            "note": note,
+            "created_at": time.time(),
+        }
+        self._next_id += 1
+        self.alerts[alert["id"]] = alert
+        if direction == "above":
+            heapq.heappush(book.above, (alert["threshold"], alert["id"]))
+        else:
+            heapq.heappush(book.below, (-alert["threshold"], alert["id"]))
+        return alert
+
+    def cancel(self, alert_id: int) -> bool:
+        """Cancel a pending alert; returns False if it does not exist."""
+        alert = self.alerts.pop(alert_id, None)
+        if alert is None:
+            return False
+        book = self._symbols[alert["symbol"]]
+        book.dead += 1
+        if book.dead > len(book):
+            self._compact(book)
+        return True
+
+    def _compact(self, book: SymbolAlerts) -> None:
+        """Drop cancelled entries from a symbol's heaps."""
+        book.above = [entry for entry in book.above if entry[1] in self.alerts]
+        book.below = [entry for entry in book.below if entry[1] in self.alerts]
+        heapq.heapify(book.above)
+        heapq.heapify(book.below)
+        book.dead = 0
+
+    def _pop_crossed(self, book: SymbolAlerts, heap: List[Tuple[float, int]],
+                     crossed: Callable[[float], bool], fired: List[Dict[str, Any]]) -> None:
+        while heap and crossed(heap[0][0]):
+            _, alert_id = heapq.heappop(heap)
+            alert = self.alerts.pop(alert_id, None)
+            if alert is None:
+                book.dead -= 1
+            else:
+                fired.append(alert)
+
+    def on_price(self, symbol: str, price: float) -> List[Dict[str, Any]]:
+        """Record a price and fire the alerts it crosses, lowest threshold first."""
+        book = self._symbols.get(symbol)
+        if book is None:
+            book = self._symbols[symbol] = SymbolAlerts()
+        book.last_price = price
+
+        fired: List[Dict[str, Any]] = []
+        self._pop_crossed(book, book.above, lambda t: t <= price, fired)
+        self._pop_crossed(book, book.below, lambda t: -t >= price, fired)
+        if not fired:
+            return fired
+
+        fired.sort(key=lambda a: a["threshold"])
+        now = time.time()
+        for alert in fired:
+            alert["price"] = price
+            alert["triggered_at"] = now
+            if self.notify is not None:
+                try:
+                    self.notify(alert)
+                except Exception as e:
+                    log.error(f"Failed to deliver alert {alert['id']}: {e}")
+        self.triggered += len(fired)
+        return fired
+
+    def on_prices(self, prices: Dict[str, float]) -> List[Dict[str, Any]]:
+        """Apply several prices at once and return every fired alert."""
+        fired: List[Dict[str, Any]] = []
+        for symbol, price in prices.items():
+            fired.extend(self.on_price(symbol, price))
+        return fired
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one pending alert."""
+        return [symbol for symbol, book in self._symbols.items() if len(book)]
+
+    def list(self, chat_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Pending alerts, optionally for one chat, oldest first."""
+        return [a for a in self.alerts.values() if chat_id is None or a["chat_id"] == chat_id]
+
+    def last_price(self, symbol: str) -> Optional[float]:
+        """Last price seen for a symbol."""
+        book = self._symbols.get(symbol)
+        return book.last_price if book else None
+
+    async def poll_once(self, client) -> int:
+        """Price every symbol with pending alerts once; returns the number fired.
+
+        Symbols that cannot be priced are skipped until the next poll, so
+        they hold back no other symbol's alerts.
+        """
+        symbols = self.symbols()
+        if not symbols:
+            return 0
+        prices = await client.get_prices(symbols)
+        return len(self.on_prices({s: p["price"] for s, p in prices.items() if p.get("price")}))
+
+    async def start(self, client, interval: Optional[float] = None) -> None:
+        """Poll prices for pending alerts in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(client, interval or settings.alert_poll_seconds))
+            log.info("Price alert engine started")
+
+    async def stop(self) -> None:
+        """Stop polling."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, client, interval: float) -> None:
+        while True:
+            try:
+                await self.poll_once(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Failed to poll alert prices: {e}")
+            await asyncio.sleep(interval)
+
+
+def format_alert(alert: Dict[str, Any]) -> str:
+    """One-line notification text for a fired alert."""
+    text = (f"Alert: {alert['symbol']} {alert['direction']} {alert['threshold']:g} "
+            f"(now {alert['price']:g})")
+    return f"{text} - {alert['note']}" if alert.get("note") else text
+
+
+async def add_alert(chat_id: Optional[int], symbol: str, threshold: float,
+                    direction: Optional[str] = None, note: Optional[str] = None) -> Dict[str, Any]:
+    """Add an alert to the shared engine, pricing the symbol first when the direction is implied.
+
+    Symbols the exchange does not list are refused, whatever the
+    direction. Price polling starts with the first alert unless the server
+    started it at startup.
+    """
+    from ..cex.pool import get_exchange_pool
+    engine = get_alert_engine()
+    client = await get_exchange_pool().get()
+    if not client.exchange.markets:
+        await client.load_markets()
+    if symbol not in client.exchange.markets:
+        raise ValueError(f"{symbol} is not listed on {client.venue}")
+    if direction is None and engine.last_price(symbol) is None:
+        engine.on_price(symbol, (await client.get_price(symbol))["price"])
+    alert = engine.add(chat_id, symbol, threshold, direction, note)
+    if not engine.running:
+        await engine.start(client)
+    return alert
+
+
+# Global engine instance
+_engine: Optional[AlertEngine] = None
+
+
+def get_alert_engine() -> AlertEngine:
+    """Get the shared alert engine instance."""
+    global _engine
+    if _engine is None:
+        _engine = AlertEngine()
+    return _engine
+
+
+async def stop_alert_engine() -> None:
+    """Stop the shared alert engine's polling if it was started."""
+    if _engine is not None:
+        await _engine.stop()
@@ -0,0 +1,219 @@
+"""Vectorized backtesting over stored OHLCV candles."""
+
+import asyncio
+import itertools
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ..config.env import get_settings
+from ..indicators.engine import bollinger, rsi, sma
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+MS_PER_YEAR = 365 * 24 * 60 * 60 * 1000
+
+# Sweeps smaller than this run in a thread; process start-up would cost more than it saves
+MIN_PARALLEL_RUNS = 64
+
+# Metrics results can be ranked by, and the ones where lower is better
+SORT_KEYS = ("sharpe", "total_return", "max_drawdown", "trades", "fees_paid", "exposure")
+ASCENDING_SORT_KEYS = ("max_drawdown", "fees_paid")
+
+
+# Strategies map candle columns and parameters to a target position per
+# candle (1 long, 0 flat, -1 short), decided on that candle's close.
+
+def sma_cross(columns: Dict[str, np.ndarray], fast: int = 10, slow: int = 30,
+              allow_short: bool = False) -> np.ndarray:
+    """Long while the fast SMA is above the slow SMA."""
+    if fast >= slow:
+        raise ValueError("fast period must be shorter than slow period")
+    close = columns["close"]
+    diff = sma(close, int(fast)) - sma(close, int(slow))
+    position = np.where(diff > 0, 1.0, -1.0 if allow_short else 0.0)
+    return np.where(np.isnan(diff), 0.0, position)
+
+
+def rsi_reversion(columns: Dict[str, np.ndarray], period: int = 14, lower: float = 30,
+                  upper: float = 70) -> np.ndarray:
+    """Enter long when RSI drops below ``lower``, exit when it rises above ``upper``."""
+    values = rsi(columns["close"], int(period))
+    # Forward-fill entry/exit events into a held position
+    events = np.where(values < lower, 1.0, np.where(values > upper, 0.0, np.nan))
+    index = np.where(np.isnan(events), 0, np.arange(len(events)))
+    np.maximum.accumulate(index, out=index)
+    held = events[index]
+    return np.where(np.isnan(held), 0.0, held)
+
+
+def bollinger_breakout(columns: Dict[str, np.ndarray], period: int = 20,
+                       width: float = 2.0) -> np.ndarray:
+    """Long from a close above the upper band until a close below the middle band."""
+    upper, middle, _ = bollinger(columns["close"], int(period), width)
+    close = columns["close"]
+    events = np.where(close > upper, 1.0, np.where(close < middle, 0.0, np.nan))
+    index = np.where(np.isnan(events), 0, np.arange(len(events)))
+    np.maximum.accumulate(index, out=index)
+    held = events[index]
+    return np.where(np.isnan(held), 0.0, held)
+
+
+STRATEGIES: Dict[str, Callable[..., np.ndarray]] = {
+    "sma_cross": sma_cross,
+    "rsi_reversion": rsi_reversion,
+    "bollinger_breakout": bollinger_breakout,
+}
+
+
+def simulate(columns: Dict[str, np.ndarray], position: np.ndarray, fee_rate: float,
+             slippage_bps: float, periods_per_year: float) -> Dict[str, float]:
+    """Simulate a position series and summarize its performance.
+
+    A position decided on candle ``t`` earns the close-to-close return of
+    candle ``t + 1``. Every change in position pays the fee plus slippage
+    on the traded notional.
+    """
+    close = columns["close"]
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1.0
+
+    held = np.zeros(len(close))
+    held[1:] = position[:-1]
+    turnover = np.abs(np.diff(position, prepend=0.0))
+    cost = turnover * (fee_rate + slippage_bps / 10_000)
+    strategy = held * returns - cost
+
+    equity = np.cumprod(1.0 + strategy)
+    drawdown = 1.0 - equity / np.maximum.accumulate(equity)
+    std = strategy.std()
+    sharpe = strategy.mean() / std * math.sqrt(periods_per_year) if std > 0 else 0.0
+    exposure = float(np.mean(held != 0)) if len(held) else 0.0
+
+    return {
+        "total_return": float(equity[-1] - 1.0) if len(equity) else 0.0,
+        "max_drawdown": float(drawdown.max()) if len(drawdown) else 0.0,
+        "sharpe": float(sharpe),
+        "trades": int(np.count_nonzero(turnover)),
+        "fees_paid": float(cost.sum()),
+        "exposure": exposure,
+    }
+
+
+def run_backtest(columns: Dict[str, np.ndarray], strategy: str, params: Dict[str, Any],
+                 fee_rate: float, slippage_bps: float,
+                 periods_per_year: float) -> Dict[str, Any]:
+    """Run one strategy/parameter set over the candles."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy}")
+    position = STRATEGIES[strategy](columns, **params)
+    result = simulate(columns, position, fee_rate, slippage_bps, periods_per_year)
+    result["params"] = params
+    return result
+
+
+def _run_chunk(columns: Dict[str, np.ndarray], strategy: str, param_sets: List[Dict[str, Any]],
+               fee_rate: float, slippage_bps: float,
+               periods_per_year: float) -> List[Dict[str, Any]]:
+    """Worker entry point: run a chunk of parameter sets against one copy of the data."""
+    results = []
+    for params in param_sets:
+        try:
+            results.append(run_backtest(columns, strategy, params, fee_rate, slippage_bps,
+                                        periods_per_year))
+        except Exception as e:
+            results.append({"params": params, "error": str(e)})
+    return results
+
+
+def expand_grid(grid: Dict[str, List[Any]], max_runs: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Expand ``{"fast": [5, 10], "slow": [20]}`` into every parameter combination.
+
+    Raises ``ValueError`` if there would be more than ``max_runs``
+    combinations, ``backtest_max_runs`` by default.
+    """
+    max_runs = max_runs or settings.backtest_max_runs
+    runs = math.prod(len(values) for values in grid.values())
+    if runs > max_runs:
+        raise ValueError(f"Grid expands to {runs} parameter sets, more than the maximum of {max_runs}")
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def periods_per_year(timestamp: np.ndarray) -> float:
+    """Annualization factor from the median candle spacing."""
+    if len(timestamp) < 2:
+        return 1.0
+    step = float(np.median(np.diff(timestamp)))
+    return MS_PER_YEAR / step if step > 0 else 1.0
+
+
+# Global worker pool
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_count() -> int:
+    return settings.backtest_workers or os.cpu_count() or 1
+
+
+def get_backtest_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool used for parameter sweeps."""
+    global _executor
+    if _executor is None:
+        workers = _worker_count()
+        # Spawn rather than fork: the server process runs an event loop and threads
+        _executor = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_backtest_executor() -> None:
+    """Stop the sweep worker pool if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def sweep(columns: Dict[str, np.ndarray], strategy: str, param_sets: List[Dict[str, Any]],
+                fee_rate: Optional[float] = None, slippage_bps: Optional[float] = None,
+                sort_by: str = "sharpe") -> List[Dict[str, Any]]:
+    """Score many parameter sets, in parallel worker processes for large sweeps.
+
+    Parameter sets are split into one chunk per worker so the candle arrays
+    are sent to each process once; small sweeps run in a thread instead.
+    Results are sorted best first by ``sort_by``, one of ``SORT_KEYS``;
+    failed sets are kept at the end with their error.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy}")
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort_by {sort_by}, expected one of {', '.join(SORT_KEYS)}")
+    fee_rate = settings.backtest_fee_rate if fee_rate is None else fee_rate
+    slippage_bps = settings.backtest_slippage_bps if slippage_bps is None else slippage_bps
+    annualization = periods_per_year(columns["timestamp"])
+    args = (fee_rate, slippage_bps, annualization)
+
+    if len(param_sets) < MIN_PARALLEL_RUNS:
+        results = await asyncio.to_thread(_run_chunk, columns, strategy, param_sets, *args)
+    else:
+        executor = get_backtest_executor()
+        chunks = np.array_split(np.arange(len(param_sets)), _worker_count())
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(executor, _run_chunk, columns, strategy,
+                                 [param_sets[i] for i in chunk], *args)
+            for chunk in chunks if len(chunk)
+        ]
+        results = [r for chunk in await asyncio.gather(*futures) for r in chunk]
+
+    scored = [r for r in results if "error" not in r]
+    failed = [r for r in results if "error" in r]
+    scored.sort(key=lambda r: r[sort_by], reverse=sort_by not in ASCENDING_SORT_KEYS)
+    return scored + failed
@@ -0,0 +1,218 @@
+"""Incremental OHLCV cache backing the candles:// resource."""
+
+import asyncio
+import time
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from ..metrics import get_metrics
+from .ccxt_client import CCXTClient
+from .pool import ExchangePool
+
+log = get_logger(__name__)
+settings = get_settings()
+
+SeriesKey = Tuple[str, str, str]
+
+OHLCV_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+class CandleSeries:
+    """Columnar OHLCV series for one (venue, symbol, timeframe).
+
+    Candles are stored in parallel typed arrays ordered by timestamp. Only
+    the last candle may still be open; merging a fetched page appends newer
+    candles and overwrites the open one in place. The series never holds
+    more than ``capacity`` candles, dropping the oldest first. ``depth`` is
+    how many candles the last full fetch asked for.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize an empty series."""
+        self.capacity = capacity
+        self.timestamp = array("q")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+        self.volume = array("d")
+        self.depth = 0
+        self.updated_at = 0.0
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest candle, if any."""
+        return self.timestamp[-1] if self.timestamp else None
+
+    def _columns(self) -> Tuple[array, ...]:
+        return (self.timestamp, self.open, self.high, self.low, self.close, self.volume)
+
+    def merge(self, rows: List[List[float]]) -> int:
+        """Merge OHLCV rows into the series and return how many were new."""
+        added = 0
+        columns = self._columns()
+        for row in sorted(rows, key=lambda r: r[0]):
+            ts = int(row[0])
+            last = self.last_timestamp
+            if last is not None and ts < last:
+                continue
+            values = (ts, *(float(v or 0.0) for v in row[1:6]))
+            if last is not None and ts == last:
+                for column, value in zip(columns, values):
+                    column[-1] = value
+            else:
+                for column, value in zip(columns, values):
+                    column.append(value)
+                added += 1
+
+        overflow = len(self.timestamp) - self.capacity
+        if overflow > 0:
+            for column in columns:
+                del column[:overflow]
+        return added
+
+    def clear(self) -> None:
+        """Drop every stored candle."""
+        for column in self._columns():
+            del column[:]
+        self.depth = 0
+
+    def rows(self, limit: Optional[int] = None) -> List[List[float]]:
+        """Return the newest candles as ccxt-style OHLCV rows."""
+        start = max(len(self) - limit, 0) if limit else 0
+        return [list(row) for row in zip(*(c[start:] for c in self._columns()))]
+
+    def to_dicts(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the newest candles in the candles:// resource format."""
+        return [dict(zip(OHLCV_FIELDS, row)) for row in self.rows(limit)]
+
+
+class CandleStore:
+    """LRU cache of candle series with incremental refresh.
+
+    The first read of a series fetches a full window. Later reads only ask
+    the exchange for candles at or after the last stored timestamp, which
+    refreshes the still-open bar and appends any newly closed ones. A read
+    asking for more candles than the series was fetched with refetches a
+    full window of the new depth, up to ``capacity``. Reads
+    within ``refresh_seconds`` of the previous refresh are served from
+    memory, and concurrent reads of the same series share one fetch.
+    """
+
+    def __init__(self, capacity: Optional[int] = None, max_series: Optional[int] = None,
+                 refresh_seconds: Optional[float] = None):
+        """Initialize the store from settings unless overridden."""
+        self.capacity = capacity or settings.candle_cache_size
+        self.max_series = max_series or settings.candle_cache_series
+        self.refresh_seconds = (
+            settings.candle_refresh_seconds if refresh_seconds is None else refresh_seconds
+        )
+        self._series: "OrderedDict[SeriesKey, CandleSeries]" = OrderedDict()
+        self._venue_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def _series_for(self, key: SeriesKey) -> CandleSeries:
+        """Return the series for a key, marking it most recently used."""
+        series = self._series.get(key)
+        if series is None:
+            series = CandleSeries(self.capacity)
+            self._series[key] = series
+            while len(self._series) > self.max_series:
+                evicted, _ = self._series.popitem(last=False)
+                log.debug(f"Evicted candle series {evicted}")
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    async def get(self, client: CCXTClient, venue: str, symbol: str, timeframe: str,
+                  limit: int = 100) -> CandleSeries:
+        """Return an up-to-date series at least ``limit`` candles deep, fetching only what changed."""
+        series = self._series_for((venue.lower(), symbol, timeframe))
+        depth = min(limit, self.capacity)
+        async with series.lock:
+            if time.monotonic() - series.updated_at < self.refresh_seconds and len(series) \
+                    and depth <= series.depth:
+                get_metrics().record_cache("candles", True)
+                return series
+            get_metrics().record_cache("candles", False)
+
+            since = series.last_timestamp
+            if since is not None and (depth > series.depth or self._is_stale(client, series, timeframe)):
+                series.clear()
+                since = None
+
+            if since is None:
+                rows = await client.get_ohlcv(symbol, timeframe, limit=depth)
+                series.depth = depth
+            else:
+                rows = await client.get_ohlcv(symbol, timeframe, since=since)
+            series.merge(rows)
+            series.updated_at = time.monotonic()
+        return series
+
+    async def get_many(self, pool: ExchangePool, keys: List[SeriesKey],
+                       limit: int = 100) -> Dict[str, Any]:
+        """Fetch many series concurrently under a per-venue concurrency limit.
+
+        Keys that fail are reported in ``errors`` while the rest are still
+        returned, so one bad symbol or venue does not sink the whole batch.
+        """
+        results = await self.fetch_many(pool, keys, limit=limit)
+
+        candles: Dict[str, List[Dict[str, Any]]] = {}
+        errors: Dict[str, str] = {}
+        for key, result in results.items():
+            name = "/".join(key)
+            if isinstance(result, BaseException):
+                errors[name] = str(result)
+            else:
+                candles[name] = result.to_dicts(limit=limit)
+        return {"candles": candles, "errors": errors}
+
+    async def fetch_many(self, pool: ExchangePool, keys: List[SeriesKey],
+                         limit: int = 100) -> Dict[SeriesKey, Any]:
+        """Refresh many series concurrently; failed keys map to their exception."""
+        results = await asyncio.gather(
+            *(self._get_limited(pool, key, limit) for key in keys),
+            return_exceptions=True,
+        )
+        for key, result in zip(keys, results):
+            if isinstance(result, BaseException):
+                log.error(f"Failed to get OHLCV data for {'/'.join(key)}: {result}")
+        return dict(zip(keys, results))
+
+    async def _get_limited(self, pool: ExchangePool, key: SeriesKey, limit: int) -> CandleSeries:
+        venue, symbol, timeframe = key
+        client = await pool.get(venue)
+        semaphore = self._venue_limits.setdefault(
+            client.venue, asyncio.Semaphore(settings.venue_max_concurrency)
+        )
+        async with semaphore:
+            return await self.get(client, venue, symbol, timeframe, limit=limit)
+
+    def _is_stale(self, client: CCXTClient, series: CandleSeries, timeframe: str) -> bool:
+        """Whether the gap since the last candle is too wide for one page."""
+        timeframe_ms = client.exchange.parse_timeframe(timeframe) * 1000
+        gap = time.time() * 1000 - series.last_timestamp
+        return gap > timeframe_ms * self.capacity
+
+
+# Global store instance
+_store: Optional[CandleStore] = None
+
+
+def get_candle_store() -> CandleStore:
+    """Get the global candle store instance."""
+    global _store
+    if _store is None:
+        _store = CandleStore()
+    return _store
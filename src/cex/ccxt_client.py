@@ -1,113 +1,475 @@
 """CCXT client for centralized exchange trading."""
 
 import asyncio
-from typing import Dict, Any, List, Optional
+import time
+from typing import Awaitable, Dict, Any, List, Optional, Tuple
 import ccxt.async_support as ccxt
 from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from ..metrics import get_metrics
+from .scheduler import BALANCE, MARKET_DATA, ORDER, USED_WEIGHT_HEADER, binance_weight, get_scheduler
 
 log = get_logger(__name__)
 settings = get_settings()
 
+# ccxt order states after which no more fills arrive
+FINISHED_ORDER_STATUSES = ("closed", "canceled", "expired", "rejected")
+
+
+def resolve_venue(venue: str) -> str:
+    """Normalize a venue name and check it is a configured ccxt exchange."""
+    venue_id = venue.lower()
+    if venue_id not in settings.cex_venues:
+        raise ValueError(f"Venue {venue} not configured")
+    if venue_id not in ccxt.exchanges:
+        raise ValueError(f"Venue {venue} is not supported by ccxt")
+    return venue_id
+
+
+def default_credentials(venue: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return the configured API key and secret for a venue, if any."""
+    if venue == "binance":
+        return settings.binance_api_key, settings.binance_secret
+    return None, None
+
 
 class CCXTClient:
     """CCXT client for centralized exchange operations."""
     
-    def __init__(self):
-        """Initialize the CCXT client."""
+    def __init__(self, venue: str = "binance", api_key: Optional[str] = None,
+                 secret: Optional[str] = None):
+        """Initialize the CCXT client.
+
+        Credentials default to the ones configured for the venue; without
+        them the client can only use public market data endpoints. Prefer
+        ``get_exchange_pool().get()`` over constructing clients directly so
+        that sessions and loaded markets are shared between calls.
+        """
+        self.venue = venue.lower()
+        default_key, default_secret = default_credentials(self.venue)
+        self.api_key = api_key or default_key
+        self.secret = secret or default_secret
         self.exchange = None
+        self._prices: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, "asyncio.Future"] = {}
+        # Live market data cache, attached by the server when streaming is enabled
+        self.stream = None
+        # Weight-aware request scheduler shared by all clients of the venue
+        self.scheduler = get_scheduler(self.venue)
+        self._ticker_batch: Optional["asyncio.Future"] = None
+        self._ticker_batch_symbols: List[str] = []
+        # Reservations of placed orders still resting on the book, by order id
+        self._open_orders: Dict[str, Any] = {}
+        self._reconciler: Optional["asyncio.Task"] = None
         self._initialize_exchange()
     
     def _initialize_exchange(self):
         """Initialize the exchange connection."""
-        if not settings.binance_api_key:
-            log.warning("Binance API key not configured")
-            return
+        if not self.api_key:
+            log.warning(f"{self.venue} API key not configured, using public endpoints only")
         
         try:
-            self.exchange = ccxt.binance({
-                'apiKey': settings.binance_api_key,
-                'secret': settings.binance_secret,
+            exchange_class = getattr(ccxt, self.venue)
+            config = {
                 'sandbox': not settings.live,  # Use sandbox in test mode
-                'enableRateLimit': True,
-            })
-            log.info("Binance exchange initialized successfully")
+                # ccxt spaces every call evenly; our scheduler budgets by weight instead
+                'enableRateLimit': self.scheduler is None,
+            }
+            if self.api_key:
+                config['apiKey'] = self.api_key
+                config['secret'] = self.secret
+            self.exchange = exchange_class(config)
+            log.info(f"{self.venue} exchange initialized successfully")
         except Exception as e:
-            log.error(f"Failed to initialize Binance exchange: {e}")
+            log.error(f"Failed to initialize {self.venue} exchange: {e}")
             self.exchange = None
     
+    async def request(self, priority: int, method: str, *args, **kwargs) -> Any:
+        """Call a ccxt method once the rate-limit scheduler grants its weight.
+        
+        ``priority`` is one of the scheduler classes (``ORDER``,
+        ``MARKET_DATA``, ``BALANCE``). Venues without a scheduler call
+        straight through to ccxt's own limiter. Latency is recorded per
+        venue and method, including any wait for the scheduler.
+        """
+        call = getattr(self.exchange, method)
+        with get_metrics().track("exchange", f"{self.venue}.{method}"):
+            if self.scheduler is None:
+                return await call(*args, **kwargs)
+            
+            await self.scheduler.acquire(priority, binance_weight(method, *args, **kwargs))
+            result = await call(*args, **kwargs)
+        headers = getattr(self.exchange, "last_response_headers", None) or {}
+        for name, value in headers.items():
+            if name.lower() == USED_WEIGHT_HEADER:
+                self.scheduler.observe(value)
+        return result
+    
+    async def load_markets(self) -> None:
+        """Load exchange markets once; ccxt reuses them on later calls."""
+        if not self.exchange:
+            raise Exception("Exchange not initialized")
+        
+        await self.request(MARKET_DATA, "load_markets")
+    
     async def test_connection(self) -> bool:
         """Test the connection to the exchange."""
         if not self.exchange:
             raise Exception("Exchange not initialized")
         
         try:
-            await self.exchange.fetch_balance()
+            await self.request(BALANCE, "fetch_balance")
             log.info("Exchange connection test successful")
             return True
         except Exception as e:
             log.error(f"Exchange connection test failed: {e}")
             raise
     
+    def _cached_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return a live streamed price, or a cached one younger than the TTL."""
+        if self.stream:
+            live = self.stream.get_ticker(symbol)
+            if live is not None:
+                get_metrics().record_cache("price", True)
+                return live
+        
+        cached = self._prices.get(symbol)
+        hit = cached is not None and time.monotonic() - cached[0] < settings.price_cache_ttl_seconds
+        get_metrics().record_cache("price", hit)
+        return cached[1] if hit else None
+    
+    def _store_price(self, symbol: str, ticker: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a ccxt ticker to our price format and cache it."""
+        price = {
+            "symbol": symbol,
+            "price": ticker["last"],
+            "bid": ticker["bid"],
+            "ask": ticker["ask"],
+            "volume": ticker["baseVolume"],
+            "timestamp": ticker["timestamp"]
+        }
+        self._prices[symbol] = (time.monotonic(), price)
+        return price
+    
+    def _single_flight(self, symbol: str, fetch: Awaitable[Dict[str, Any]]) -> "asyncio.Future":
+        """Register ``fetch`` as the in-flight request for ``symbol``."""
+        future = asyncio.ensure_future(fetch)
+        self._inflight[symbol] = future
+        
+        def _done(f, symbol=symbol):
+            if self._inflight.get(symbol) is f:
+                del self._inflight[symbol]
+        
+        future.add_done_callback(_done)
+        return future
+    
+    async def _fetch_price(self, symbol: str) -> Dict[str, Any]:
+        try:
+            ticker = await self.request(MARKET_DATA, "fetch_ticker", symbol)
+            return self._store_price(symbol, ticker)
+        except Exception as e:
+            log.error(f"Failed to get price for {symbol}: {e}")
+            raise
+    
+    async def _fetch_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch many tickers with one ``fetch_tickers`` call.
+        
+        ccxt rejects the whole call if any symbol is not listed, so symbols
+        missing from the loaded markets are left out up front, and a batch
+        that still fails is retried one symbol at a time. Symbols that
+        could not be priced are missing from the result.
+        """
+        markets = self.exchange.markets
+        if markets:
+            unlisted = [symbol for symbol in symbols if symbol not in markets]
+            if unlisted:
+                log.debug(f"Not listed on {self.venue}: {', '.join(unlisted)}")
+                symbols = [symbol for symbol in symbols if symbol in markets]
+        if not symbols:
+            return {}
+        try:
+            tickers = await self.request(MARKET_DATA, "fetch_tickers", symbols)
+            return {
+                symbol: self._store_price(symbol, ticker)
+                for symbol, ticker in tickers.items()
+            }
+        except Exception as e:
+            log.warning(f"Failed to get prices for {len(symbols)} symbols, retrying one by one: {e}")
+        results = await asyncio.gather(*(self._fetch_price(s) for s in symbols),
+                                       return_exceptions=True)
+        return {s: r for s, r in zip(symbols, results) if not isinstance(r, BaseException)}
+    
+    async def _flush_ticker_batch(self) -> Dict[str, Dict[str, Any]]:
+        """Send the symbols collected during the batch window as one request."""
+        await asyncio.sleep(settings.cex_ticker_batch_ms / 1000)
+        symbols, self._ticker_batch_symbols = self._ticker_batch_symbols, []
+        self._ticker_batch = None
+        if len(symbols) == 1:
+            return {symbols[0]: await self._fetch_price(symbols[0])}
+        return await self._fetch_prices(symbols)
+    
+    @staticmethod
+    async def _pick_price(batch: "asyncio.Future", symbol: str) -> Dict[str, Any]:
+        prices = await batch
+        if symbol not in prices:
+            raise KeyError(f"No ticker returned for {symbol}")
+        return prices[symbol]
+    
     async def get_price(self, symbol: str) -> Dict[str, Any]:
-        """Get current price for a symbol."""
+        """Get current price for a symbol.
+        
+        Prices younger than ``price_cache_ttl_seconds`` are served from
+        memory, and concurrent callers asking for the same symbol share a
+        single ``fetch_ticker`` request.
+        """
+        if not self.exchange:
+            raise Exception("Exchange not initialized")
+        
+        cached = self._cached_price(symbol)
+        if cached is not None:
+            return cached
+        
+        future = self._inflight.get(symbol)
+        if future is None:
+            if settings.cex_ticker_batch_ms > 0 and self.exchange.has.get("fetchTickers"):
+                # Join the symbols requested within the batch window into one fetch_tickers call
+                if self._ticker_batch is None:
+                    self._ticker_batch = asyncio.ensure_future(self._flush_ticker_batch())
+                self._ticker_batch_symbols.append(symbol)
+                future = self._single_flight(symbol, self._pick_price(self._ticker_batch, symbol))
+            else:
+                future = self._single_flight(symbol, self._fetch_price(symbol))
+        return await asyncio.shield(future)
+    
+    async def get_prices(self, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get current prices for many symbols with one ``fetch_tickers`` call.
+        
+        Cached and in-flight symbols are reused; only the rest are requested.
+        Symbols that are not listed or could not be priced are left out of
+        the result without failing the others.
+        """
+        if not self.exchange:
+            raise Exception("Exchange not initialized")
+        
+        prices: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, "asyncio.Future"] = {}
+        missing: List[str] = []
+        markets = self.exchange.markets
+        for symbol in dict.fromkeys(symbols):
+            if markets and symbol not in markets:
+                continue
+            cached = self._cached_price(symbol)
+            if cached is not None:
+                prices[symbol] = cached
+            elif symbol in self._inflight:
+                pending[symbol] = self._inflight[symbol]
+            else:
+                missing.append(symbol)
+        
+        if missing and self.exchange.has.get("fetchTickers"):
+            batch = asyncio.ensure_future(self._fetch_prices(missing))
+            for symbol in missing:
+                pending[symbol] = self._single_flight(symbol, self._pick_price(batch, symbol))
+        else:
+            for symbol in missing:
+                pending[symbol] = self._single_flight(symbol, self._fetch_price(symbol))
+        
+        results = await asyncio.gather(
+            *(asyncio.shield(f) for f in pending.values()), return_exceptions=True
+        )
+        for symbol, result in zip(pending, results):
+            if isinstance(result, BaseException):
+                log.warning(f"No price for {symbol}: {result}")
+            else:
+                prices[symbol] = result
+        return prices
+    
+    async def get_order_book(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
+        """Get the top ``depth`` order book levels for a symbol.
+        
+        Served from the live stream when it is connected and the book is in
+        sync, otherwise fetched from the exchange.
+        """
         if not self.exchange:
             raise Exception("Exchange not initialized")
         
+        if self.stream:
+            live = self.stream.get_order_book(symbol, depth)
+            if live is not None:
+                return live
+        
         try:
-            ticker = await self.exchange.fetch_ticker(symbol)
+            book = await self.request(MARKET_DATA, "fetch_order_book", symbol, depth)
             return {
                 "symbol": symbol,
-                "price": ticker["last"],
-                "bid": ticker["bid"],
-                "ask": ticker["ask"],
-                "volume": ticker["baseVolume"],
-                "timestamp": ticker["timestamp"]
+                "bids": book["bids"][:depth],
+                "asks": book["asks"][:depth],
+                "nonce": book.get("nonce")
             }
         except Exception as e:
-            log.error(f"Failed to get price for {symbol}: {e}")
+            log.error(f"Failed to get order book for {symbol}: {e}")
             raise
     
+    async def _value_usd(self, amounts: Dict[str, float]) -> Tuple[float, List[str]]:
+        """Value currency amounts in dollars from cached, batched USDT prices."""
+        from ..portfolio.engine import STABLECOINS, usd_symbol
+        
+        total = sum(amount for currency, amount in amounts.items() if currency in STABLECOINS)
+        priced = [c for c in amounts if c not in STABLECOINS]
+        symbols = [usd_symbol(c) for c in priced]
+        prices = await self.get_prices(symbols) if symbols else {}
+        
+        unpriced = []
+        for currency in priced:
+            price = prices.get(usd_symbol(currency))
+            if price and price["price"] is not None:
+                total += amounts[currency] * price["price"]
+            else:
+                unpriced.append(currency)
+        return total, unpriced
+    
     async def get_balance(self) -> Dict[str, Any]:
-        """Get account balance."""
+        """Get account balance with its dollar value.
+        
+        ``total_usd`` values stablecoins at par and everything else at its
+        USDT price; currencies without a USDT market are listed in
+        ``unpriced`` and left out of the total.
+        """
         if not self.exchange:
             raise Exception("Exchange not initialized")
         
         try:
-            balance = await self.exchange.fetch_balance()
+            balance = await self.request(BALANCE, "fetch_balance")
             # Filter out zero balances
             non_zero_balances = {
                 currency: amount for currency, amount in balance["total"].items()
                 if amount > 0
             }
+            total_usd, unpriced = await self._value_usd(non_zero_balances)
             return {
                 "balances": non_zero_balances,
-                "total_usd": balance.get("USD", 0)
+                "total_usd": total_usd,
+                "unpriced": unpriced
             }
         except Exception as e:
             log.error(f"Failed to get balance: {e}")
             raise
     
-    async def get_ohlcv(self, symbol: str, timeframe: str = "1h", limit: int = 100) -> List[List[float]]:
-        """Get OHLCV data for a symbol."""
+    async def get_ohlcv(self, symbol: str, timeframe: str = "1h", limit: Optional[int] = 100,
+                        since: Optional[int] = None) -> List[List[float]]:
+        """Get OHLCV data for a symbol, optionally starting at ``since`` (ms)."""
         if not self.exchange:
             raise Exception("Exchange not initialized")
         
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = await self.request(MARKET_DATA, "fetch_ohlcv", symbol, timeframe, since=since, limit=limit)
             return ohlcv
         except Exception as e:
             log.error(f"Failed to get OHLCV for {symbol}: {e}")
             raise
     
+    async def _quote_usd(self, symbol: str) -> float:
+        """Dollar price of a pair's quote currency, for checking USD risk limits.
+        
+        Stablecoins count as one dollar. A quote that cannot be priced
+        raises ``RiskLimitExceeded`` so the order is rejected.
+        """
+        from ..portfolio.engine import STABLECOINS, usd_symbol
+        from ..risk.ledger import RiskLimitExceeded
+        
+        quote = symbol.split("/")[-1].split(":")[0].upper()
+        if quote in STABLECOINS:
+            return 1.0
+        try:
+            price = (await self.get_price(usd_symbol(quote)))["price"]
+        except Exception as e:
+            raise RiskLimitExceeded(f"Cannot price {quote} in USD to check risk limits: {e}") from e
+        if not price:
+            raise RiskLimitExceeded(f"Cannot price {quote} in USD to check risk limits")
+        return price
+    
+    async def _market_price(self, symbol: str, side: str) -> float:
+        """Price a market order is sized at: the last trade, else the side it would take."""
+        from ..risk.ledger import RiskLimitExceeded
+        
+        ticker = await self.get_price(symbol)
+        book = (ticker["ask"], ticker["bid"]) if side == "buy" else (ticker["bid"], ticker["ask"])
+        price = next((p for p in (ticker["price"], *book) if p), None)
+        if price is None:
+            raise RiskLimitExceeded(f"Cannot price a market order for {symbol}: no last, bid or ask")
+        return price
+    
+    def _record_order(self, reservation, order: Dict[str, Any]) -> bool:
+        """Journal an order's fills so far; returns whether the order is finished.
+        
+        An order without a status is taken as finished, and a finished
+        market order that reports no filled amount as fully filled.
+        """
+        from ..risk.ledger import get_risk_ledger
+        
+        status = order.get("status")
+        done = status is None or status in FINISHED_ORDER_STATUSES
+        filled = order.get("filled")
+        if filled is None:
+            filled = reservation.amount if done and order.get("type") == "market" else 0.0
+        get_risk_ledger().record_fill(
+            reservation, filled,
+            order.get("average") or order.get("price") or reservation.price,
+            (order.get("fee") or {}).get("cost") or 0.0,
+            done=done,
+        )
+        return done
+    
+    async def reconcile_orders(self) -> int:
+        """Journal new fills of resting orders; returns how many are still open."""
+        for order_id, reservation in list(self._open_orders.items()):
+            try:
+                order = await self.request(BALANCE, "fetch_order", order_id, reservation.symbol)
+            except Exception as e:
+                log.warning(f"Failed to check order {order_id}: {e}")
+                continue
+            if self._record_order(reservation, order):
+                del self._open_orders[order_id]
+        return len(self._open_orders)
+    
+    async def _reconcile_loop(self) -> None:
+        try:
+            while self._open_orders:
+                await asyncio.sleep(settings.order_reconcile_seconds)
+                await self.reconcile_orders()
+        finally:
+            self._reconciler = None
+    
     async def place_order(self, symbol: str, side: str, type: str, amount: float, price: Optional[float] = None, dry_run: bool = True) -> Dict[str, Any]:
-        """Place an order on the exchange."""
+        """Place an order on the exchange.
+        
+        Every order, dry run or not, passes the pre-trade risk gate first:
+        its notional (at ``price``, or the cached market price for market
+        orders), converted to USD through the quote currency's price, is
+        checked against ``max_order_usd`` and ``max_open_notional_usd``,
+        and today's realized loss against ``daily_loss_limit_usd``. Market
+        orders are sized at the last price, or the ask (buy) or bid (sell)
+        when there is none. Live orders also require trading to be enabled.
+        Their fills are recorded in the risk ledger; an order left resting
+        on the book keeps its unfilled notional reserved and is polled
+        with ``fetch_order`` every ``order_reconcile_seconds`` until it
+        is finished.
+        """
         if not self.exchange:
             raise Exception("Exchange not initialized")
         
+        from ..config.env import can_execute_trade
+        from ..risk.ledger import get_risk_ledger
+        
+        ledger = get_risk_ledger()
+        reference_price = price or await self._market_price(symbol, side)
+        reservation = ledger.reserve(symbol, side, amount, reference_price,
+                                     await self._quote_usd(symbol))
+        
         if dry_run:
+            ledger.release(reservation)
             log.info(f"DRY RUN: Would place {side} {amount} {symbol} at {price or 'market'}")
             return {
                 "id": "dry_run_order",
@@ -120,16 +482,29 @@ class CCXTClient:
                 "message": "This was a dry run - no actual order was placed"
             }
         
+        if not can_execute_trade():
+            ledger.release(reservation)
+            raise Exception("Live trading is disabled (set LIVE=1 and AM_I_SURE=YES)")
+        
         try:
-            order = await self.exchange.create_order(symbol, type, side, amount, price)
-            log.info(f"Order placed successfully: {order['id']}")
-            return order
+            order = await self.request(ORDER, "create_order", symbol, type, side, amount, price)
         except Exception as e:
+            ledger.release(reservation)
             log.error(f"Failed to place order: {e}")
             raise
+        
+        if not self._record_order(reservation, {**order, "type": order.get("type") or type}):
+            self._open_orders[order["id"]] = reservation
+            if self._reconciler is None:
+                self._reconciler = asyncio.create_task(self._reconcile_loop())
+        log.info(f"Order placed successfully: {order['id']}")
+        return order
     
     async def close(self):
         """Close the exchange connection."""
+        if self._reconciler is not None:
+            self._reconciler.cancel()
+            await asyncio.gather(self._reconciler, return_exceptions=True)
         if self.exchange:
             await self.exchange.close()
             log.info("Exchange connection closed")
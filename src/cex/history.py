@@ -0,0 +1,324 @@
+"""On-disk OHLCV history with paginated exchange backfill."""
+
+import asyncio
+import mmap
+import os
+import time
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import ccxt.async_support as ccxt
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from .candles import OHLCV_FIELDS
+from .ccxt_client import CCXTClient, resolve_venue
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Column name -> array typecode; every column holds one fixed-width value per candle
+COLUMN_TYPES = {
+    "timestamp": "q",
+    "open": "d",
+    "high": "d",
+    "low": "d",
+    "close": "d",
+    "volume": "d",
+}
+
+
+SeriesKey = Tuple[str, str, str]
+
+
+@lru_cache(maxsize=None)
+def exchange_timeframes(venue: str) -> frozenset:
+    """Timeframes a ccxt exchange supports for OHLCV, read without any network I/O."""
+    return frozenset(getattr(ccxt, venue)().timeframes or ())
+
+
+def _path_part(value: str) -> str:
+    if not value or value in (".", "..") or any(c in value for c in ("/", "\\", "\0")):
+        raise ValueError(f"Invalid series name component {value!r}")
+    return value
+
+
+def series_key(venue: str, symbol: str, timeframe: str) -> SeriesKey:
+    """Validate a series and return its ``(venue, symbol, timeframe)`` key.
+
+    The venue must be a configured ccxt exchange and the timeframe one it
+    supports. Every part becomes a directory name, so none may be ``..``
+    or contain a path separator.
+    """
+    venue_id = resolve_venue(venue)
+    if timeframe not in exchange_timeframes(venue_id):
+        raise ValueError(f"Timeframe {timeframe} is not supported by {venue_id}")
+    _path_part(venue_id)
+    _path_part(timeframe)
+    _path_part(symbol.replace("/", "-").replace(":", "_"))
+    return venue_id, symbol, timeframe
+
+
+def empty_range() -> "CandleRange":
+    """A range with no candles, for series that were never stored."""
+    return CandleRange({name: memoryview(array(typecode)) for name, typecode in COLUMN_TYPES.items()})
+
+
+class CandleRange:
+    """Zero-copy view of a contiguous run of stored candles.
+
+    Each column is a ``memoryview`` straight into the memory-mapped file,
+    so slicing a range does not copy candle data.
+    """
+
+    def __init__(self, columns: Dict[str, memoryview]):
+        """Wrap the column views of one range."""
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def __getattr__(self, name: str) -> memoryview:
+        try:
+            return self.__dict__["columns"][name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def tail(self, count: int) -> "CandleRange":
+        """Return the newest ``count`` candles of the range, still without copying."""
+        start = max(len(self) - count, 0)
+        return CandleRange({name: view[start:] for name, view in self.columns.items()})
+
+    def rows(self) -> List[List[float]]:
+        """Copy the range out as ccxt-style OHLCV rows."""
+        return [list(row) for row in zip(*(self.columns[f] for f in OHLCV_FIELDS))]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Copy the range out in the candles:// resource format."""
+        return [dict(zip(OHLCV_FIELDS, row)) for row in self.rows()]
+
+
+class CandleFile:
+    """Append-only columnar candle file set for one series.
+
+    Each OHLCV field lives in its own file of fixed-width native values, so
+    a column maps directly onto a typed ``memoryview``. Only closed candles
+    newer than the last stored timestamp are appended, which keeps the
+    timestamp column sorted for binary search.
+    """
+
+    def __init__(self, path: Path):
+        """Open (or create) the series directory at ``path``."""
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._maps: Dict[str, Tuple[int, Optional[mmap.mmap]]] = {}
+        self._repair()
+
+    def _column_path(self, name: str) -> Path:
+        return self.path / f"{name}.bin"
+
+    def _repair(self) -> None:
+        """Truncate columns to the last candle written to every file.
+
+        An interrupted append can leave some columns one partial record
+        longer than others; dropping the tail keeps them aligned.
+        """
+        counts = []
+        for name, typecode in COLUMN_TYPES.items():
+            path = self._column_path(name)
+            size = path.stat().st_size if path.exists() else 0
+            counts.append(size // array(typecode).itemsize)
+        complete = min(counts)
+        for name, typecode in COLUMN_TYPES.items():
+            path = self._column_path(name)
+            expected = complete * array(typecode).itemsize
+            if path.exists() and path.stat().st_size != expected:
+                log.warning(f"Truncating partial candle data in {path}")
+                os.truncate(path, expected)
+
+    def _view(self, name: str) -> memoryview:
+        """Map a column file and return it as a typed view."""
+        path = self._column_path(name)
+        size = path.stat().st_size if path.exists() else 0
+        cached_size, mapped = self._maps.get(name, (-1, None))
+        if size != cached_size:
+            mapped = None
+            if size:
+                with open(path, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+            self._maps[name] = (size, mapped)
+        if mapped is None:
+            return memoryview(array(COLUMN_TYPES[name]))
+        return memoryview(mapped).cast(COLUMN_TYPES[name])
+
+    def __len__(self) -> int:
+        return len(self._view("timestamp"))
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        """Timestamp of the oldest stored candle, if any."""
+        timestamps = self._view("timestamp")
+        return timestamps[0] if len(timestamps) else None
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest stored candle, if any."""
+        timestamps = self._view("timestamp")
+        return timestamps[-1] if len(timestamps) else None
+
+    def append(self, rows: List[List[float]]) -> int:
+        """Append candles newer than the last stored one; return how many were written."""
+        last = self.last_timestamp
+        fresh = [r for r in sorted(rows, key=lambda r: r[0]) if last is None or r[0] > last]
+        deduped: List[List[float]] = []
+        for row in fresh:
+            if not deduped or row[0] > deduped[-1][0]:
+                deduped.append(row)
+        if not deduped:
+            return 0
+
+        for index, (name, typecode) in enumerate(COLUMN_TYPES.items()):
+            if typecode == "q":
+                values = array(typecode, (int(r[index]) for r in deduped))
+            else:
+                values = array(typecode, (float(r[index] or 0.0) for r in deduped))
+            with open(self._column_path(name), "ab") as f:
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        return len(deduped)
+
+    def range(self, since: Optional[int] = None, until: Optional[int] = None) -> CandleRange:
+        """Return candles with ``since <= timestamp < until`` without copying.
+
+        Only candles present in every column are included, so a read that
+        overlaps an append in progress never sees misaligned columns.
+        """
+        count = min(len(self._view(name)) for name in COLUMN_TYPES)
+        timestamps = self._view("timestamp")[:count]
+        start = bisect_left(timestamps, since) if since is not None else 0
+        end = bisect_left(timestamps, until) if until is not None else len(timestamps)
+        end = max(start, end)
+        return CandleRange({name: self._view(name)[start:end] for name in COLUMN_TYPES})
+
+
+class HistoryStore:
+    """Directory of per-series candle files with exchange backfill.
+
+    Files live under ``<root>/<venue>/<symbol>/<timeframe>/`` so history
+    survives restarts and is read from local disk instead of re-downloaded.
+    """
+
+    def __init__(self, root: Optional[str] = None, page_limit: int = 1000,
+                 max_retries: int = 5):
+        """Initialize the store rooted at ``root`` (defaults to settings)."""
+        self.root = Path(root or settings.candle_history_dir)
+        self.page_limit = page_limit
+        self.max_retries = max_retries
+        self._files: Dict[SeriesKey, CandleFile] = {}
+        self._locks: Dict[SeriesKey, asyncio.Lock] = {}
+
+    def file(self, venue: str, symbol: str, timeframe: str,
+             create: bool = True) -> Optional[CandleFile]:
+        """Return the candle file for a validated series.
+
+        With ``create`` false, a series with nothing on disk returns None
+        instead of creating its directory.
+        """
+        key = series_key(venue, symbol, timeframe)
+        candle_file = self._files.get(key)
+        if candle_file is None:
+            safe_symbol = symbol.replace("/", "-").replace(":", "_")
+            path = self.root / key[0] / safe_symbol / timeframe
+            if not create and not path.is_dir():
+                return None
+            candle_file = CandleFile(path)
+            self._files[key] = candle_file
+        return candle_file
+
+    def range(self, venue: str, symbol: str, timeframe: str, since: Optional[int] = None,
+              until: Optional[int] = None) -> CandleRange:
+        """Serve a stored time range straight from disk; unknown series are empty."""
+        candle_file = self.file(venue, symbol, timeframe, create=False)
+        if candle_file is None:
+            return empty_range()
+        return candle_file.range(since, until)
+
+    async def backfill(self, client: CCXTClient, symbol: str, timeframe: str, since: int,
+                       until: Optional[int] = None) -> Dict[str, Any]:
+        """Page through exchange history from ``since`` and append closed candles.
+
+        The cursor resumes after the last stored candle, so repeated runs
+        only download what is missing. Files are append-only, so a ``since``
+        older than the first stored candle raises ``ValueError`` instead of
+        silently skipping the earlier range.
+        """
+        key = series_key(client.venue, symbol, timeframe)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            candle_file = self.file(*key)
+            timeframe_ms = client.exchange.parse_timeframe(timeframe) * 1000
+            # Stop before the still-open candle
+            now_ms = int(time.time() * 1000)
+            end = min(until, now_ms) if until is not None else now_ms
+            end -= timeframe_ms
+
+            first = candle_file.first_timestamp
+            if first is not None and since < first:
+                raise ValueError(
+                    f"Range before stored history is not supported: {'/'.join(key)} "
+                    f"starts at {first}, backfill from there or later"
+                )
+            last = candle_file.last_timestamp
+            cursor = max(since, last + timeframe_ms) if last is not None else since
+            written = pages = 0
+            while cursor <= end:
+                rows = await self._fetch_page(client, symbol, timeframe, cursor)
+                pages += 1
+                rows = [r for r in rows if cursor <= r[0] <= end]
+                if not rows:
+                    break
+                # Appends fsync every column, so keep them off the event loop
+                written += await asyncio.to_thread(candle_file.append, rows)
+                cursor = int(rows[-1][0]) + timeframe_ms
+
+            log.info(f"Backfilled {written} candles for {'/'.join(key)} in {pages} pages")
+            return {
+                "venue": client.venue,
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "written": written,
+                "pages": pages,
+                "stored": len(candle_file),
+                "last_timestamp": candle_file.last_timestamp,
+            }
+
+    async def _fetch_page(self, client: CCXTClient, symbol: str, timeframe: str,
+                          since: int) -> List[List[float]]:
+        """Fetch one page, backing off when the exchange throttles us."""
+        delay = max(client.exchange.rateLimit / 1000, 0.1)
+        for attempt in range(self.max_retries):
+            try:
+                return await client.get_ohlcv(symbol, timeframe, limit=self.page_limit, since=since)
+            except (ccxt.RateLimitExceeded, ccxt.NetworkError) as e:
+                if attempt == self.max_retries - 1:
+                    raise
+                log.warning(f"Backfill page for {symbol} throttled ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay *= 2
+        return []
+
+
+# Global store instance
+_store: Optional[HistoryStore] = None
+
+
+def get_history_store() -> HistoryStore:
+    """Get the global history store instance."""
+    global _store
+    if _store is None:
+        _store = HistoryStore()
+    return _store
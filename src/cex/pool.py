@@ -0,0 +1,102 @@
+"""Shared pool of exchange clients reused across MCP tools and resources."""
+
+import asyncio
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from .ccxt_client import CCXTClient, default_credentials, resolve_venue
+
+log = get_logger(__name__)
+settings = get_settings()
+
+PoolKey = Tuple[str, str]
+
+
+def _credentials_fingerprint(api_key: Optional[str]) -> str:
+    """Hash the API key so pool keys never hold raw credentials."""
+    if not api_key:
+        return "public"
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+class ExchangePool:
+    """Registry of long-lived exchange clients keyed by venue and credentials.
+
+    Each client keeps its HTTP session and loaded markets for the lifetime
+    of the pool, so callers no longer pay for a new session and a market
+    reload on every request. The server lifespan warms the pool on startup
+    and closes it on shutdown.
+    """
+
+    def __init__(self):
+        """Initialize an empty pool."""
+        self._clients: Dict[PoolKey, CCXTClient] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def get(self, venue: str = "binance", api_key: Optional[str] = None,
+                  secret: Optional[str] = None) -> CCXTClient:
+        """Return the pooled client for a configured venue, creating it on first use."""
+        venue = resolve_venue(venue)
+        api_key = api_key or default_credentials(venue)[0]
+        key = (venue, _credentials_fingerprint(api_key))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        async with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = CCXTClient(venue, api_key=api_key, secret=secret)
+                self._clients[key] = client
+                log.info(f"Created pooled exchange client for {venue}")
+        return client
+
+    async def warm(self) -> None:
+        """Create a client per configured venue and load its markets ahead of the first call."""
+        await asyncio.gather(*(self._warm_venue(venue) for venue in settings.cex_venues))
+
+    async def _warm_venue(self, venue: str) -> None:
+        try:
+            client = await self.get(venue)
+            if client.exchange:
+                await client.load_markets()
+                log.info(f"Exchange pool warmed for {venue}")
+        except Exception as e:
+            log.error(f"Failed to warm exchange pool for {venue}: {e}")
+
+    async def close(self) -> None:
+        """Close every pooled client and empty the pool."""
+        async with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                log.error(f"Failed to close exchange client: {e}")
+
+
+# Global pool instance
+_pool: Optional[ExchangePool] = None
+
+
+def get_exchange_pool() -> ExchangePool:
+    """Get the global exchange pool instance."""
+    global _pool
+    if _pool is None:
+        _pool = ExchangePool()
+    return _pool
+
+
+async def close_exchange_pool() -> None:
+    """Close the global exchange pool if it was created."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
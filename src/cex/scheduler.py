@@ -0,0 +1,167 @@
+"""Weight-aware request scheduling for exchange rate limits."""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Priority classes, most urgent first
+ORDER = 0
+MARKET_DATA = 1
+BALANCE = 2
+
+# Response header carrying the weight Binance has counted this minute
+USED_WEIGHT_HEADER = "x-mbx-used-weight-1m"
+
+# Binance spot request weights per ccxt method
+BINANCE_WEIGHTS = {
+    "load_markets": 20,
+    "fetch_ticker": 2,
+    "fetch_tickers": 80,
+    "fetch_ohlcv": 2,
+    "fetch_balance": 20,
+    "create_order": 1,
+    "cancel_order": 1,
+}
+
+
+def binance_weight(method: str, *args, **kwargs) -> int:
+    """Request weight of one ccxt call against Binance spot."""
+    if method == "fetch_order_book":
+        limit = kwargs.get("limit") or (args[1] if len(args) > 1 else None) or 100
+        return 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+    if method == "fetch_tickers":
+        symbols = args[0] if args else kwargs.get("symbols")
+        if symbols:
+            count = len(symbols)
+            return 2 if count <= 20 else 40 if count <= 100 else 80
+    return BINANCE_WEIGHTS.get(method, 1)
+
+
+class TokenBucket:
+    """Continuously refilled bucket of ``capacity`` tokens per ``period`` seconds."""
+
+    def __init__(self, capacity: float, period: float):
+        """Initialize a full bucket."""
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, floor: float = 0.0) -> float:
+        """Seconds until ``amount`` tokens are available above ``floor``."""
+        missing = amount + floor - self.tokens
+        return max(missing, 0.0) / self.rate
+
+
+class RateLimitScheduler:
+    """Grants exchange requests by priority within weight and order budgets.
+
+    Every request takes its weight from a per-minute bucket, and orders
+    also take a token from the order-count bucket. Waiting requests are
+    granted strictly by priority class (orders, then market data, then
+    balances) and in arrival order within a class. A share of the weight
+    budget is held back for orders, so data polling can never use up the
+    budget an order needs.
+    """
+
+    def __init__(self, weight_per_minute: int, orders_per_10s: int, order_reserve: float = 0.1):
+        """Initialize full buckets."""
+        self.weight = TokenBucket(weight_per_minute, 60.0)
+        self.orders = TokenBucket(orders_per_10s, 10.0)
+        self.reserve = weight_per_minute * order_reserve
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.granted = {ORDER: 0, MARKET_DATA: 0, BALANCE: 0}
+
+    def _wait_time(self, priority: int, weight: float) -> float:
+        if priority == ORDER:
+            return max(self.weight.wait_time(weight), self.orders.wait_time(1))
+        return self.weight.wait_time(weight, self.reserve)
+
+    def _grant(self, priority: int, weight: float) -> None:
+        self.weight.tokens -= weight
+        if priority == ORDER:
+            self.orders.tokens -= 1
+        self.granted[priority] += 1
+
+    def _drain(self) -> None:
+        self._timer = None
+        self.weight.refill()
+        self.orders.refill()
+        while self._waiters:
+            priority, _, weight, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(priority, weight)
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._drain)
+                return
+            heapq.heappop(self._waiters)
+            self._grant(priority, weight)
+            future.set_result(None)
+
+    async def acquire(self, priority: int, weight: float) -> None:
+        """Wait until a request of this priority and weight may be sent."""
+        weight = min(weight, self.weight.capacity - self.reserve)
+        self.weight.refill()
+        self.orders.refill()
+        if not self._waiters and self._wait_time(priority, weight) == 0:
+            self._grant(priority, weight)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), weight, future))
+        # A more urgent request may now be at the head; re-plan the wake-up
+        if self._timer is not None:
+            self._timer.cancel()
+        self._drain()
+        await future
+
+    def observe(self, used_weight: Optional[Any]) -> None:
+        """Align the bucket with the weight the exchange reports as used."""
+        if used_weight is None:
+            return
+        self.weight.refill()
+        self.weight.tokens = min(self.weight.tokens, self.weight.capacity - float(used_weight))
+
+    def stats(self) -> Dict[str, Any]:
+        """Remaining budget, queue depth and grants per class."""
+        self.weight.refill()
+        self.orders.refill()
+        return {
+            "weight_available": self.weight.tokens,
+            "orders_available": self.orders.tokens,
+            "queued": sum(1 for *_, f in self._waiters if not f.done()),
+            "granted": dict(self.granted),
+        }
+
+
+# Schedulers by venue; only venues with known weight tables are scheduled
+_schedulers: Dict[str, RateLimitScheduler] = {}
+
+
+def get_scheduler(venue: str) -> Optional[RateLimitScheduler]:
+    """Get the shared scheduler for a venue, or None if ccxt's own limiter is used."""
+    if venue != "binance" or not settings.cex_scheduler:
+        return None
+    if venue not in _schedulers:
+        _schedulers[venue] = RateLimitScheduler(
+            settings.cex_weight_per_minute, settings.cex_orders_per_10s,
+            settings.cex_order_weight_reserve,
+        )
+    return _schedulers[venue]
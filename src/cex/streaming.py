@@ -0,0 +1,254 @@
+"""Websocket market data stream with a live ticker, trade and order book cache."""
+
+import asyncio
+import heapq
+import json
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import aiohttp
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+SnapshotFetcher = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+def stream_id(symbol: str) -> str:
+    """Map a unified symbol such as ``BTC/USDT`` to its Binance stream id."""
+    return symbol.replace("/", "").lower()
+
+
+class OrderBook:
+    """L2 order book maintained from a snapshot plus depth deltas.
+
+    Follows Binance's diff-depth rules: the first delta applied after a
+    snapshot must straddle ``last_update_id + 1`` and every later delta must
+    start exactly one past the previous one. Anything else is a gap and the
+    book has to be resynced from a fresh snapshot.
+    """
+
+    def __init__(self, symbol: str):
+        """Initialize an empty, unsynced book."""
+        self.symbol = symbol
+        self.bids: Dict[float, float] = {}
+        self.asks: Dict[float, float] = {}
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+        self._bridged = False
+
+    def load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """Replace the book with a REST snapshot in ccxt format."""
+        self.bids = {float(p): float(q) for p, q, *_ in snapshot["bids"]}
+        self.asks = {float(p): float(q) for p, q, *_ in snapshot["asks"]}
+        self.last_update_id = int(snapshot["nonce"])
+        self._bridged = False
+        self.updated_at = time.monotonic()
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """Apply a depth delta; return False if it reveals a sequence gap."""
+        first, final = event["U"], event["u"]
+        if final <= self.last_update_id:
+            return True
+        if self._bridged:
+            if first != self.last_update_id + 1:
+                return False
+        elif not first <= self.last_update_id + 1 <= final:
+            return False
+
+        for side, levels in ((self.bids, event["b"]), (self.asks, event["a"])):
+            for price, qty in levels:
+                price, qty = float(price), float(qty)
+                if qty:
+                    side[price] = qty
+                else:
+                    side.pop(price, None)
+        self.last_update_id = final
+        self._bridged = True
+        self.updated_at = time.monotonic()
+        return True
+
+    def top(self, depth: int = 20) -> Dict[str, Any]:
+        """Return the best ``depth`` levels per side."""
+        return {
+            "symbol": self.symbol,
+            "bids": [list(level) for level in heapq.nlargest(depth, self.bids.items())],
+            "asks": [list(level) for level in heapq.nsmallest(depth, self.asks.items())],
+            "nonce": self.last_update_id,
+        }
+
+
+class MarketStream:
+    """Live market data cache fed by Binance combined websocket streams.
+
+    Subscribes to ticker, trade and diff-depth streams for each symbol and
+    keeps the latest state in memory so reads need no network round trip.
+    Books start unsynced and are loaded from a REST snapshot; deltas that
+    arrive meanwhile are buffered and replayed. On a sequence gap or a
+    reconnect the affected books are resynced.
+    """
+
+    def __init__(self, symbols: List[str], snapshot: SnapshotFetcher, url: Optional[str] = None,
+                 trade_history: int = 100, reconnect_delay: float = 1.0):
+        """Initialize the stream for ``symbols``.
+
+        ``snapshot`` fetches a ccxt-format order book for a symbol and is
+        used to (re)sync books.
+        """
+        self.symbols = list(symbols)
+        self.url = url or settings.market_stream_url
+        self.snapshot = snapshot
+        self.reconnect_delay = reconnect_delay
+        self.connected = False
+        self.tickers: Dict[str, Dict[str, Any]] = {}
+        self.books: Dict[str, OrderBook] = {s: OrderBook(s) for s in self.symbols}
+        self.trades: Dict[str, Deque[Dict[str, Any]]] = {
+            s: deque(maxlen=trade_history) for s in self.symbols
+        }
+        self._by_id = {stream_id(s).upper(): s for s in self.symbols}
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {s: [] for s in self.symbols}
+        self._resyncs: Dict[str, asyncio.Task] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def stream_url(self) -> str:
+        """Combined stream URL subscribing to every feed we track."""
+        names = []
+        for symbol in self.symbols:
+            sid = stream_id(symbol)
+            names += [f"{sid}@ticker", f"{sid}@trade", f"{sid}@depth@100ms"]
+        return f"{self.url}?streams={'/'.join(names)}"
+
+    async def start(self) -> None:
+        """Start consuming the stream in the background."""
+        if self._task:
+            return
+        self._session = aiohttp.ClientSession()
+        self._task = asyncio.create_task(self._run())
+        log.info(f"Market stream started for {len(self.symbols)} symbols")
+
+    async def stop(self) -> None:
+        """Stop the stream and release its connection."""
+        tasks = [t for t in [self._task, *self._resyncs.values()] if t]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._resyncs.clear()
+        if self._session:
+            await self._session.close()
+            self._session = None
+        self.connected = False
+        log.info("Market stream stopped")
+
+    def get_ticker(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Return the live ticker for a symbol while the stream is connected."""
+        return self.tickers.get(symbol) if self.connected else None
+
+    def get_order_book(self, symbol: str, depth: int = 20) -> Optional[Dict[str, Any]]:
+        """Return the live book for a symbol if it is connected and in sync."""
+        book = self.books.get(symbol)
+        if not self.connected or book is None or not book.synced:
+            return None
+        return book.top(depth)
+
+    def get_trades(self, symbol: str) -> List[Dict[str, Any]]:
+        """Return recent trades for a symbol, oldest first."""
+        return list(self.trades.get(symbol, ()))
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with self._session.ws_connect(self.stream_url, heartbeat=30) as ws:
+                    self.connected = True
+                    delay = self.reconnect_delay
+                    log.info("Market stream connected")
+                    for symbol in self.symbols:
+                        self._resync(symbol)
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self.handle(json.loads(msg.data))
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"Market stream error: {e}")
+            finally:
+                self.connected = False
+            log.warning(f"Market stream disconnected, reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """Apply one combined-stream frame to the cache."""
+        data = message.get("data", message)
+        symbol = self._by_id.get(data.get("s", ""))
+        if symbol is None:
+            return
+
+        event = data.get("e")
+        if event == "24hrTicker":
+            self.tickers[symbol] = {
+                "symbol": symbol,
+                "price": float(data["c"]),
+                "bid": float(data["b"]),
+                "ask": float(data["a"]),
+                "volume": float(data["v"]),
+                "timestamp": data["E"],
+            }
+        elif event == "trade":
+            self.trades[symbol].append({
+                "id": data["t"],
+                "price": float(data["p"]),
+                "amount": float(data["q"]),
+                "side": "sell" if data["m"] else "buy",
+                "timestamp": data["T"],
+            })
+        elif event == "depthUpdate":
+            self._on_depth(symbol, data)
+
+    def _on_depth(self, symbol: str, event: Dict[str, Any]) -> None:
+        book = self.books[symbol]
+        if not book.synced:
+            self._buffers[symbol].append(event)
+            return
+        if not book.apply(event):
+            log.warning(f"Order book gap for {symbol} at {event['U']}, resyncing")
+            self._resync(symbol, pending=[event])
+
+    def _resync(self, symbol: str, pending: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Mark a book unsynced and fetch a fresh snapshot in the background."""
+        self.books[symbol].synced = False
+        self._buffers[symbol] = list(pending or [])
+        task = self._resyncs.get(symbol)
+        if task is None or task.done():
+            self._resyncs[symbol] = asyncio.create_task(self._sync_book(symbol))
+
+    async def _sync_book(self, symbol: str) -> None:
+        book = self.books[symbol]
+        delay = self.reconnect_delay
+        while self.connected and not book.synced:
+            try:
+                snapshot = await self.snapshot(symbol)
+            except Exception as e:
+                log.error(f"Failed to fetch order book snapshot for {symbol}: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+
+            book.load_snapshot(snapshot)
+            buffered, self._buffers[symbol] = self._buffers[symbol], []
+            if all(book.apply(event) for event in buffered):
+                book.synced = True
+                log.info(f"Order book synced for {symbol} at {book.last_update_id}")
+            else:
+                log.warning(f"Snapshot for {symbol} did not bridge buffered deltas, retrying")
+                await asyncio.sleep(self.reconnect_delay)
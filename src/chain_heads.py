@@ -0,0 +1,197 @@
+"""Background chain-head tracking for EVM and Solana."""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from .config.env import get_settings
+from .logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+HeadFetcher = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+class HeadTracker:
+    """Keeps the latest head of one chain in memory.
+
+    Polls ``fetch_head`` every ``interval`` seconds, backing off
+    exponentially while the node is failing. Reads of ``head`` never do
+    I/O. Every new head (a higher ``number``) resolves the pending
+    ``wait_for_head`` futures, so other components can await new blocks.
+    """
+
+    def __init__(self, chain: str, fetch_head: HeadFetcher, interval: float,
+                 max_backoff: float = 30.0):
+        """Initialize a stopped tracker."""
+        self.chain = chain
+        self.fetch_head = fetch_head
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.head: Optional[Dict[str, Any]] = None
+        self.updated_at = 0.0
+        self.errors = 0
+        self._next: Optional[asyncio.Future] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def age(self) -> Optional[float]:
+        """Seconds since the head was last refreshed."""
+        return time.monotonic() - self.updated_at if self.head else None
+
+    @property
+    def running(self) -> bool:
+        """Whether the tracker is polling."""
+        return self._task is not None
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the last successful poll is recent enough to trust."""
+        age = self.age
+        return age is not None and age <= max(3 * self.interval, 5.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current head with its age and poll health, without I/O."""
+        return {
+            "chain": self.chain,
+            "head": self.head,
+            "age_seconds": self.age,
+            "fresh": self.is_fresh,
+            "errors": self.errors,
+        }
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            log.info(f"Head tracker started for {self.chain}")
+
+    async def stop(self) -> None:
+        """Stop polling and fail any pending waiters."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._next and not self._next.done():
+            self._next.cancel()
+        self._next = None
+
+    async def wait_for_head(self, after: Optional[int] = None,
+                            timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Wait for a head newer than ``after`` (or the next head if None)."""
+        while True:
+            # A head may have been published while this waiter was not armed
+            if after is not None and self.head and self.head["number"] > after:
+                return self.head
+            # Each publish resolves and clears the pending future
+            if self._next is None or self._next.done():
+                self._next = asyncio.get_running_loop().create_future()
+            head = await asyncio.wait_for(asyncio.shield(self._next), timeout)
+            if after is None or head["number"] > after:
+                return head
+
+    async def subscribe(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each new head; a slow consumer skips to the newest head."""
+        last = self.head["number"] if self.head else None
+        while True:
+            head = await self.wait_for_head(after=last)
+            last = head["number"]
+            yield head
+
+    def _publish(self, head: Dict[str, Any]) -> None:
+        self.head = head
+        future, self._next = self._next, None
+        if future and not future.done():
+            future.set_result(head)
+
+    async def poll_once(self) -> Optional[Dict[str, Any]]:
+        """Fetch the head once and publish it if it advanced."""
+        head = await self.fetch_head()
+        self.updated_at = time.monotonic()
+        if self.head is None or head["number"] > self.head["number"]:
+            self._publish(head)
+            return head
+        return None
+
+    async def _run(self) -> None:
+        delay = self.interval
+        while True:
+            try:
+                await self.poll_once()
+                self.errors = 0
+                delay = self.interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                delay = min(max(delay, self.interval) * 2, self.max_backoff)
+                log.warning(f"Failed to poll {self.chain} head ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def evm_head_fetcher(client) -> HeadFetcher:
+    """Build a fetcher reading the latest block from an ``EVMClient``."""
+    async def fetch_head() -> Dict[str, Any]:
+        block = await client._call(lambda: client.w3.eth.get_block("latest"),
+                                   method="eth_getBlockByNumber")
+        return {
+            "number": block["number"],
+            "hash": block["hash"].hex() if hasattr(block["hash"], "hex") else block["hash"],
+            "base_fee": block.get("baseFeePerGas"),
+            "timestamp": block["timestamp"],
+        }
+    return fetch_head
+
+
+def solana_head_fetcher(client) -> HeadFetcher:
+    """Build a fetcher reading the latest slot and blockhash from a ``SolanaClient``."""
+    async def fetch_head() -> Dict[str, Any]:
+        response = await client.rpc("get_latest_blockhash")
+        return {
+            "number": response.context.slot,
+            "hash": str(response.value.blockhash),
+            "last_valid_block_height": response.value.last_valid_block_height,
+        }
+    return fetch_head
+
+
+# Running trackers by chain name
+_trackers: Dict[str, HeadTracker] = {}
+
+
+def get_head_tracker(chain: str) -> Optional[HeadTracker]:
+    """Get the running tracker for a chain, if any."""
+    return _trackers.get(chain)
+
+
+async def start_head_trackers(wait: Optional[float] = None) -> None:
+    """Start a tracker for every configured chain.
+
+    Safe to call again; only chains without a running tracker are
+    started. With ``wait``, trackers started by this call get up to that
+    many seconds to publish their first head.
+    """
+    if settings.ethereum_rpc_url and "ethereum" not in _trackers:
+        from .evm.evm_client import get_evm_client
+        _trackers["ethereum"] = HeadTracker(
+            "ethereum", evm_head_fetcher(get_evm_client()), settings.evm_head_poll_seconds
+        )
+    if settings.solana_rpc_url and "solana" not in _trackers:
+        from .solana.solana_client import get_solana_client
+        _trackers["solana"] = HeadTracker(
+            "solana", solana_head_fetcher(get_solana_client()), settings.solana_head_poll_seconds
+        )
+    started = [tracker for tracker in _trackers.values() if not tracker.running]
+    for tracker in started:
+        await tracker.start()
+    if wait and started:
+        await asyncio.gather(*(tracker.wait_for_head(timeout=wait) for tracker in started),
+                             return_exceptions=True)
+
+
+async def stop_head_trackers() -> None:
+    """Stop and forget every running tracker."""
+    for tracker in _trackers.values():
+        await tracker.stop()
+    _trackers.clear()
@@ -1,7 +1,7 @@
 """Environment configuration management."""
 
 import os
-from typing import Optional
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import Field
 
@@ -14,31 +14,127 @@ class Settings(BaseSettings):
     am_i_sure: str = Field(default="NO", description="Safety confirmation for live trading")
     max_order_usd: float = Field(default=100.0, description="Maximum order size in USD")
     daily_loss_limit_usd: float = Field(default=200.0, description="Daily loss limit in USD")
+    max_open_notional_usd: float = Field(default=500.0, description="Maximum combined USD notional of open orders not yet filled")
+    order_reconcile_seconds: float = Field(default=5.0, description="Seconds between fill checks of orders resting on the book")
+    risk_journal_path: str = Field(default="data/risk_journal.jsonl", description="Append-only fill journal backing the risk ledger")
     
     # Telegram Bot
     telegram_bot_token: Optional[str] = Field(default=None, description="Telegram bot token")
     owner_telegram_id: Optional[int] = Field(default=None, description="Owner Telegram user ID")
+    telegram_api_url: str = Field(default="https://api.telegram.org/bot", description="Telegram Bot API base URL (the token is appended)")
+    telegram_rate_per_second: float = Field(default=25.0, description="Maximum Telegram messages sent per second across all chats")
+    telegram_chat_interval: float = Field(default=1.0, description="Minimum seconds between messages to one Telegram chat")
+    telegram_mode: str = Field(default="polling", description="How the Telegram bot receives updates: polling or webhook")
+    telegram_webhook_url: Optional[str] = Field(default=None, description="Public HTTPS URL Telegram posts updates to in webhook mode")
+    telegram_webhook_host: str = Field(default="127.0.0.1", description="Address the local webhook listener binds to")
+    telegram_webhook_port: int = Field(default=8443, description="Port the local webhook listener binds to")
+    telegram_webhook_path: str = Field(default="/telegram/webhook", description="Path of the local webhook endpoint")
+    telegram_webhook_secret: Optional[str] = Field(default=None, description="Secret token Telegram sends with each webhook request")
+    telegram_update_workers: int = Field(default=4, description="Concurrent Telegram update handlers")
+    telegram_update_queue_size: int = Field(default=256, description="Telegram updates buffered before intake applies backpressure")
+    telegram_drain_seconds: float = Field(default=5.0, description="Seconds shutdown waits for queued Telegram updates and messages")
+    alert_poll_seconds: float = Field(default=1.0, description="Seconds between price polls for pending price alerts")
     
     # AI Providers
     openai_api_key: Optional[str] = Field(default=None, description="OpenAI API key")
     google_api_key: Optional[str] = Field(default=None, description="Google AI API key")
     deepseek_api_key: Optional[str] = Field(default=None, description="DeepSeek API key")
+    openai_base_url: str = Field(default="https://api.openai.com/v1", description="OpenAI API base URL")
+    openai_model: str = Field(default="gpt-4o-mini", description="OpenAI chat model")
+    gemini_base_url: str = Field(default="https://generativelanguage.googleapis.com/v1beta", description="Gemini API base URL")
+    gemini_model: str = Field(default="gemini-1.5-flash", description="Gemini model")
+    deepseek_base_url: str = Field(default="https://api.deepseek.com/v1", description="DeepSeek API base URL")
+    deepseek_model: str = Field(default="deepseek-chat", description="DeepSeek chat model")
+    ai_timeout: float = Field(default=30.0, description="Timeout in seconds for one AI provider request")
+    ai_provider_concurrency: int = Field(default=4, description="Maximum concurrent requests per AI provider")
+    ai_cache_size: int = Field(default=512, description="Maximum cached AI responses")
+    ai_cache_ttl_seconds: float = Field(default=60.0, description="Seconds an AI response is served from cache")
+    ai_hedge: bool = Field(default=True, description="Send slow AI queries to a second provider and take the first answer")
+    ai_hedge_percentile: float = Field(default=0.9, description="Latency percentile of the primary provider after which a query is hedged")
+    ai_hedge_default_delay: float = Field(default=2.0, description="Hedge delay in seconds until enough latencies have been observed")
+    ai_context_tokens: int = Field(default=800, description="Token budget for market context built for AI prompts")
+    ai_context_points: int = Field(default=48, description="Maximum downsampled closes per series in AI market context")
+    ai_context_digits: int = Field(default=5, description="Significant figures kept for prices and indicators in AI market context")
+    ai_context_cache_size: int = Field(default=256, description="Maximum cached market summaries, one per series, indicator parameters and token budget")
     
     # CEX Configuration
     binance_api_key: Optional[str] = Field(default=None, description="Binance API key")
     binance_secret: Optional[str] = Field(default=None, description="Binance secret key")
     
+    # CEX Venues
+    cex_venues: List[str] = Field(default=["binance"], description="ccxt exchange ids available to market data tools")
+    venue_max_concurrency: int = Field(default=8, description="Maximum concurrent market data requests per venue")
+    cex_scheduler: bool = Field(default=True, description="Schedule Binance requests by endpoint weight instead of ccxt's even spacing")
+    cex_weight_per_minute: int = Field(default=6000, description="Binance request weight budget per minute")
+    cex_orders_per_10s: int = Field(default=100, description="Binance order budget per 10 seconds")
+    cex_order_weight_reserve: float = Field(default=0.1, description="Share of the weight budget only orders may use")
+    cex_ticker_batch_ms: float = Field(default=0.0, description="Window in ms for joining single-symbol price requests into one batch; every uncached request waits this long (0 disables)")
+    
+    # Market Data Cache
+    candle_cache_size: int = Field(default=1000, description="Maximum candles kept per cached OHLCV series")
+    candle_cache_series: int = Field(default=256, description="Maximum OHLCV series kept in the candle cache")
+    indicator_cache_states: int = Field(default=512, description="Maximum incremental indicator states kept, one per series and parameter set")
+    candle_refresh_seconds: float = Field(default=1.0, description="Minimum seconds between exchange refreshes of a cached series")
+    price_cache_ttl_seconds: float = Field(default=0.5, description="Seconds a fetched ticker price is served from cache")
+    candle_history_dir: str = Field(default="data/candles", description="Directory for backfilled on-disk candle history")
+    
+    # Market Data Streaming
+    market_stream: bool = Field(default=False, description="Stream live Binance tickers, trades and order books over websockets")
+    market_stream_symbols: List[str] = Field(default=[], description="Symbols subscribed by the market data stream")
+    market_stream_url: str = Field(default="wss://stream.binance.com:9443/stream", description="Binance combined stream websocket endpoint")
+    
+    # Backtesting
+    backtest_workers: int = Field(default=0, description="Worker processes for backtest sweeps (0 = CPU count)")
+    backtest_fee_rate: float = Field(default=0.001, description="Fee charged per unit of traded notional in backtests")
+    backtest_slippage_bps: float = Field(default=5.0, description="Slippage in basis points applied to backtest fills")
+    backtest_max_runs: int = Field(default=10000, description="Maximum parameter combinations one backtest grid may expand to")
+    
+    # News Trading
+    news_dedup_threshold: float = Field(default=0.8, description="Estimated headline similarity at or above which a news item is a duplicate")
+    news_dedup_window: int = Field(default=50000, description="Recent headlines remembered for duplicate detection")
+    news_minhash_permutations: int = Field(default=32, description="MinHash signature length for near-duplicate headlines")
+    news_minhash_bands: int = Field(default=8, description="LSH bands the MinHash signature is split into")
+    news_poll_seconds: float = Field(default=60.0, description="Seconds between polls of RSS and JSON news sources")
+    news_http_timeout: float = Field(default=10.0, description="Timeout in seconds for one news source request")
+    news_replay_dir: str = Field(default="data/news", description="Directory that news replay files are read from")
+    
     # Blockchain RPC
     ethereum_rpc_url: Optional[str] = Field(default=None, description="Ethereum RPC endpoint")
     solana_rpc_url: Optional[str] = Field(default="https://api.mainnet-beta.solana.com", description="Solana RPC endpoint")
+    solana_rpc_timeout: float = Field(default=10.0, description="Timeout in seconds for a single Solana RPC call")
+    solana_rpc_concurrency: int = Field(default=8, description="Maximum concurrent Solana RPC requests for bulk reads")
+    chain_head_tracking: bool = Field(default=True, description="Track chain heads in the background for configured chains")
+    solana_head_poll_seconds: float = Field(default=1.0, description="Seconds between Solana head polls")
+    evm_head_poll_seconds: float = Field(default=2.0, description="Seconds between EVM head polls")
+    evm_rpc_timeout: float = Field(default=10.0, description="Timeout in seconds for a single EVM RPC call")
+    evm_rpc_pool_size: int = Field(default=32, description="Maximum pooled HTTP connections to the EVM RPC node")
+    evm_rpc_batch_size: int = Field(default=100, description="Maximum calls per EVM JSON-RPC batch request")
+    evm_multicall_size: int = Field(default=500, description="Maximum subcalls per Multicall3 aggregate call")
+    evm_balance_mode: str = Field(default="batch", description="Bulk balance strategy: batch or multicall")
     
     # EVM Configuration
     evm_private_key: Optional[str] = Field(default=None, description="EVM private key")
     solana_private_key: Optional[str] = Field(default=None, description="Solana private key")
     
+    # Wallet store
+    wallet_db_path: str = Field(default="data/wallets.db", description="SQLite database holding generated wallets")
+    wallet_encryption_key: Optional[str] = Field(default=None, description="Fernet key encrypting stored private keys (generated next to the database if unset)")
+    wallet_page_size: int = Field(default=100, description="Default number of wallets per listing page")
+    wallet_gen_workers: int = Field(default=0, description="Worker processes for bulk wallet generation (0 = one per CPU)")
+    wallet_gen_batch_size: int = Field(default=1000, description="Wallets generated and inserted per batch")
+    wallet_balance_ttl_seconds: float = Field(default=10.0, description="Seconds a fetched wallet balance is served from cache")
+    wallet_balance_deadline_seconds: float = Field(default=0.8, description="Maximum seconds a wallet listing waits for live balances")
+    wallet_balance_chunk_size: int = Field(default=200, description="Wallet addresses per concurrent balance request")
+    wallet_balance_concurrency: int = Field(default=8, description="Maximum concurrent wallet balance requests")
+    
     # API Keys
     zeroex_api_key: Optional[str] = Field(default=None, description="0x API key")
     
+    # Server
+    warm_on_start: bool = Field(default=False, description="Connect exchanges and start chain head and alert polling at startup instead of on first use")
+    metrics_port: Optional[int] = Field(default=None, description="Port of the Prometheus /metrics endpoint; unset disables it")
+    metrics_host: str = Field(default="127.0.0.1", description="Address the Prometheus /metrics endpoint binds to")
+    
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
     
@@ -1,39 +1,59 @@
 """EVM blockchain client for Ethereum and compatible chains."""
 
-from typing import Dict, Any, Optional
-from web3 import Web3
+import asyncio
+import itertools
+from typing import Dict, Any, List, Optional
+
+import aiohttp
+from eth_abi import decode, encode
+from web3 import AsyncWeb3, AsyncHTTPProvider
 from eth_account import Account
 from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from ..metrics import get_metrics
 
 log = get_logger(__name__)
 settings = get_settings()
 
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+AGGREGATE3_SELECTOR = "82ad56cb"
+GET_ETH_BALANCE_SELECTOR = "4d2301cc"
+BALANCE_OF_SELECTOR = "70a08231"
+NATIVE = "ETH"
+
 
 class EVMClient:
-    """EVM blockchain client for Ethereum operations."""
+    """EVM blockchain client for Ethereum operations.
+    
+    Uses web3's async HTTP provider over one shared aiohttp session, so RPC
+    calls never block the event loop and reuse keep-alive connections.
+    Construction does no network I/O; the session is opened on first use.
+    """
     
-    def __init__(self):
+    def __init__(self, rpc_url: Optional[str] = None):
         """Initialize the EVM client."""
+        self.rpc_url = rpc_url or settings.ethereum_rpc_url
         self.w3 = None
         self.account = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
         self._initialize_connection()
     
     def _initialize_connection(self):
-        """Initialize the Web3 connection."""
-        if not settings.ethereum_rpc_url:
+        """Initialize the Web3 provider without contacting the node."""
+        if not self.rpc_url:
             log.warning("Ethereum RPC URL not configured")
             return
         
         try:
-            self.w3 = Web3(Web3.HTTPProvider(settings.ethereum_rpc_url))
-            if self.w3.is_connected():
-                log.info("Ethereum connection established")
-            else:
-                log.error("Failed to connect to Ethereum")
-                self.w3 = None
+            self.w3 = AsyncWeb3(AsyncHTTPProvider(
+                self.rpc_url,
+                request_kwargs={"timeout": aiohttp.ClientTimeout(total=settings.evm_rpc_timeout)},
+            ))
+            log.info("Ethereum provider initialized")
         except Exception as e:
             log.error(f"Failed to initialize Ethereum connection: {e}")
             self.w3 = None
@@ -47,6 +67,32 @@ class EVMClient:
                 log.error(f"Failed to initialize EVM account: {e}")
                 self.account = None
     
+    async def _ensure_session(self) -> None:
+        """Open the pooled keep-alive session and hand it to the provider."""
+        if self._session is not None and not self._session.closed:
+            return
+        
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=settings.evm_rpc_pool_size, keepalive_timeout=60
+                )
+                self._session = aiohttp.ClientSession(connector=connector)
+                await self.w3.provider.cache_async_session(self._session)
+    
+    async def _call(self, awaitable_factory, timeout: Optional[float] = None,
+                    method: str = "call"):
+        """Run one RPC call on the shared session under a per-call timeout.
+        
+        ``method`` names the call in the ``rpc`` latency metrics.
+        """
+        if not self.w3:
+            raise Exception("EVM client not initialized")
+        
+        await self._ensure_session()
+        with get_metrics().track("rpc", f"ethereum.{method}"):
+            return await asyncio.wait_for(awaitable_factory(), timeout or settings.evm_rpc_timeout)
+    
     async def test_connection(self) -> bool:
         """Test the connection to the EVM network."""
         if not self.w3:
@@ -54,7 +100,8 @@ class EVMClient:
         
         try:
             # Test connection by getting latest block
-            latest_block = self.w3.eth.get_block('latest')
+            latest_block = await self._call(lambda: self.w3.eth.get_block('latest'),
+                                            method="eth_getBlockByNumber")
             log.info(f"EVM connection test successful - Latest block: {latest_block.number}")
             return True
         except Exception as e:
@@ -67,7 +114,8 @@ class EVMClient:
             raise Exception("EVM client not initialized")
         
         try:
-            balance_wei = self.w3.eth.get_balance(address)
+            balance_wei = await self._call(lambda: self.w3.eth.get_balance(address),
+                                           method="eth_getBalance")
             balance_eth = self.w3.from_wei(balance_wei, 'ether')
             return {
                 "address": address,
@@ -78,3 +126,160 @@ class EVMClient:
         except Exception as e:
             log.error(f"Failed to get ETH balance for {address}: {e}")
             raise
+    
+    async def _batch(self, calls: List[Dict[str, Any]]) -> List[Optional[Any]]:
+        """Send JSON-RPC calls as one batch request; failed calls come back as None."""
+        await self._ensure_session()
+        ids = itertools.count()
+        payload = [
+            {"jsonrpc": "2.0", "id": next(ids), "method": c["method"], "params": c["params"]}
+            for c in calls
+        ]
+        timeout = aiohttp.ClientTimeout(total=settings.evm_rpc_timeout)
+        with get_metrics().track("rpc", "ethereum.batch") as timer:
+            async with self._session.post(self.rpc_url, json=payload, timeout=timeout) as response:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+            timer.failed = not isinstance(body, list)
+        
+        if not isinstance(body, list):
+            raise Exception(f"Node rejected batch request: {body.get('error', body)}")
+        
+        results: List[Optional[Any]] = [None] * len(calls)
+        for item in body:
+            if "error" in item:
+                log.debug(f"Batched RPC call {item.get('id')} failed: {item['error']}")
+            else:
+                results[item["id"]] = item.get("result")
+        return results
+    
+    async def _run_batches(self, calls: List[Dict[str, Any]]) -> List[Optional[Any]]:
+        """Split calls into node-sized batches and send them concurrently."""
+        size = settings.evm_rpc_batch_size
+        chunks = [calls[i:i + size] for i in range(0, len(calls), size)]
+        semaphore = asyncio.Semaphore(settings.evm_rpc_pool_size)
+        
+        async def _send(chunk):
+            async with semaphore:
+                return await self._batch(chunk)
+        
+        results = await asyncio.gather(*(_send(chunk) for chunk in chunks))
+        return [r for chunk in results for r in chunk]
+    
+    @staticmethod
+    def _balance_of_data(owner: str) -> str:
+        return "0x" + BALANCE_OF_SELECTOR + owner[2:].lower().rjust(64, "0")
+    
+    async def _balances_via_batch(self, addresses: List[str], assets: List[str]) -> List[Optional[int]]:
+        calls = []
+        for address in addresses:
+            for asset in assets:
+                if asset == NATIVE:
+                    calls.append({"method": "eth_getBalance", "params": [address, "latest"]})
+                else:
+                    calls.append({"method": "eth_call", "params": [
+                        {"to": asset, "data": self._balance_of_data(address)}, "latest"
+                    ]})
+        raw = await self._run_batches(calls)
+        return [int(r, 16) if r not in (None, "0x") else None for r in raw]
+    
+    async def _balances_via_multicall(self, addresses: List[str], assets: List[str]) -> List[Optional[int]]:
+        subcalls = []
+        for address in addresses:
+            owner = bytes.fromhex(address[2:].lower().rjust(64, "0"))
+            for asset in assets:
+                if asset == NATIVE:
+                    subcalls.append((MULTICALL3_ADDRESS, True, bytes.fromhex(GET_ETH_BALANCE_SELECTOR) + owner))
+                else:
+                    subcalls.append((asset, True, bytes.fromhex(BALANCE_OF_SELECTOR) + owner))
+        
+        size = settings.evm_multicall_size
+        chunks = [subcalls[i:i + size] for i in range(0, len(subcalls), size)]
+        calls = [
+            {"method": "eth_call", "params": [{
+                "to": MULTICALL3_ADDRESS,
+                "data": "0x" + AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [chunk]).hex()
+            }, "latest"]}
+            for chunk in chunks
+        ]
+        raw = await self._run_batches(calls)
+        
+        balances: List[Optional[int]] = []
+        for chunk, result in zip(chunks, raw):
+            if result in (None, "0x"):
+                balances.extend([None] * len(chunk))
+                continue
+            (decoded,) = decode(["(bool,bytes)[]"], bytes.fromhex(result[2:]))
+            for success, data in decoded:
+                balances.append(int.from_bytes(data, "big") if success and len(data) == 32 else None)
+        return balances
+    
+    async def get_balances(self, addresses: List[str], tokens: Optional[List[str]] = None,
+                           mode: Optional[str] = None) -> Dict[str, Any]:
+        """Get native and ERC-20 balances for many addresses in bulk.
+        
+        Reads are packed into JSON-RPC batch requests (``mode="batch"``) or
+        into Multicall3 ``aggregate3`` calls that are themselves batched
+        (``mode="multicall"``), chunked to the configured node limits.
+        Returns a compact table: ``balances[i][j]`` is the raw base-unit
+        balance of ``addresses[i]`` in ``assets[j]`` as a string, or None if
+        that read failed.
+        """
+        if not self.w3:
+            raise Exception("EVM client not initialized")
+        
+        mode = mode or settings.evm_balance_mode
+        if mode not in ("batch", "multicall"):
+            raise ValueError(f"Unknown balance mode {mode}")
+        for address in [*addresses, *(tokens or [])]:
+            if not AsyncWeb3.is_address(address):
+                raise ValueError(f"Invalid address {address}")
+        
+        assets = [NATIVE, *(tokens or [])]
+        try:
+            if mode == "multicall":
+                flat = await self._balances_via_multicall(addresses, assets)
+            else:
+                flat = await self._balances_via_batch(addresses, assets)
+        except Exception as e:
+            log.error(f"Failed to get balances for {len(addresses)} addresses: {e}")
+            raise
+        
+        width = len(assets)
+        return {
+            "assets": assets,
+            "addresses": addresses,
+            "balances": [
+                [None if b is None else str(b) for b in flat[i * width:(i + 1) * width]]
+                for i in range(len(addresses))
+            ]
+        }
+    
+    async def close(self):
+        """Close the pooled HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+            if self.w3:
+                await self.w3.provider.disconnect()
+            log.info("EVM connection closed")
+
+
+# Global client instance
+_client: Optional[EVMClient] = None
+
+
+def get_evm_client() -> EVMClient:
+    """Get the shared EVM client instance."""
+    global _client
+    if _client is None:
+        _client = EVMClient()
+    return _client
+
+
+async def close_evm_client() -> None:
+    """Close the shared EVM client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
@@ -0,0 +1 @@
+# Technical indicators package
@@ -0,0 +1,354 @@
+"""Vectorized technical indicators over OHLCV candle arrays."""
+
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from pydantic import BaseModel, Field
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+INDICATORS = (
+    "sma", "ema", "rsi", "atr", "bb_upper", "bb_middle", "bb_lower", "vwap",
+)
+
+
+class IndicatorParams(BaseModel):
+    """Indicator periods shared by the batch and incremental paths."""
+    sma_period: int = Field(default=20, ge=1)
+    ema_period: int = Field(default=20, ge=1)
+    rsi_period: int = Field(default=14, ge=1)
+    atr_period: int = Field(default=14, ge=1)
+    bb_period: int = Field(default=20, ge=1)
+    bb_std: float = Field(default=2.0, gt=0)
+    vwap_period: int = Field(default=20, ge=1)
+
+    @property
+    def warmup(self) -> int:
+        """Candles needed before every indicator has a value."""
+        return max(self.sma_period, self.ema_period, self.rsi_period + 1,
+                   self.atr_period, self.bb_period, self.vwap_period)
+
+    def key(self) -> Tuple:
+        return tuple(self.model_dump().values())
+
+
+# All functions below accept arrays shaped (..., T) and work along the last
+# axis, so a stack of equal-length series is computed in one call.
+
+def _rolling_sum(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= n:
+        c = np.cumsum(x, axis=-1)
+        out[..., n - 1] = c[..., n - 1]
+        out[..., n:] = c[..., n:] - c[..., :-n]
+    return out
+
+
+def _smooth(x: np.ndarray, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """Evaluate ``y[t] = (1 - alpha) * y[t-1] + alpha * x[t]`` from ``seed``.
+
+    The recurrence is solved in closed form within fixed-size blocks, so
+    the Python loop runs once per block rather than once per candle.
+    Blocks are sized to keep ``(1 - alpha) ** -block`` inside float range.
+    """
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        return x.copy()
+
+    block = int(max(1, min(256, 600 / -np.log(decay))))
+    out = np.empty(x.shape)
+    carry = np.asarray(seed, dtype=float)
+    for start in range(0, x.shape[-1], block):
+        chunk = x[..., start:start + block]
+        steps = np.arange(chunk.shape[-1])
+        acc = np.cumsum(chunk * decay ** -steps, axis=-1) * decay ** steps
+        y = decay ** (steps + 1) * carry[..., None] + alpha * acc
+        out[..., start:start + chunk.shape[-1]] = y
+        carry = y[..., -1]
+    return out
+
+
+def _seeded_smooth(x: np.ndarray, n: int, alpha: float) -> np.ndarray:
+    """Exponential smoothing seeded with the simple mean of the first ``n`` values."""
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] < n:
+        return out
+    seed = x[..., :n].mean(axis=-1)
+    out[..., n - 1] = seed
+    out[..., n:] = _smooth(x[..., n:], alpha, seed)
+    return out
+
+
+def sma(close: np.ndarray, n: int) -> np.ndarray:
+    """Simple moving average."""
+    return _rolling_sum(np.asarray(close, dtype=float), n) / n
+
+
+def ema(close: np.ndarray, n: int) -> np.ndarray:
+    """Exponential moving average seeded with the first ``n``-candle SMA."""
+    return _seeded_smooth(np.asarray(close, dtype=float), n, 2.0 / (n + 1))
+
+
+def _rsi_averages(close: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    change = np.diff(np.asarray(close, dtype=float), axis=-1)
+    gain = _seeded_smooth(np.clip(change, 0, None), n, 1.0 / n)
+    loss = _seeded_smooth(np.clip(-change, 0, None), n, 1.0 / n)
+    return gain, loss
+
+
+def _rsi_from_averages(gain, loss):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(loss == 0, 100.0, 100.0 - 100.0 / (1.0 + gain / loss))
+
+
+def rsi(close: np.ndarray, n: int = 14) -> np.ndarray:
+    """Wilder's relative strength index."""
+    close = np.asarray(close, dtype=float)
+    out = np.full(close.shape, np.nan)
+    gain, loss = _rsi_averages(close, n)
+    out[..., 1:] = np.where(np.isnan(gain), np.nan, _rsi_from_averages(gain, loss))
+    return out
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range; the first candle falls back to high - low."""
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    tr = high - low
+    prev = close[..., :-1]
+    tr[..., 1:] = np.maximum.reduce([
+        tr[..., 1:], np.abs(high[..., 1:] - prev), np.abs(low[..., 1:] - prev)
+    ])
+    return tr
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, n: int = 14) -> np.ndarray:
+    """Wilder's average true range."""
+    return _seeded_smooth(true_range(high, low, close), n, 1.0 / n)
+
+
+def bollinger(close: np.ndarray, n: int = 20,
+              k: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bollinger bands (upper, middle, lower) using population deviation."""
+    close = np.asarray(close, dtype=float)
+    middle = sma(close, n)
+    std = np.full(close.shape, np.nan)
+    if close.shape[-1] >= n:
+        std[..., n - 1:] = sliding_window_view(close, n, axis=-1).std(axis=-1)
+    return middle + k * std, middle, middle - k * std
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+         n: int = 20) -> np.ndarray:
+    """Rolling volume-weighted average of the typical price over ``n`` candles."""
+    high, low, close, volume = (np.asarray(a, dtype=float) for a in (high, low, close, volume))
+    typical = (high + low + close) / 3.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = _rolling_sum(typical * volume, n) / _rolling_sum(volume, n)
+    return np.where(np.isfinite(out), out, np.nan)
+
+
+def series_columns(series: Any, limit: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Copy the columns of a candle series (anything with OHLCV arrays) into NumPy."""
+    start = max(len(series.timestamp) - limit, 0) if limit else 0
+    columns = {"timestamp": np.array(series.timestamp[start:], dtype=np.int64)}
+    for name in ("open", "high", "low", "close", "volume"):
+        columns[name] = np.array(getattr(series, name)[start:], dtype=float)
+    return columns
+
+
+def compute_all(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray,
+                params: IndicatorParams) -> Dict[str, np.ndarray]:
+    """Compute every indicator for one series or a stack of equal-length series."""
+    upper, middle, lower = bollinger(close, params.bb_period, params.bb_std)
+    return {
+        "sma": sma(close, params.sma_period),
+        "ema": ema(close, params.ema_period),
+        "rsi": rsi(close, params.rsi_period),
+        "atr": atr(high, low, close, params.atr_period),
+        "bb_upper": upper,
+        "bb_middle": middle,
+        "bb_lower": lower,
+        "vwap": vwap(high, low, close, volume, params.vwap_period),
+    }
+
+
+def compute_batch(series: Dict[Hashable, Dict[str, np.ndarray]],
+                  params: IndicatorParams) -> Dict[Hashable, Dict[str, np.ndarray]]:
+    """Compute indicators for many series at once.
+
+    ``series`` maps a key to ``high``/``low``/``close``/``volume`` arrays.
+    Series of equal length are stacked into 2-D arrays so each group costs
+    one vectorized pass.
+    """
+    groups: Dict[int, List[Hashable]] = {}
+    for key, columns in series.items():
+        groups.setdefault(len(columns["close"]), []).append(key)
+
+    results: Dict[Hashable, Dict[str, np.ndarray]] = {}
+    for keys in groups.values():
+        stacked = {
+            field: np.vstack([np.asarray(series[k][field], dtype=float) for k in keys])
+            for field in ("high", "low", "close", "volume")
+        }
+        values = compute_all(stacked["high"], stacked["low"], stacked["close"],
+                             stacked["volume"], params)
+        for row, key in enumerate(keys):
+            results[key] = {name: array[row] for name, array in values.items()}
+    return results
+
+
+class IndicatorState:
+    """Running indicator state for one series, advanced one candle at a time.
+
+    Built from a vectorized pass over closed candles, then updated in O(period)
+    per new candle. ``peek`` evaluates the still-open candle without
+    committing it, so the open bar can change freely between refreshes.
+    """
+
+    def __init__(self, params: IndicatorParams, high: np.ndarray, low: np.ndarray,
+                 close: np.ndarray, volume: np.ndarray, timestamp: int):
+        """Initialize from closed candles; needs more than ``params.warmup`` of them."""
+        if len(close) <= params.warmup:
+            raise ValueError(f"Need more than {params.warmup} candles to build indicator state")
+
+        self.params = params
+        self.timestamp = timestamp
+        self.ema = float(ema(close, params.ema_period)[-1])
+        gain, loss = _rsi_averages(close, params.rsi_period)
+        self.avg_gain = float(gain[-1])
+        self.avg_loss = float(loss[-1])
+        self.atr = float(atr(high, low, close, params.atr_period)[-1])
+        self.prev_close = float(close[-1])
+        window = max(params.sma_period, params.bb_period)
+        self.closes = deque((float(c) for c in close[-window:]), maxlen=window)
+        flow_slice = slice(len(close) - params.vwap_period, None)
+        typical = (high[flow_slice] + low[flow_slice] + close[flow_slice]) / 3.0
+        self.flows = deque(
+            zip((typical * volume[flow_slice]).tolist(), volume[flow_slice].tolist()),
+            maxlen=params.vwap_period,
+        )
+
+    def _advance(self, high: float, low: float, close: float,
+                 volume: float) -> Tuple[Dict[str, float], Dict[str, Any]]:
+        p = self.params
+        ema_value = self.ema + 2.0 / (p.ema_period + 1) * (close - self.ema)
+
+        change = close - self.prev_close
+        avg_gain = self.avg_gain + (max(change, 0.0) - self.avg_gain) / p.rsi_period
+        avg_loss = self.avg_loss + (max(-change, 0.0) - self.avg_loss) / p.rsi_period
+        rsi_value = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+
+        tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        atr_value = self.atr + (tr - self.atr) / p.atr_period
+
+        closes = list(self.closes)[1:] + [close]
+        sma_value = float(np.mean(closes[-p.sma_period:]))
+        band = np.asarray(closes[-p.bb_period:])
+        middle, std = float(band.mean()), float(band.std())
+
+        flows = list(self.flows)[1:] + [((high + low + close) / 3.0 * volume, volume)]
+        flow_volume = sum(v for _, v in flows)
+        vwap_value = sum(pv for pv, _ in flows) / flow_volume if flow_volume else float("nan")
+
+        values = {
+            "sma": sma_value,
+            "ema": ema_value,
+            "rsi": rsi_value,
+            "atr": atr_value,
+            "bb_upper": middle + p.bb_std * std,
+            "bb_middle": middle,
+            "bb_lower": middle - p.bb_std * std,
+            "vwap": vwap_value,
+        }
+        updates = {
+            "ema": ema_value, "avg_gain": avg_gain, "avg_loss": avg_loss,
+            "atr": atr_value, "prev_close": close,
+        }
+        return values, updates
+
+    def peek(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Indicator values if this candle were appended, without changing state."""
+        return self._advance(high, low, close, volume)[0]
+
+    def commit(self, timestamp: int, high: float, low: float, close: float,
+               volume: float) -> Dict[str, float]:
+        """Append a closed candle to the state and return its indicator values."""
+        values, updates = self._advance(high, low, close, volume)
+        for name, value in updates.items():
+            setattr(self, name, value)
+        self.closes.append(close)
+        self.flows.append(((high + low + close) / 3.0 * volume, volume))
+        self.timestamp = timestamp
+        return values
+
+
+class IndicatorEngine:
+    """Latest indicator values per series, updated incrementally.
+
+    The last candle of a series is treated as still open. Closed candles are
+    folded into a cached ``IndicatorState`` as they arrive; the open candle
+    is only peeked. A series is rebuilt with one vectorized pass when it has
+    no state yet or its history no longer lines up with the state. At most
+    ``max_states`` states are kept, evicting the least recently used.
+    """
+
+    def __init__(self, max_states: Optional[int] = None):
+        """Initialize an empty engine."""
+        self.max_states = max_states or settings.indicator_cache_states
+        self._states: "OrderedDict[Tuple[Hashable, Tuple], IndicatorState]" = OrderedDict()
+
+    def latest(self, key: Hashable, timestamp: np.ndarray, high: np.ndarray, low: np.ndarray,
+               close: np.ndarray, volume: np.ndarray,
+               params: IndicatorParams) -> Dict[str, float]:
+        """Return indicator values at the newest candle of a series."""
+        if not len(close):
+            return {name: float("nan") for name in INDICATORS}
+        if len(close) <= params.warmup + 1:
+            values = compute_all(high, low, close, volume, params)
+            return {name: float(array[-1]) for name, array in values.items()}
+
+        state_key = (key, params.key())
+        state = self._states.get(state_key)
+        start = None
+        if state is not None:
+            self._states.move_to_end(state_key)
+            index = int(np.searchsorted(timestamp, state.timestamp))
+            # The state must end on a candle that is still closed in this series
+            if index < len(timestamp) - 1 and timestamp[index] == state.timestamp:
+                start = index + 1
+
+        if start is None:
+            closed = slice(0, len(close) - 1)
+            state = IndicatorState(params, high[closed], low[closed], close[closed],
+                                   volume[closed], int(timestamp[-2]))
+            self._states[state_key] = state
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
+        else:
+            for i in range(start, len(close) - 1):
+                state.commit(int(timestamp[i]), high[i], low[i], close[i], volume[i])
+
+        return state.peek(high[-1], low[-1], close[-1], volume[-1])
+
+    def forget(self, key: Hashable) -> None:
+        """Drop cached state for a series under every parameter set."""
+        for state_key in [k for k in self._states if k[0] == key]:
+            del self._states[state_key]
+
+
+# Global engine instance
+_engine: Optional[IndicatorEngine] = None
+
+
+def get_indicator_engine() -> IndicatorEngine:
+    """Get the global indicator engine instance."""
+    global _engine
+    if _engine is None:
+        _engine = IndicatorEngine()
+    return _engine
@@ -4,6 +4,8 @@ MCP Crypto Bot Server - Main entry point for the MCP server.
 """
 
 import asyncio
+import importlib
+import importlib.util
 import sys
 from contextlib import asynccontextmanager
 from typing import List, Dict, Any
@@ -13,106 +15,178 @@ from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from ..metrics import get_metrics
 from . import __version__
 
 log = get_logger(__name__)
 settings = get_settings()
+metrics = get_metrics()
 
-# Create FastMCP app instance
-app = FastMCP("mcp-crypto-bot")
+async def _shutdown(name: str, closer: str) -> None:
+    """Run a subsystem's closer, but only if something imported the subsystem."""
+    module = sys.modules.get(importlib.util.resolve_name(name, __package__))
+    if module is not None:
+        result = getattr(module, closer)()
+        if asyncio.iscoroutine(result):
+            await result
 
 # Add lifespan handler
 @asynccontextmanager
 async def lifespan(app):
-    """Application lifespan manager."""
+    """Application lifespan manager.
+    
+    Exchange and chain SDKs are imported by the first tool or resource
+    that needs them, so the server answers ``get_status`` without loading
+    any of them. ``WARM_ON_START`` connects the exchange pool and starts
+    head tracking and alert polling up front instead.
+    """
     log.info("Starting MCP Crypto Bot server...")
     
-    # Initialize Telegram bot if configured
-    if settings.telegram_bot_token:
+    if settings.warm_on_start:
+        from ..cex.pool import get_exchange_pool
+        exchange_pool = get_exchange_pool()
+        await exchange_pool.warm()
+        if settings.chain_head_tracking:
+            from ..chain_heads import start_head_trackers
+            await start_head_trackers()
+        from ..alerts.engine import get_alert_engine
+        await get_alert_engine().start(await exchange_pool.get())
+    
+    # Serve metrics to Prometheus if a port is configured
+    if settings.metrics_port is not None:
         try:
-            from ..telegram.bot import TelegramBot
-            telegram_bot = TelegramBot()
-            await telegram_bot.start()
-            log.info("Telegram bot started successfully")
+            from ..metrics import start_metrics_server
+            await start_metrics_server()
+        except Exception as e:
+            log.error(f"Failed to start metrics endpoint: {e}")
+    
+    # Start the live market data stream if enabled
+    market_stream = None
+    if settings.market_stream and settings.market_stream_symbols:
+        try:
+            from ..cex.pool import get_exchange_pool
+            from ..cex.scheduler import MARKET_DATA
+            from ..cex.streaming import MarketStream
+            client = await get_exchange_pool().get("binance")
+            market_stream = MarketStream(
+                settings.market_stream_symbols,
+                snapshot=lambda symbol: client.request(MARKET_DATA, "fetch_order_book", symbol, 1000),
+            )
+            await market_stream.start()
+            client.stream = market_stream
+        except Exception as e:
+            log.error(f"Failed to start market stream: {e}")
+            market_stream = None
+    
+    # Start the Telegram bot in the background if configured; python-telegram-bot
+    # is imported on a worker thread so the server can answer meanwhile
+    telegram: Dict[str, Any] = {}
+    
+    async def start_telegram():
+        try:
+            module = await asyncio.to_thread(importlib.import_module, "..telegram.bot", __package__)
+            telegram["bot"] = module.TelegramBot()
+            await telegram["bot"].start()
+            from ..alerts.engine import get_alert_engine
+            get_alert_engine().notify = telegram["bot"].notify_alert
         except Exception as e:
             log.error(f"Failed to start Telegram bot: {e}")
     
-    yield
+    telegram_start = asyncio.create_task(start_telegram()) if settings.telegram_bot_token else None
     
-    # Cleanup
-    log.info("Shutting down MCP Crypto Bot server...")
+    try:
+        yield
+    finally:
+        # Cleanup, skipping subsystems that were never used
+        log.info("Shutting down MCP Crypto Bot server...")
+        if market_stream:
+            await market_stream.stop()
+        await _shutdown("..chain_heads", "stop_head_trackers")
+        await _shutdown("..alerts.engine", "stop_alert_engine")
+        if telegram_start:
+            telegram_start.cancel()
+            await asyncio.gather(telegram_start, return_exceptions=True)
+        if "bot" in telegram:
+            await telegram["bot"].stop()
+        for name, closer in (
+            ("..cex.pool", "close_exchange_pool"),
+            ("..evm.evm_client", "close_evm_client"),
+            ("..solana.solana_client", "close_solana_client"),
+            ("..backtest.engine", "shutdown_backtest_executor"),
+            ("..wallets.bulk", "shutdown_wallet_executor"),
+            ("..wallets.store", "close_wallet_store"),
+            ("..risk.ledger", "close_risk_ledger"),
+            ("..ai.engine", "close_ai_engine"),
+            ("..metrics", "stop_metrics_server"),
+        ):
+            await _shutdown(name, closer)
 
-app.lifespan = lifespan
+# Create FastMCP app instance
+app = FastMCP("mcp-crypto-bot", lifespan=lifespan)
 
-# Add resources
+# Add resources; each is timed, with handled failures counted as errors
 @app.resource("wallets://")
 async def list_wallets() -> List[Dict[str, Any]]:
-    """List all available wallets (EVM and Solana)."""
-    wallets = []
-    
-    try:
-        # Get EVM wallets
-        from ..wallets.evm_wallets import EVMWalletManager
-        evm_manager = EVMWalletManager()
-        evm_wallets = await evm_manager.list_wallets()
-        for wallet in evm_wallets:
-            wallets.append({
-                "id": wallet["id"],
-                "chain": "evm",
-                "address": wallet["address"],
-                "balance": wallet.get("balance", "0")
-            })
-    except Exception as e:
-        log.error(f"Failed to list EVM wallets: {e}")
-    
-    try:
-        # Get Solana wallets
-        from ..wallets.sol_wallets import SolWalletManager
-        sol_manager = SolWalletManager()
-        sol_wallets = await sol_manager.list_wallets()
-        for wallet in sol_wallets:
-            wallets.append({
-                "id": wallet["id"],
-                "chain": "solana",
-                "address": wallet["address"],
-                "balance": wallet.get("balance", "0")
-            })
-    except Exception as e:
-        log.error(f"Failed to list Solana wallets: {e}")
+    """List the first page of stored wallets (EVM and Solana) with live balances.
     
-    return wallets
+    Balances for all chains are fetched concurrently under a deadline;
+    entries that could not be refreshed in time are marked ``stale``. Use
+    the ``list_wallets`` tool to page through larger stores.
+    """
+    with metrics.track("resource", "wallets://") as timer:
+        try:
+            from ..wallets.store import get_wallet_store
+            from ..wallets.balances import get_balance_service
+            page = await get_wallet_store().list()
+            return await get_balance_service().enrich(page["wallets"])
+        except Exception as e:
+            timer.failed = True
+            log.error(f"Failed to list wallets: {e}")
+            return []
 
 @app.resource("candles://{venue}/{symbol}/{timeframe}")
 async def ohlcv_resource(venue: str, symbol: str, timeframe: str) -> List[Dict[str, Any]]:
     """Get OHLCV data for a specific venue, symbol, and timeframe."""
-    try:
-        from ..cex.ccxt_client import CCXTClient
-        client = CCXTClient()
-        
-        # Get OHLCV data
-        ohlcv_data = await client.get_ohlcv(symbol, timeframe, limit=100)
-        
-        # Convert to resource format
-        candles = []
-        for candle in ohlcv_data:
-            candles.append({
-                "timestamp": candle[0],
-                "open": candle[1],
-                "high": candle[2],
-                "low": candle[3],
-                "close": candle[4],
-                "volume": candle[5]
-            })
-        
-        return candles
-    except Exception as e:
-        log.error(f"Failed to get OHLCV data for {venue}/{symbol}/{timeframe}: {e}")
-        return []
+    with metrics.track("resource", "candles://") as timer:
+        try:
+            from ..cex.candles import get_candle_store
+            from ..cex.pool import get_exchange_pool
+            client = await get_exchange_pool().get(venue)
+            
+            # Serve from the incremental candle cache
+            series = await get_candle_store().get(client, venue, symbol, timeframe, limit=100)
+            return series.to_dicts(limit=100)
+        except Exception as e:
+            timer.failed = True
+            log.error(f"Failed to get OHLCV data for {venue}/{symbol}/{timeframe}: {e}")
+            return []
+
+@app.resource("orderbook://{venue}/{symbol}")
+async def orderbook_resource(venue: str, symbol: str) -> Dict[str, Any]:
+    """Get the top of the order book, live from the stream when available."""
+    with metrics.track("resource", "orderbook://") as timer:
+        try:
+            from ..cex.pool import get_exchange_pool
+            client = await get_exchange_pool().get(venue)
+            return await client.get_order_book(symbol, depth=20)
+        except Exception as e:
+            timer.failed = True
+            log.error(f"Failed to get order book for {venue}/{symbol}: {e}")
+            return {}
+
+@app.resource("metrics://")
+async def metrics_resource() -> Dict[str, Any]:
+    """Get call and cache metrics for this server.
+    
+    Latency quantiles, in-flight and error counts per tool, resource and
+    outbound exchange, RPC or AI call, and hit ratios per cache.
+    """
+    return metrics.snapshot()
 
-# Register all existing tools from mcp_tools
+# Register all existing tools from mcp_tools, timed per tool
 from ..mcp_tools import tools
 for tool_name, tool_func in tools.items():
-    app.tool(tool_name)(tool_func)
+    app.tool(tool_name)(metrics.instrument("tool", tool_name)(tool_func))
 
 async def main():
     """Main entry point for the MCP server."""
@@ -132,4 +206,9 @@ async def main():
     await app.run()
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if "--profile-startup" in sys.argv[1:]:
+        # Report per-module import cost instead of serving
+        from .startup import print_profile
+        print_profile()
+    else:
+        asyncio.run(main())
\ No newline at end of file
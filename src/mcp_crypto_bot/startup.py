@@ -0,0 +1,73 @@
+"""Startup profile: what importing the MCP server costs, module by module."""
+
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict
+
+SERVER_MODULE = "src.mcp_crypto_bot.server"
+
+# SDKs that stay out of startup; the tools that need them import them on first use
+HEAVY_MODULES = (
+    "aiohttp", "ccxt", "eth_account", "feedparser", "numpy", "solana", "solders",
+    "telegram", "textblob", "web3",
+)
+
+_IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile_imports(module: str = SERVER_MODULE, top: int = 15) -> Dict[str, Any]:
+    """Import ``module`` in a fresh interpreter under ``-X importtime``.
+
+    Returns the total import time, self time per top-level package, the
+    ``top`` slowest modules by cumulative time and which of
+    ``HEAVY_MODULES`` were loaded along the way. Times are milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=Path(__file__).resolve().parents[2], capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    packages: Dict[str, float] = defaultdict(float)
+    modules = []
+    total = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        packages[name.split(".")[0]] += int(self_us) / 1000
+        modules.append((name, int(cumulative_us) / 1000))
+        if len(indent) == 1:
+            total += int(cumulative_us) / 1000
+
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return {
+        "module": module,
+        "total_ms": round(total, 1),
+        "packages": {
+            name: round(ms, 1)
+            for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+        "slowest": [{"module": name, "cumulative_ms": round(ms, 1)} for name, ms in modules[:top]],
+        "heavy": sorted(name for name in HEAVY_MODULES if name in packages),
+    }
+
+
+def print_profile(module: str = SERVER_MODULE, top: int = 15) -> None:
+    """Print the import profile of ``module`` as plain text tables."""
+    profile = profile_imports(module, top)
+    print(f"Import of {profile['module']}: {profile['total_ms']:.1f} ms")
+    print(f"Heavy SDKs loaded: {', '.join(profile['heavy']) or 'none'}")
+    print()
+    print(f"{'package':<32}{'self ms':>10}")
+    for name, ms in list(profile["packages"].items())[:top]:
+        print(f"{name:<32}{ms:>10.1f}")
+    print()
+    print(f"{'module':<56}{'cumulative ms':>14}")
+    for entry in profile["slowest"]:
+        print(f"{entry['module']:<56}{entry['cumulative_ms']:>14.1f}")
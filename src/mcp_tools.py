@@ -1,6 +1,6 @@
 """MCP Tools definitions for the Crypto Bot."""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
 from loguru import logger
 
@@ -66,8 +66,8 @@ async def test_connection() -> Dict[str, Any]:
     # Test Binance connection
     if settings.binance_api_key:
         try:
-            from .cex.ccxt_client import CCXTClient
-            client = CCXTClient()
+            from .cex.pool import get_exchange_pool
+            client = await get_exchange_pool().get()
             await client.test_connection()
             results["binance"] = {"status": "connected", "error": None}
         except Exception as e:
@@ -78,10 +78,16 @@ async def test_connection() -> Dict[str, Any]:
     # Test Ethereum connection
     if settings.ethereum_rpc_url:
         try:
-            from .evm.evm_client import EVMClient
-            client = EVMClient()
-            await client.test_connection()
-            results["ethereum"] = {"status": "connected", "error": None}
+            from .chain_heads import get_head_tracker
+            tracker = get_head_tracker("ethereum")
+            if tracker and tracker.is_fresh:
+                # The head tracker polled the node moments ago
+                results["ethereum"] = {"status": "connected", "error": None, "head": tracker.head}
+            else:
+                from .evm.evm_client import get_evm_client
+                client = get_evm_client()
+                await client.test_connection()
+                results["ethereum"] = {"status": "connected", "error": None}
         except Exception as e:
             results["ethereum"] = {"status": "failed", "error": str(e)}
     else:
@@ -90,10 +96,16 @@ async def test_connection() -> Dict[str, Any]:
     # Test Solana connection
     if settings.solana_rpc_url:
         try:
-            from .solana.solana_client import SolanaClient
-            client = SolanaClient()
-            await client.test_connection()
-            results["solana"] = {"status": "connected", "error": None}
+            from .chain_heads import get_head_tracker
+            tracker = get_head_tracker("solana")
+            if tracker and tracker.is_fresh:
+                # The head tracker polled the node moments ago
+                results["solana"] = {"status": "connected", "error": None, "head": tracker.head}
+            else:
+                from .solana.solana_client import get_solana_client
+                client = get_solana_client()
+                await client.test_connection()
+                results["solana"] = {"status": "connected", "error": None}
         except Exception as e:
             results["solana"] = {"status": "failed", "error": str(e)}
     else:
@@ -104,9 +116,609 @@ async def test_connection() -> Dict[str, Any]:
         "data": results
     }
 
+async def get_prices(symbols: List[str], venue: str = "binance") -> Dict[str, Any]:
+    """Get current prices for several symbols in one exchange request."""
+    try:
+        from .cex.pool import get_exchange_pool
+        
+        client = await get_exchange_pool().get(venue)
+        prices = await client.get_prices(symbols)
+        return {
+            "success": True,
+            "data": {
+                "prices": prices,
+                "missing": [symbol for symbol in symbols if symbol not in prices]
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to get prices on {venue}: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_evm_balances(addresses: List[str], tokens: Optional[List[str]] = None,
+                           mode: Optional[str] = None) -> Dict[str, Any]:
+    """Get native and ERC-20 balances for many EVM addresses in bulk.
+    
+    ``tokens`` are ERC-20 contract addresses. ``mode`` is ``batch`` (JSON-RPC
+    batches) or ``multicall`` (Multicall3 aggregate calls).
+    """
+    try:
+        from .evm.evm_client import get_evm_client
+        
+        data = await get_evm_client().get_balances(addresses, tokens, mode)
+        return {
+            "success": True,
+            "data": data
+        }
+    except Exception as e:
+        log.error(f"Failed to get EVM balances: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_solana_balances(pubkeys: List[str], mints: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Get SOL and SPL token balances for many Solana accounts in bulk.
+    
+    ``mints`` are SPL token mint addresses; balances are read from each
+    owner's associated token account.
+    """
+    try:
+        from .solana.solana_client import get_solana_client
+        
+        client = get_solana_client()
+        data = {"sol": await client.get_sol_balances(pubkeys)}
+        if mints:
+            data["tokens"] = await client.get_token_balances(pubkeys, mints)
+        return {
+            "success": True,
+            "data": data
+        }
+    except Exception as e:
+        log.error(f"Failed to get Solana balances: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_chain_heads() -> Dict[str, Any]:
+    """Get the latest tracked block/slot for each chain without contacting the nodes.
+    
+    Trackers start on the first call unless the server started them, and
+    that call waits briefly for their first heads.
+    """
+    try:
+        from .chain_heads import get_head_tracker, start_head_trackers
+        
+        if settings.chain_head_tracking:
+            await start_head_trackers(wait=settings.evm_rpc_timeout)
+        heads = {}
+        for chain in ("ethereum", "solana"):
+            tracker = get_head_tracker(chain)
+            heads[chain] = tracker.snapshot() if tracker else None
+        return {
+            "success": True,
+            "data": heads
+        }
+    except Exception as e:
+        log.error(f"Failed to get chain heads: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def list_wallets(chain: Optional[str] = None, limit: Optional[int] = None,
+                       cursor: Optional[int] = None, balances: bool = False) -> Dict[str, Any]:
+    """List stored wallets one page at a time.
+    
+    ``chain`` is ``evm`` or ``solana``; pass the returned ``next_cursor`` to
+    fetch the next page. With ``balances`` each wallet gets its native
+    balance, fetched concurrently under a deadline and marked ``stale``
+    when it could not be refreshed in time.
+    """
+    try:
+        from .wallets.store import get_wallet_store
+        
+        store = get_wallet_store()
+        page = await store.list(chain, limit, cursor)
+        if balances:
+            from .wallets.balances import get_balance_service
+            page["wallets"] = await get_balance_service().enrich(page["wallets"])
+        page["total"] = await store.count(chain)
+        return {
+            "success": True,
+            "data": page
+        }
+    except Exception as e:
+        log.error(f"Failed to list wallets: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def create_wallets(n: int, chain: str = "evm") -> Dict[str, Any]:
+    """Generate ``n`` new wallets for ``evm`` or ``solana`` in bulk.
+    
+    Keys are generated across worker processes and stored in batches;
+    returns the id range created and the achieved throughput.
+    """
+    try:
+        from .wallets.bulk import create_wallets as generate
+        
+        report = await generate(chain, n)
+        return {
+            "success": True,
+            "data": report
+        }
+    except Exception as e:
+        log.error(f"Failed to create {n} {chain} wallets: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_wallet(wallet_id: Optional[str] = None, address: Optional[str] = None) -> Dict[str, Any]:
+    """Look up a stored wallet by id or address."""
+    try:
+        from .wallets.store import get_wallet_store
+        
+        store = get_wallet_store()
+        if wallet_id:
+            wallet = await store.get(wallet_id)
+        elif address:
+            wallet = await store.get_by_address(address)
+        else:
+            raise ValueError("Pass a wallet_id or an address")
+        if wallet is None:
+            raise ValueError(f"Wallet {wallet_id or address} not found")
+        return {
+            "success": True,
+            "data": wallet
+        }
+    except Exception as e:
+        log.error(f"Failed to get wallet: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def query_ai(prompt: str, context: Optional[Dict[str, Any]] = None,
+                   provider: Optional[str] = None, hedge: Optional[bool] = None,
+                   markets: Optional[List[Dict[str, str]]] = None,
+                   budget_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """Ask the configured AI providers for an analysis.
+    
+    Identical prompt/context pairs are answered from a short-lived cache.
+    With ``hedge`` a slow primary provider is raced against a second one.
+    ``markets`` lists ``venue``/``symbol``/``timeframe`` keys whose compact
+    market context is added under ``context["market"]``.
+    """
+    try:
+        from .ai.engine import get_ai_engine
+        
+        if markets:
+            from .ai.context import market_context
+            series_keys = [(key["venue"], key["symbol"], key["timeframe"]) for key in markets]
+            context = {**(context or {}),
+                       "market": await market_context(series_keys, budget=budget_tokens,
+                                                     caller="query_ai")}
+        
+        result = await get_ai_engine().query(prompt, context, provider, hedge)
+        return {
+            "success": True,
+            "data": result
+        }
+    except Exception as e:
+        log.error(f"AI query failed: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_ai_context(keys: List[Dict[str, str]], budget_tokens: Optional[int] = None,
+                         params: Optional[Dict[str, Any]] = None,
+                         include_positions: bool = True) -> Dict[str, Any]:
+    """Get the compact market context that AI prompts are built from.
+    
+    Each key is a mapping with ``venue``, ``symbol`` and ``timeframe``.
+    Every series is summarized as downsampled closes, an indicator snapshot
+    and position deltas, shrunk to fit ``budget_tokens`` and cached until
+    its next candle closes.
+    """
+    try:
+        from .ai.context import market_context
+        from .indicators.engine import IndicatorParams
+        
+        series_keys = [(key["venue"], key["symbol"], key["timeframe"]) for key in keys]
+        context = await market_context(series_keys, IndicatorParams(**(params or {})),
+                                       budget_tokens, include_positions, caller="get_ai_context")
+        return {
+            "success": True,
+            "data": context
+        }
+    except Exception as e:
+        log.error(f"Failed to build AI context: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def create_price_alert(symbol: str, threshold: float, direction: Optional[str] = None,
+                             chat_id: Optional[int] = None, note: Optional[str] = None) -> Dict[str, Any]:
+    """Alert a Telegram chat once ``symbol`` trades at or beyond ``threshold``.
+    
+    ``direction`` is ``above`` or ``below``; when omitted it is taken from
+    the current price. Alerts go to the owner's chat unless ``chat_id`` is
+    given.
+    """
+    try:
+        from .alerts.engine import add_alert
+        
+        alert = await add_alert(chat_id or settings.owner_telegram_id, symbol, threshold,
+                                direction, note)
+        return {
+            "success": True,
+            "data": alert
+        }
+    except Exception as e:
+        log.error(f"Failed to create price alert: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def list_price_alerts(chat_id: Optional[int] = None) -> Dict[str, Any]:
+    """List pending price alerts, optionally for one chat."""
+    try:
+        from .alerts.engine import get_alert_engine
+        
+        engine = get_alert_engine()
+        return {
+            "success": True,
+            "data": {
+                "alerts": engine.list(chat_id),
+                "triggered": engine.triggered
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to list price alerts: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def cancel_price_alert(alert_id: int) -> Dict[str, Any]:
+    """Cancel a pending price alert."""
+    try:
+        from .alerts.engine import get_alert_engine
+        
+        if not get_alert_engine().cancel(alert_id):
+            raise ValueError(f"No pending alert {alert_id}")
+        return {
+            "success": True,
+            "data": {"id": alert_id}
+        }
+    except Exception as e:
+        log.error(f"Failed to cancel price alert: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_risk_status() -> Dict[str, Any]:
+    """Get today's realized PnL, per-symbol exposure and in-flight order notional."""
+    try:
+        from .risk.ledger import get_risk_ledger
+        
+        return {
+            "success": True,
+            "data": get_risk_ledger().summary()
+        }
+    except Exception as e:
+        log.error(f"Failed to get risk status: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_portfolio(refresh: bool = True, include_wallets: bool = True,
+                        top: int = 50) -> Dict[str, Any]:
+    """Get the combined CEX and on-chain portfolio, marked to market.
+    
+    With ``refresh`` the exchange balances, stored wallet balances and
+    prices are re-read first; only positions whose quantity or price
+    changed are revalued. ``top`` limits the returned position table.
+    """
+    try:
+        from .portfolio.engine import get_portfolio_engine
+        
+        engine = get_portfolio_engine()
+        changed = 0
+        if refresh:
+            from .cex.pool import get_exchange_pool
+            pool = get_exchange_pool()
+            if settings.binance_api_key:
+                changed += await engine.sync_exchange(await pool.get())
+            
+            if include_wallets:
+                from .wallets.store import get_wallet_store
+                from .wallets.balances import get_balance_service
+                store = get_wallet_store()
+                wallets, cursor = [], None
+                while True:
+                    page = await store.list(limit=1000, cursor=cursor)
+                    wallets.extend(page["wallets"])
+                    cursor = page["next_cursor"]
+                    if cursor is None:
+                        break
+                if wallets:
+                    changed += engine.apply_wallet_balances(
+                        await get_balance_service().enrich(wallets)
+                    )
+            
+            changed += await engine.refresh_prices(await pool.get("binance"))
+        
+        summary = engine.summary()
+        summary["changed"] = changed
+        summary["table"] = engine.positions()[:top]
+        return {
+            "success": True,
+            "data": summary
+        }
+    except Exception as e:
+        log.error(f"Failed to get portfolio: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_candles_batch(keys: List[Dict[str, str]], limit: int = 100) -> Dict[str, Any]:
+    """Get OHLCV candles for many venue/symbol/timeframe keys in one call.
+    
+    Each key is a mapping with ``venue``, ``symbol`` and ``timeframe``.
+    Series are fetched concurrently; keys that fail are listed under
+    ``errors`` and the remaining candles are still returned.
+    """
+    try:
+        from .cex.candles import get_candle_store
+        from .cex.pool import get_exchange_pool
+        
+        series_keys = [(key["venue"], key["symbol"], key["timeframe"]) for key in keys]
+        data = await get_candle_store().get_many(get_exchange_pool(), series_keys, limit=limit)
+        return {
+            "success": True,
+            "data": data
+        }
+    except Exception as e:
+        log.error(f"Failed to get candle batch: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def compute_indicators(keys: List[Dict[str, str]], params: Optional[Dict[str, Any]] = None,
+                             history: int = 0) -> Dict[str, Any]:
+    """Compute SMA/EMA/RSI/ATR/Bollinger/VWAP for many cached candle series.
+    
+    Each key is a mapping with ``venue``, ``symbol`` and ``timeframe``.
+    ``params`` overrides indicator periods. With ``history`` 0 only the
+    latest values are returned and updated incrementally between calls;
+    otherwise the last ``history`` values of every indicator are returned.
+    """
+    try:
+        import numpy as np
+        from .cex.candles import get_candle_store
+        from .cex.pool import get_exchange_pool
+        from .indicators.engine import (
+            IndicatorParams, compute_batch, get_indicator_engine, series_columns
+        )
+        
+        indicator_params = IndicatorParams(**(params or {}))
+        series_keys = [(key["venue"], key["symbol"], key["timeframe"]) for key in keys]
+        limit = max(settings.candle_cache_size, indicator_params.warmup + history + 1)
+        fetched = await get_candle_store().fetch_many(get_exchange_pool(), series_keys, limit=limit)
+        
+        columns = {}
+        errors = {}
+        for key, result in fetched.items():
+            if isinstance(result, BaseException):
+                errors["/".join(key)] = str(result)
+            else:
+                columns[key] = series_columns(result)
+        
+        def _clean(values):
+            return [None if np.isnan(v) else float(v) for v in values]
+        
+        indicators = {}
+        if history:
+            for key, values in compute_batch(columns, indicator_params).items():
+                indicators["/".join(key)] = {
+                    "timestamp": columns[key]["timestamp"][-history:].tolist(),
+                    **{name: _clean(array[-history:]) for name, array in values.items()}
+                }
+        else:
+            engine = get_indicator_engine()
+            for key, c in columns.items():
+                latest = engine.latest(key, c["timestamp"], c["high"], c["low"], c["close"],
+                                       c["volume"], indicator_params)
+                indicators["/".join(key)] = {
+                    "timestamp": int(c["timestamp"][-1]) if len(c["timestamp"]) else None,
+                    **dict(zip(latest, _clean(latest.values())))
+                }
+        
+        return {
+            "success": True,
+            "data": {
+                "indicators": indicators,
+                "errors": errors
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to compute indicators: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def backfill_candles(venue: str, symbol: str, timeframe: str, since: int,
+                           until: Optional[int] = None) -> Dict[str, Any]:
+    """Download historical candles into the on-disk history store.
+    
+    ``since`` and ``until`` are millisecond timestamps. Candles already on
+    disk are skipped, so re-running a backfill only fetches the gap. Stored
+    history only grows forward: a ``since`` earlier than the first stored
+    candle fails with "Range before stored history is not supported".
+    """
+    try:
+        from .cex.history import get_history_store
+        from .cex.pool import get_exchange_pool
+        
+        client = await get_exchange_pool().get(venue)
+        data = await get_history_store().backfill(client, symbol, timeframe, since, until)
+        return {
+            "success": True,
+            "data": data
+        }
+    except Exception as e:
+        log.error(f"Failed to backfill {venue}/{symbol}/{timeframe}: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def get_candle_history(venue: str, symbol: str, timeframe: str, since: Optional[int] = None,
+                             until: Optional[int] = None, limit: int = 1000) -> Dict[str, Any]:
+    """Read stored candles with ``since <= timestamp < until`` from local disk."""
+    try:
+        from .cex.history import get_history_store
+        
+        candles = get_history_store().range(venue, symbol, timeframe, since, until)
+        total = len(candles)
+        if limit:
+            candles = candles.tail(limit)
+        return {
+            "success": True,
+            "data": {
+                "total": total,
+                "candles": candles.to_dicts()
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to read candle history for {venue}/{symbol}/{timeframe}: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def run_backtest(venue: str, symbol: str, timeframe: str, strategy: str,
+                       params: Optional[Dict[str, Any]] = None,
+                       grid: Optional[Dict[str, List[Any]]] = None,
+                       since: Optional[int] = None, until: Optional[int] = None,
+                       fee_rate: Optional[float] = None, slippage_bps: Optional[float] = None,
+                       sort_by: str = "sharpe", top: int = 10) -> Dict[str, Any]:
+    """Backtest a strategy over stored candle history.
+    
+    Pass ``params`` for a single run or ``grid`` (parameter name to list of
+    values) to sweep every combination, at most ``BACKTEST_MAX_RUNS`` of
+    them. Candles come from the on-disk history store, so run
+    ``backfill_candles`` first. Returns the ``top`` results ranked by
+    ``sort_by`` (sharpe, total_return, max_drawdown, trades, fees_paid or
+    exposure).
+    """
+    try:
+        from .backtest.engine import STRATEGIES, expand_grid, sweep
+        from .cex.history import get_history_store
+        from .indicators.engine import series_columns
+        
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy}, expected one of {sorted(STRATEGIES)}")
+        candles = get_history_store().range(venue, symbol, timeframe, since, until)
+        if len(candles) < 2:
+            raise ValueError(f"No stored history for {venue}/{symbol}/{timeframe}, run backfill_candles first")
+        
+        param_sets = expand_grid(grid) if grid else [params or {}]
+        results = await sweep(series_columns(candles), strategy, param_sets, fee_rate=fee_rate,
+                              slippage_bps=slippage_bps, sort_by=sort_by)
+        return {
+            "success": True,
+            "data": {
+                "candles": len(candles),
+                "runs": len(param_sets),
+                "results": results[:top]
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to run backtest for {venue}/{symbol}/{timeframe}: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
+async def replay_news(path: str, venue: str = "binance", limit: Optional[int] = None,
+                      min_score: float = 0.0, top: int = 20) -> Dict[str, Any]:
+    """Run the news pipeline over a JSON-lines replay file.
+    
+    ``path`` names a file inside ``NEWS_REPLAY_DIR``; paths leading out
+    of it are refused. Headlines are deduplicated, matched to the venue's markets and scored.
+    Returns the pipeline counters and throughput plus the ``top`` events
+    by absolute score.
+    """
+    try:
+        import heapq
+        from .cex.pool import get_exchange_pool
+        from .news_trading.pipeline import NewsPipeline, get_symbol_matcher
+        from .news_trading.sources import jsonl_source, replay_path
+        
+        path = replay_path(path)
+        matcher = await get_symbol_matcher(await get_exchange_pool().get(venue))
+        pipeline = NewsPipeline(matcher, min_score=min_score)
+        best: List = []
+        async for event in pipeline.run(jsonl_source(str(path), limit=limit)):
+            entry = (abs(event["score"]), pipeline.events, event)
+            if len(best) < top:
+                heapq.heappush(best, entry)
+            elif best and entry[:2] > best[0][:2]:
+                heapq.heapreplace(best, entry)
+        
+        return {
+            "success": True,
+            "data": {
+                "stats": pipeline.stats(),
+                "events": [event for *_, event in sorted(best, key=lambda e: e[:2], reverse=True)]
+            }
+        }
+    except Exception as e:
+        log.error(f"Failed to replay news: {e}")
+        return {
+            "success": False,
+            "error": str(e)
+        }
+
 # Export tools for FastMCP
 tools = {
     "get_status": get_status,
     "get_config": get_config,
     "test_connection": test_connection,
+    "get_prices": get_prices,
+    "get_evm_balances": get_evm_balances,
+    "get_solana_balances": get_solana_balances,
+    "get_chain_heads": get_chain_heads,
+    "list_wallets": list_wallets,
+    "create_wallets": create_wallets,
+    "get_wallet": get_wallet,
+    "get_portfolio": get_portfolio,
+    "get_risk_status": get_risk_status,
+    "create_price_alert": create_price_alert,
+    "list_price_alerts": list_price_alerts,
+    "cancel_price_alert": cancel_price_alert,
+    "query_ai": query_ai,
+    "get_ai_context": get_ai_context,
+    "get_candles_batch": get_candles_batch,
+    "compute_indicators": compute_indicators,
+    "backfill_candles": backfill_candles,
+    "get_candle_history": get_candle_history,
+    "run_backtest": run_backtest,
+    "replay_news": replay_news,
 }
\ No newline at end of file
@@ -0,0 +1,305 @@
+"""Latency, error and cache metrics for tools, resources and outbound calls."""
+
+import asyncio
+import bisect
+import functools
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .config.env import get_settings
+from .logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Upper bounds in seconds of the latency buckets: 0.1 ms to about 2 minutes,
+# four buckets per doubling
+BUCKETS: Tuple[float, ...] = tuple(0.0001 * 2 ** (i / 4) for i in range(81))
+
+QUANTILES = (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+
+# Call kinds, in the order they are reported
+KINDS = ("tool", "resource", "exchange", "rpc", "ai")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Latency counts in fixed log-spaced buckets.
+
+    Recording is a bisect and a few additions, and memory does not grow
+    with the number of samples. Quantiles are interpolated within their
+    bucket and clamped to the observed range, so they are accurate to
+    about one bucket width (19%).
+    """
+
+    __slots__ = ("counts", "count", "sum", "min", "max")
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        # The last bucket counts samples above the largest bound
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Latency in seconds at quantile ``q``, or None without samples."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = max(BUCKETS[i - 1] if i else 0.0, self.min)
+                upper = min(BUCKETS[i] if i < len(BUCKETS) else self.max, self.max)
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.max
+
+
+class CallStats:
+    """Latency, in-flight and error counts of one tool, resource or outbound call.
+
+    ``calls`` counts finished calls, failed ones included; cancelled calls
+    only leave ``in_flight`` and are counted in ``cancelled``.
+    """
+
+    __slots__ = ("latency", "calls", "errors", "cancelled", "in_flight")
+
+    def __init__(self):
+        """Initialize with no calls."""
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts and latency quantiles in milliseconds."""
+        data: Dict[str, Any] = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "in_flight": self.in_flight,
+            "mean_ms": round(self.latency.sum / self.calls * 1000, 3) if self.calls else None,
+        }
+        for label, q in QUANTILES:
+            value = self.latency.quantile(q)
+            data[f"{label}_ms"] = round(value * 1000, 3) if value is not None else None
+        return data
+
+
+class Timer:
+    """Context manager timing one call into a ``CallStats``.
+
+    Set ``failed`` inside the block to count a call that returned an error
+    rather than raising one.
+    """
+
+    __slots__ = ("stats", "started", "failed")
+
+    def __init__(self, stats: CallStats):
+        """Initialize an unstarted timer."""
+        self.stats = stats
+        self.started = 0.0
+        self.failed = False
+
+    def __enter__(self) -> "Timer":
+        self.stats.in_flight += 1
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        stats = self.stats
+        stats.in_flight -= 1
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            stats.cancelled += 1
+            return
+        stats.latency.record(time.perf_counter() - self.started)
+        stats.calls += 1
+        if exc_type is not None or self.failed:
+            stats.errors += 1
+
+
+class CacheStats:
+    """Hit and miss counts of one cache."""
+
+    __slots__ = ("hits", "misses")
+
+    def __init__(self):
+        """Initialize with no lookups."""
+        self.hits = 0
+        self.misses = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class Metrics:
+    """Registry of call and cache statistics, keyed by kind and name.
+
+    Kinds are ``tool`` and ``resource`` for what the MCP server serves and
+    ``exchange``, ``rpc`` and ``ai`` for outbound calls, named like
+    ``binance.fetch_ticker`` or ``solana.get_balance``.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self.calls: Dict[Tuple[str, str], CallStats] = {}
+        self.caches: Dict[str, CacheStats] = {}
+        self.started_at = time.time()
+
+    def stats(self, kind: str, name: str) -> CallStats:
+        """Statistics of one call, created on first use."""
+        stats = self.calls.get((kind, name))
+        if stats is None:
+            stats = self.calls[(kind, name)] = CallStats()
+        return stats
+
+    def track(self, kind: str, name: str) -> Timer:
+        """Time the enclosed call: ``with metrics.track("rpc", "ethereum.eth_call"):``."""
+        return Timer(self.stats(kind, name))
+
+    def instrument(self, kind: str, name: Optional[str] = None) -> Callable:
+        """Decorator timing every call of an async function.
+
+        A returned ``{"success": False, ...}`` counts as an error, like a
+        raised exception. The wrapper keeps the function's signature, so
+        MCP tool and resource registration sees the original parameters.
+        """
+        def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            stats = self.stats(kind, name or func.__name__)
+
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with Timer(stats) as timer:
+                    result = await func(*args, **kwargs)
+                    if isinstance(result, dict) and result.get("success") is False:
+                        timer.failed = True
+                    return result
+            return wrapper
+        return decorator
+
+    def record_cache(self, name: str, hit: bool) -> None:
+        """Count one lookup in the named cache."""
+        stats = self.caches.get(name)
+        if stats is None:
+            stats = self.caches[name] = CacheStats()
+        if hit:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every call and cache statistic, grouped by kind."""
+        calls: Dict[str, Dict[str, Any]] = {kind: {} for kind in KINDS}
+        for (kind, name), stats in sorted(self.calls.items()):
+            if stats.calls or stats.in_flight or stats.cancelled:
+                calls.setdefault(kind, {})[name] = stats.snapshot()
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "calls": calls,
+            "caches": {name: stats.snapshot() for name, stats in sorted(self.caches.items())},
+        }
+
+    def prometheus(self) -> str:
+        """Statistics in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# HELP mcp_call_duration_seconds Latency of tools, resources and outbound calls",
+            "# TYPE mcp_call_duration_seconds histogram",
+        ]
+        bounds = [f"{bound:.6g}" for bound in BUCKETS] + ["+Inf"]
+        items = sorted(self.calls.items())
+        for (kind, name), stats in items:
+            labels = f'kind="{kind}",name="{_escape(name)}"'
+            cumulative = 0
+            for bound, count in zip(bounds, stats.latency.counts):
+                cumulative += count
+                lines.append(f'mcp_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"mcp_call_duration_seconds_sum{{{labels}}} {stats.latency.sum:.6f}")
+            lines.append(f"mcp_call_duration_seconds_count{{{labels}}} {stats.latency.count}")
+
+        for metric, metric_type, help_text, field in (
+            ("mcp_call_errors_total", "counter", "Calls that raised or returned an error", "errors"),
+            ("mcp_call_cancelled_total", "counter", "Calls cancelled before finishing", "cancelled"),
+            ("mcp_calls_in_flight", "gauge", "Calls currently running", "in_flight"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {metric_type}")
+            for (kind, name), stats in items:
+                lines.append(f'{metric}{{kind="{kind}",name="{_escape(name)}"}} {getattr(stats, field)}')
+
+        for metric, help_text, field in (
+            ("mcp_cache_hits_total", "Cache lookups answered from memory", "hits"),
+            ("mcp_cache_misses_total", "Cache lookups that had to fetch", "misses"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in sorted(self.caches.items()):
+                lines.append(f'{metric}{{cache="{_escape(name)}"}} {getattr(stats, field)}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Global registry instance
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Get the shared metrics registry."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+# Prometheus endpoint runner, when METRICS_PORT is set
+_runner = None
+
+
+async def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None) -> int:
+    """Serve ``/metrics`` in the Prometheus text format; returns the bound port."""
+    global _runner
+    from aiohttp import web
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.Response(body=get_metrics().prometheus().encode(),
+                            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+    if _runner is None:
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        _runner = web.AppRunner(app, access_log=None)
+        await _runner.setup()
+        site = web.TCPSite(_runner, host or settings.metrics_host,
+                           settings.metrics_port if port is None else port)
+        await site.start()
+        log.info(f"Prometheus metrics served on {_runner.addresses[0]}")
+    return _runner.addresses[0][1]
+
+
+async def stop_metrics_server() -> None:
+    """Stop the Prometheus endpoint if it was started."""
+    global _runner
+    if _runner is not None:
+        await _runner.cleanup()
+        _runner = None
@@ -0,0 +1,146 @@
+"""Multi-pattern matching of news text to tradable exchange symbols."""
+
+import re
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..logging import get_logger
+
+log = get_logger(__name__)
+
+TOKEN_RE = re.compile(r"\$?[A-Za-z0-9]+")
+
+# Quote currencies tried in order when mapping an asset to a market
+DEFAULT_QUOTES = ("USDT", "USDC", "USD", "FDUSD", "BTC", "ETH")
+
+# Names that identify an asset even in lower case
+DEFAULT_ALIASES = {
+    "bitcoin": "BTC",
+    "ether": "ETH",
+    "ethereum": "ETH",
+    "solana": "SOL",
+    "ripple": "XRP",
+    "cardano": "ADA",
+    "dogecoin": "DOGE",
+    "polkadot": "DOT",
+    "avalanche": "AVAX",
+    "chainlink": "LINK",
+    "litecoin": "LTC",
+    "shiba inu": "SHIB",
+    "binance coin": "BNB",
+    "tron": "TRX",
+    "polygon": "POL",
+    "toncoin": "TON",
+}
+
+# Tickers that are also everyday acronyms; they only match as cashtags ($ONE)
+AMBIGUOUS_TICKERS = frozenset({
+    "A", "AI", "ALL", "AND", "ANY", "AT", "BE", "CEO", "CFO", "DAO", "DEX", "EU", "ETF",
+    "FOR", "GAS", "GDP", "IT", "KEY", "NEW", "NFT", "NOT", "NOW", "ON", "ONE", "OR", "SEC",
+    "THE", "TOP", "UK", "UP", "US", "USA", "WIN",
+})
+
+# Output of one automaton state: (asset, needs upper case or cashtag)
+Output = Tuple[str, bool]
+
+
+class SymbolMatcher:
+    """Aho-Corasick automaton over word tokens mapping text to assets.
+
+    Patterns are asset tickers (``BTC``) and names (``shiba inu``), built
+    once from an exchange's market list. Text is split into tokens with a
+    single regex and the automaton walks the tokens once, so the cost per
+    headline does not depend on how many assets are listed. Tickers only
+    match when written in upper case or as a cashtag; names match in any
+    case.
+    """
+
+    def __init__(self, symbols: Dict[str, str], aliases: Optional[Dict[str, str]] = None):
+        """Build the automaton.
+
+        ``symbols`` maps an asset to the market symbol it trades as and
+        ``aliases`` maps extra names to assets.
+        """
+        self.symbols = dict(symbols)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Output]] = [[]]
+
+        for asset in self.symbols:
+            if len(asset) > 1:
+                self._add((asset.lower(),), (asset, True))
+        for name, asset in (DEFAULT_ALIASES if aliases is None else aliases).items():
+            if asset in self.symbols:
+                self._add(tuple(t.lower() for t in TOKEN_RE.findall(name)), (asset, False))
+        self._link()
+
+    @classmethod
+    def from_markets(cls, markets: Dict[str, Dict[str, Any]],
+                     quotes: Iterable[str] = DEFAULT_QUOTES,
+                     aliases: Optional[Dict[str, str]] = None) -> "SymbolMatcher":
+        """Build from a ccxt ``exchange.markets`` mapping of active spot markets.
+
+        Each base asset maps to its market in the first of ``quotes`` that
+        lists it.
+        """
+        rank = {quote: i for i, quote in enumerate(quotes)}
+        best: Dict[str, Tuple[int, str]] = {}
+        for symbol, market in markets.items():
+            if market.get("active") is False or market.get("spot") is False:
+                continue
+            base, quote = market.get("base"), market.get("quote")
+            if base and quote in rank and (base not in best or rank[quote] < best[base][0]):
+                best[base] = (rank[quote], symbol)
+        return cls({base: symbol for base, (_, symbol) in best.items()}, aliases)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _add(self, tokens: Tuple[str, ...], output: Output) -> None:
+        if not tokens:
+            return
+        state = 0
+        for token in tokens:
+            nxt = self._goto[state].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(output)
+
+    def _link(self) -> None:
+        """Compute failure links breadth first and merge inherited outputs."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(token, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def assets(self, text: str) -> Set[str]:
+        """Assets mentioned in ``text``."""
+        found: Set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for raw in TOKEN_RE.findall(text):
+            cashtag = raw[0] == "$"
+            word = raw[1:] if cashtag else raw
+            token = word.lower()
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for asset, needs_case in out[state]:
+                if not needs_case or cashtag or (word.isupper() and word not in AMBIGUOUS_TICKERS):
+                    found.add(asset)
+        return found
+
+    def match(self, text: str) -> List[str]:
+        """Market symbols mentioned in ``text``, sorted."""
+        return sorted(self.symbols[asset] for asset in self.assets(text))
@@ -0,0 +1,236 @@
+"""News ingestion pipeline: near-duplicate filtering, symbol matching and scoring."""
+
+import asyncio
+import re
+import time
+import zlib
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from .matcher import SymbolMatcher
+
+log = get_logger(__name__)
+settings = get_settings()
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Headline terms and their sentiment weight
+LEXICON = {
+    "surge": 1.0, "surges": 1.0, "soar": 1.0, "soars": 1.0, "rally": 1.0, "rallies": 1.0,
+    "jump": 0.8, "jumps": 0.8, "gain": 0.6, "gains": 0.6, "rise": 0.6, "rises": 0.6,
+    "record": 0.6, "high": 0.4, "bullish": 1.0, "approve": 0.8, "approves": 0.8,
+    "approved": 0.8, "approval": 0.8, "launch": 0.5, "launches": 0.5, "partnership": 0.6,
+    "listing": 0.7, "lists": 0.7, "adopt": 0.6, "adopts": 0.6, "inflows": 0.6, "upgrade": 0.5,
+    "plunge": -1.0, "plunges": -1.0, "crash": -1.0, "crashes": -1.0, "tumble": -1.0,
+    "tumbles": -1.0, "drop": -0.8, "drops": -0.8, "fall": -0.6, "falls": -0.6, "slump": -0.8,
+    "low": -0.4, "bearish": -1.0, "hack": -1.0, "hacked": -1.0, "exploit": -1.0,
+    "lawsuit": -0.8, "sues": -0.8, "ban": -0.9, "bans": -0.9, "delist": -1.0,
+    "delisting": -1.0, "fraud": -1.0, "outflows": -0.6, "liquidations": -0.6, "reject": -0.8,
+    "rejects": -0.8, "rejected": -0.8, "halt": -0.7, "halts": -0.7,
+}
+
+
+def headline_words(text: str) -> List[str]:
+    """Lower-case word tokens used for hashing, shingling and scoring."""
+    return WORD_RE.findall(text.lower())
+
+
+def score_words(words: List[str]) -> Tuple[float, float]:
+    """Return ``(sentiment, score)`` of a headline from the lexicon.
+
+    ``sentiment`` is the weighted balance of positive and negative terms in
+    [-1, 1]. ``score`` scales it by how many terms were found, saturating
+    at three.
+    """
+    positive = negative = 0.0
+    hits = 0
+    for word in words:
+        weight = LEXICON.get(word)
+        if weight is not None:
+            hits += 1
+            if weight > 0:
+                positive += weight
+            else:
+                negative -= weight
+    if not hits:
+        return 0.0, 0.0
+    sentiment = (positive - negative) / (positive + negative)
+    return sentiment, sentiment * min(hits, 3) / 3
+
+
+class NearDuplicateFilter:
+    """Sliding-window filter for exact and near-identical headlines.
+
+    Exact repeats are caught by a hash of the normalized words. Near
+    repeats are caught with MinHash signatures over word bigrams and
+    locality-sensitive hashing: the signature is cut into bands, and only
+    headlines sharing a band are compared, so each check costs a handful
+    of dict lookups however many headlines are remembered.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, window: Optional[int] = None,
+                 permutations: Optional[int] = None, bands: Optional[int] = None, seed: int = 1):
+        """Initialize the filter from settings unless overridden."""
+        self.threshold = settings.news_dedup_threshold if threshold is None else threshold
+        self.window = window or settings.news_dedup_window
+        permutations = permutations or settings.news_minhash_permutations
+        self.bands = bands or settings.news_minhash_bands
+        if permutations % self.bands:
+            raise ValueError("MinHash permutations must be a multiple of the band count")
+        self.rows = permutations // self.bands
+
+        # Multiply-shift hash family; uint64 products wrap, which is intended
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 2**63, permutations, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, permutations, dtype=np.uint64)
+
+        self._exact: Dict[int, int] = {}
+        self._buckets: Dict[bytes, int] = {}
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._order: Deque[Tuple[int, int, List[bytes]]] = deque()
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def signature(self, words: List[str]) -> np.ndarray:
+        """MinHash signature of a headline's word bigrams (single words if shorter)."""
+        shingles = [a + " " + b for a, b in zip(words, words[1:])] or words or [""]
+        x = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64,
+                        count=len(shingles))
+        return ((self._a[:, None] * x + self._b[:, None]) >> np.uint64(32)).min(axis=1)
+
+    def seen(self, words: List[str]) -> bool:
+        """Whether the headline repeats a recent one; if not, remember it."""
+        exact = zlib.crc32(" ".join(words).encode())
+        if exact in self._exact:
+            return True
+
+        signature = self.signature(words)
+        raw = signature.astype(np.uint32).tobytes()
+        width = 4 * self.rows
+        keys = [bytes((band,)) + raw[band * width:(band + 1) * width] for band in range(self.bands)]
+        for key in keys:
+            other = self._buckets.get(key)
+            if other is not None and np.mean(self._signatures[other] == signature) >= self.threshold:
+                return True
+
+        item_id = self._next_id
+        self._next_id += 1
+        self._exact[exact] = item_id
+        self._signatures[item_id] = signature
+        for key in keys:
+            self._buckets[key] = item_id
+        self._order.append((item_id, exact, keys))
+        if len(self._order) > self.window:
+            self._evict()
+        return False
+
+    def _evict(self) -> None:
+        item_id, exact, keys = self._order.popleft()
+        if self._exact.get(exact) == item_id:
+            del self._exact[exact]
+        for key in keys:
+            if self._buckets.get(key) == item_id:
+                del self._buckets[key]
+        del self._signatures[item_id]
+
+
+class NewsPipeline:
+    """Turn a stream of news items into scored, symbol-tagged events.
+
+    Each item is matched to market symbols, checked against recent
+    headlines and scored. Items that mention no listed asset, repeat a
+    recent headline or score below ``min_score`` are counted and dropped.
+    Processing is synchronous per item; ``run`` yields to the event loop
+    every ``yield_every`` items so a fast replay does not starve other
+    tasks.
+    """
+
+    def __init__(self, matcher: SymbolMatcher, dedup: Optional[NearDuplicateFilter] = None,
+                 min_score: float = 0.0):
+        """Initialize the pipeline."""
+        self.matcher = matcher
+        self.dedup = dedup or NearDuplicateFilter()
+        self.min_score = min_score
+        self.items = 0
+        self.duplicates = 0
+        self.unmatched = 0
+        self.filtered = 0
+        self.events = 0
+        self.busy_seconds = 0.0
+
+    def process(self, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the event for one normalized item, or None if it is dropped."""
+        self.items += 1
+        title = item["title"]
+        # Matching is cheaper than hashing, so unmatched items skip deduplication
+        symbols = self.matcher.match(title)
+        if not symbols:
+            self.unmatched += 1
+            return None
+
+        words = headline_words(title)
+        if self.dedup.seen(words):
+            self.duplicates += 1
+            return None
+
+        sentiment, score = score_words(words)
+        if abs(score) < self.min_score:
+            self.filtered += 1
+            return None
+        self.events += 1
+        return {
+            "title": title,
+            "source": item["source"],
+            "url": item["url"],
+            "published": item["published"],
+            "symbols": symbols,
+            "sentiment": round(sentiment, 3),
+            "score": round(score, 3),
+        }
+
+    async def run(self, source: AsyncIterator[Dict[str, Any]],
+                  yield_every: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Process every item from ``source`` and yield the resulting events."""
+        count = 0
+        async for item in source:
+            started = time.perf_counter()
+            event = self.process(item)
+            self.busy_seconds += time.perf_counter() - started
+            if event is not None:
+                yield event
+            count += 1
+            if count % yield_every == 0:
+                await asyncio.sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Item counts and processing throughput, excluding time spent reading sources."""
+        return {
+            "items": self.items,
+            "duplicates": self.duplicates,
+            "unmatched": self.unmatched,
+            "filtered": self.filtered,
+            "events": self.events,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds) if self.busy_seconds else None,
+        }
+
+
+# Matchers built per venue from its market list
+_matchers: Dict[str, SymbolMatcher] = {}
+
+
+async def get_symbol_matcher(client) -> SymbolMatcher:
+    """Get the matcher for a ``CCXTClient``'s venue, loading its markets the first time."""
+    matcher = _matchers.get(client.venue)
+    if matcher is None:
+        await client.load_markets()
+        matcher = SymbolMatcher.from_markets(client.exchange.markets)
+        _matchers[client.venue] = matcher
+        log.info(f"Built news symbol matcher for {client.venue} ({len(matcher)} assets)")
+    return matcher
@@ -0,0 +1,177 @@
+"""Async news sources: JSON-lines replay files, RSS feeds and JSON endpoints."""
+
+import asyncio
+import calendar
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import aiohttp
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Field names accepted for the headline, in order of preference
+TITLE_FIELDS = ("title", "headline", "text")
+
+
+def normalize_item(raw: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """Map a raw news record onto ``title``/``body``/``source``/``url``/``published``.
+
+    ``published`` is epoch milliseconds. Records without a headline or
+    with a non-finite timestamp are dropped by returning None.
+    """
+    title = next((raw[f] for f in TITLE_FIELDS if raw.get(f)), None)
+    if not title:
+        return None
+    published = raw.get("published") or raw.get("timestamp") or raw.get("time")
+    if isinstance(published, float) and not math.isfinite(published):
+        return None
+    if isinstance(published, (int, float)) and published < 1e11:
+        published *= 1000
+    return {
+        "title": str(title),
+        "body": str(raw.get("body") or raw.get("summary") or ""),
+        "source": str(raw.get("source") or source),
+        "url": raw.get("url") or raw.get("link"),
+        "published": int(published) if isinstance(published, (int, float)) else int(time.time() * 1000),
+    }
+
+
+def replay_path(name: str) -> Path:
+    """Resolve a replay file name under ``news_replay_dir``.
+
+    Names that resolve outside the directory, through ``..``, an absolute
+    path or a symlink, are refused.
+    """
+    root = Path(settings.news_replay_dir).resolve()
+    path = (root / name).resolve()
+    if not name or not path.is_relative_to(root) or path == root:
+        raise ValueError(f"Replay file {name!r} is outside {settings.news_replay_dir}")
+    return path
+
+
+async def jsonl_source(path: str, batch_bytes: int = 1 << 20,
+                       limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Replay a JSON-lines file, one news record per line.
+
+    The file is read in blocks of about ``batch_bytes`` in a worker thread,
+    so a large replay neither blocks the event loop nor costs a thread hop
+    per line. Malformed lines and lines that are not JSON objects are
+    skipped.
+    """
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            lines: List[str] = await asyncio.to_thread(f.readlines, batch_bytes)
+            if not lines:
+                return
+            for line in lines:
+                try:
+                    raw = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(raw, dict):
+                    continue
+                try:
+                    item = normalize_item(raw, path)
+                except (ValueError, OverflowError, TypeError):
+                    continue
+                if item is None:
+                    continue
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+
+async def _poll(url: str, interval: float, parse) -> AsyncIterator[Dict[str, Any]]:
+    """Fetch ``url`` every ``interval`` seconds and yield records not seen before."""
+    seen: Dict[str, None] = {}
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=settings.news_http_timeout)) as session:
+        while True:
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    records = await parse(response)
+                for record in records:
+                    item = normalize_item(record, url)
+                    key = item and (item["url"] or item["title"])
+                    if item is None or key in seen:
+                        continue
+                    seen[key] = None
+                    yield item
+                # Remember at most a few feeds' worth of ids
+                while len(seen) > 10_000:
+                    del seen[next(iter(seen))]
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"Failed to poll news source {url}: {e}")
+            await asyncio.sleep(interval)
+
+
+async def rss_source(url: str, interval: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Poll an RSS or Atom feed and yield new entries."""
+    import feedparser
+
+    async def parse(response: aiohttp.ClientResponse) -> List[Dict[str, Any]]:
+        feed = await asyncio.to_thread(feedparser.parse, await response.read())
+        entries = []
+        for entry in feed.entries:
+            parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+            entries.append({
+                "title": entry.get("title"),
+                "summary": entry.get("summary"),
+                "link": entry.get("link"),
+                "source": feed.feed.get("title"),
+                "published": calendar.timegm(parsed) * 1000 if parsed else None,
+            })
+        return entries
+
+    async for item in _poll(url, interval or settings.news_poll_seconds, parse):
+        yield item
+
+
+async def json_source(url: str, interval: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Poll an endpoint returning a JSON list of records, or an object with an ``items`` list."""
+    async def parse(response: aiohttp.ClientResponse) -> List[Dict[str, Any]]:
+        body = await response.json(content_type=None)
+        return body.get("items", []) if isinstance(body, dict) else body
+
+    async for item in _poll(url, interval or settings.news_poll_seconds, parse):
+        yield item
+
+
+async def merge(sources: Iterable[AsyncIterator[Dict[str, Any]]],
+                maxsize: int = 10_000) -> AsyncIterator[Dict[str, Any]]:
+    """Interleave several sources into one stream, ending when all of them end."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize)
+    done = object()
+
+    async def pump(source: AsyncIterator[Dict[str, Any]]) -> None:
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            log.error(f"News source failed: {e}")
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.create_task(pump(source)) for source in sources]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
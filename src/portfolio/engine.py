@@ -0,0 +1,206 @@
+"""Incrementally marked-to-market position table across CEX and on-chain accounts."""
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Assets valued at one dollar without a price lookup
+STABLECOINS = {"USD", "USDT", "USDC", "BUSD", "DAI", "FDUSD", "TUSD"}
+
+# Wallet chain -> native asset
+CHAIN_ASSETS = {
+    "evm": "ETH",
+    "solana": "SOL",
+}
+
+PositionKey = Tuple[str, str]
+
+
+def usd_symbol(asset: str, quote: str = "USDT") -> str:
+    """Market symbol used to price ``asset`` in dollars."""
+    return f"{asset}/{quote}"
+
+
+class PortfolioEngine:
+    """Position table keyed by (account, asset) with running totals.
+
+    Positions are indexed by asset, so a price tick touches only the
+    positions holding that asset and a balance update touches only the one
+    position; every total is adjusted by the difference rather than
+    recomputed. Reading the totals is O(1) and never does I/O.
+    """
+
+    def __init__(self):
+        """Initialize an empty portfolio."""
+        self.quantities: Dict[PositionKey, float] = {}
+        self.prices: Dict[str, float] = {asset: 1.0 for asset in STABLECOINS}
+        self.total_usd = 0.0
+        self.by_account: Dict[str, float] = defaultdict(float)
+        self.by_asset: Dict[str, float] = defaultdict(float)
+        self._holders: Dict[str, Set[PositionKey]] = defaultdict(set)
+        self._account_assets: Dict[str, Set[str]] = defaultdict(set)
+        self._asset_quantity: Dict[str, float] = defaultdict(float)
+        self.updates = 0
+
+    def _value(self, asset: str, quantity: float) -> float:
+        price = self.prices.get(asset)
+        return quantity * price if price is not None else 0.0
+
+    def set_quantity(self, account: str, asset: str, quantity: float) -> bool:
+        """Set one position's quantity; returns False if it did not change."""
+        key = (account, asset)
+        old = self.quantities.get(key, 0.0)
+        if quantity == old:
+            return False
+
+        delta = self._value(asset, quantity) - self._value(asset, old)
+        self.total_usd += delta
+        self.by_account[account] += delta
+        self.by_asset[asset] += delta
+        self._asset_quantity[asset] += quantity - old
+
+        if quantity:
+            self.quantities[key] = quantity
+            self._holders[asset].add(key)
+            self._account_assets[account].add(asset)
+        else:
+            self.quantities.pop(key, None)
+            self._holders[asset].discard(key)
+            self._account_assets[account].discard(asset)
+        self.updates += 1
+        return True
+
+    def set_holdings(self, account: str, holdings: Dict[str, float]) -> int:
+        """Replace an account's holdings; assets it no longer holds drop to zero.
+
+        Returns the number of positions that changed.
+        """
+        changed = 0
+        for asset in self._account_assets[account] - holdings.keys():
+            changed += self.set_quantity(account, asset, 0.0)
+        for asset, quantity in holdings.items():
+            changed += self.set_quantity(account, asset, float(quantity))
+        return changed
+
+    def set_price(self, asset: str, price: Optional[float]) -> bool:
+        """Mark one asset to ``price``; returns False if it did not change."""
+        old = self.prices.get(asset)
+        if price == old:
+            return False
+
+        delta_price = (price or 0.0) - (old or 0.0)
+        delta = self._asset_quantity[asset] * delta_price
+        self.total_usd += delta
+        self.by_asset[asset] += delta
+        for account, _ in self._holders[asset]:
+            self.by_account[account] += self.quantities[(account, asset)] * delta_price
+
+        if price is None:
+            self.prices.pop(asset, None)
+        else:
+            self.prices[asset] = price
+        self.updates += 1
+        return True
+
+    def set_prices(self, prices: Dict[str, float]) -> int:
+        """Mark several assets; returns the number of prices that changed."""
+        return sum(self.set_price(asset, price) for asset, price in prices.items())
+
+    def assets(self) -> Set[str]:
+        """Assets currently held in any account."""
+        return {asset for asset, holders in self._holders.items() if holders}
+
+    def unpriced(self) -> List[str]:
+        """Held assets without a price; they count as zero in the totals."""
+        return sorted(asset for asset in self.assets() if asset not in self.prices)
+
+    def positions(self, account: Optional[str] = None) -> List[Dict[str, Any]]:
+        """The position table, largest value first."""
+        rows = []
+        for (acct, asset), quantity in self.quantities.items():
+            if account and acct != account:
+                continue
+            price = self.prices.get(asset)
+            rows.append({
+                "account": acct,
+                "asset": asset,
+                "quantity": quantity,
+                "price_usd": price,
+                "value_usd": quantity * price if price is not None else None,
+            })
+        rows.sort(key=lambda row: row["value_usd"] or 0.0, reverse=True)
+        return rows
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals by account and asset."""
+        return {
+            "total_usd": self.total_usd,
+            "by_account": {k: v for k, v in self.by_account.items() if self._account_assets.get(k)},
+            "by_asset": {k: v for k, v in self.by_asset.items() if self._holders.get(k)},
+            "positions": len(self.quantities),
+            "unpriced": self.unpriced(),
+        }
+
+    def revalue(self) -> float:
+        """Recompute every total from scratch, discarding accumulated float drift."""
+        self.total_usd = 0.0
+        self.by_account.clear()
+        self.by_asset.clear()
+        self._asset_quantity.clear()
+        for (account, asset), quantity in self.quantities.items():
+            value = self._value(asset, quantity)
+            self.total_usd += value
+            self.by_account[account] += value
+            self.by_asset[asset] += value
+            self._asset_quantity[asset] += quantity
+        return self.total_usd
+
+    async def refresh_prices(self, client, quote: str = "USDT",
+                             assets: Optional[Iterable[str]] = None) -> int:
+        """Mark held assets from the client's cached/batched ``get_prices``.
+
+        Assets without a listed ``quote`` market, such as delisted tokens or
+        dust, are left unpriced without holding back the others.
+        """
+        wanted = [a for a in (assets or self.assets()) if a not in STABLECOINS]
+        if not wanted:
+            return 0
+        prices = await client.get_prices([usd_symbol(a, quote) for a in wanted])
+        return self.set_prices({
+            asset: prices[usd_symbol(asset, quote)]["price"]
+            for asset in wanted if usd_symbol(asset, quote) in prices
+        })
+
+    async def sync_exchange(self, client) -> int:
+        """Load one exchange account's balances as positions."""
+        from ..cex.scheduler import BALANCE
+        balance = await client.request(BALANCE, "fetch_balance")
+        holdings = {c: amount for c, amount in balance["total"].items() if amount}
+        return self.set_holdings(f"cex:{client.venue}", holdings)
+
+    def apply_wallet_balances(self, wallets: List[Dict[str, Any]]) -> int:
+        """Apply ``BalanceService.enrich`` results; wallets without a balance are left as they were."""
+        changed = 0
+        for wallet in wallets:
+            asset = CHAIN_ASSETS.get(wallet["chain"])
+            if asset and wallet.get("balance") is not None:
+                changed += self.set_quantity(f"{wallet['chain']}:{wallet['address']}", asset,
+                                             float(wallet["balance"]))
+        return changed
+
+
+# Global engine instance
+_engine: Optional[PortfolioEngine] = None
+
+
+def get_portfolio_engine() -> PortfolioEngine:
+    """Get the shared portfolio engine instance."""
+    global _engine
+    if _engine is None:
+        _engine = PortfolioEngine()
+    return _engine
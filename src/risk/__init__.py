@@ -0,0 +1 @@
+# Risk management package
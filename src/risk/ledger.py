@@ -0,0 +1,307 @@
+"""Pre-trade risk gate backed by an append-only fill ledger."""
+
+import itertools
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Rewrite the journal as a snapshot once it holds this many fill records
+COMPACT_AFTER = 10_000
+
+
+class RiskLimitExceeded(Exception):
+    """Raised when an order would breach a configured risk limit."""
+
+
+class Reservation:
+    """Notional held against the limits while an order is open.
+
+    ``price`` is in the pair's quote currency and ``quote_usd`` is the
+    dollar value of one unit of that currency. ``filled``, ``cost`` and
+    ``fee`` are the order's fills journaled so far.
+    """
+
+    __slots__ = ("id", "symbol", "side", "amount", "price", "quote_usd", "filled", "cost", "fee")
+
+    def __init__(self, id: int, symbol: str, side: str, amount: float, price: float,
+                 quote_usd: float = 1.0):
+        self.id = id
+        self.symbol = symbol
+        self.side = side
+        self.amount = amount
+        self.price = price
+        self.quote_usd = quote_usd
+        self.filled = 0.0
+        self.cost = 0.0
+        self.fee = 0.0
+
+    @property
+    def notional(self) -> float:
+        """Notional of the unfilled remainder in USD."""
+        return max(self.amount - self.filled, 0.0) * self.price * self.quote_usd
+
+
+class Position:
+    """Signed quantity and average entry price of one symbol, in its quote currency."""
+
+    __slots__ = ("quantity", "average_price", "last_price", "quote_usd")
+
+    def __init__(self, quantity: float = 0.0, average_price: float = 0.0, last_price: float = 0.0,
+                 quote_usd: float = 1.0):
+        self.quantity = quantity
+        self.average_price = average_price
+        self.last_price = last_price
+        self.quote_usd = quote_usd
+
+    @property
+    def exposure(self) -> float:
+        """Position value in USD at the last fill."""
+        return abs(self.quantity) * self.last_price * self.quote_usd
+
+
+def _day(timestamp: float) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class RiskLedger:
+    """Fill ledger with O(1) running aggregates and limit checks.
+
+    Tracks realized PnL for the current UTC day, exposure per symbol and
+    the unfilled notional of open orders, all in USD: prices
+    are in each pair's quote currency and are converted with the quote's
+    dollar price given to ``reserve``. ``reserve`` checks the limits and
+    books the order's notional in one synchronous step, so concurrent
+    submissions on the event loop cannot together exceed
+    ``max_open_notional_usd``; the unfilled part stays booked until the
+    order is done. Fills are appended to a JSON-lines journal that is
+    replayed on first use.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None):
+        """Configure the ledger; the journal is loaded lazily."""
+        self.path = Path(journal_path or settings.risk_journal_path)
+        self.positions: Dict[str, Position] = {}
+        self.day = _day(time.time())
+        self.realized_today = 0.0
+        self.open_notional = 0.0
+        self.reservations: Dict[int, Reservation] = {}
+        self._ids = itertools.count(1)
+        self._journal = None
+        self._records = 0
+
+    def _load(self) -> None:
+        if self._journal is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        self._replay(json.loads(line))
+            if self._records > COMPACT_AFTER:
+                self.compact()
+        self._journal = open(self.path, "a", buffering=1)
+
+    def _replay(self, record: Dict[str, Any]) -> None:
+        if "snapshot" in record:
+            snapshot = record["snapshot"]
+            self.positions = {s: Position(*p) for s, p in snapshot["positions"].items()}
+            if snapshot["day"] == _day(time.time()):
+                self.day, self.realized_today = snapshot["day"], snapshot["realized"]
+            self._records = 0
+        else:
+            self._apply(record["s"], record["d"], record["q"], record["p"], record["f"], record["t"],
+                        record.get("u", 1.0))
+            self._records += 1
+
+    def _apply(self, symbol: str, side: str, amount: float, price: float, fee: float,
+               timestamp: float, quote_usd: float = 1.0) -> float:
+        """Update the position and daily PnL for one fill; returns the realized PnL.
+
+        The returned PnL is in the quote currency; the daily total is
+        kept in USD.
+        """
+        position = self.positions.setdefault(symbol, Position())
+        signed = amount if side == "buy" else -amount
+        realized = -fee
+
+        if position.quantity * signed < 0:
+            # Reducing (and possibly flipping) the position realizes PnL on the closed part
+            closed = min(abs(signed), abs(position.quantity))
+            direction = 1.0 if position.quantity > 0 else -1.0
+            realized += (price - position.average_price) * closed * direction
+            remaining = position.quantity + signed
+            if remaining * position.quantity < 0:
+                position.average_price = price
+            elif remaining == 0:
+                position.average_price = 0.0
+            position.quantity = remaining
+        else:
+            total = position.quantity + signed
+            position.average_price = (
+                (position.average_price * abs(position.quantity) + price * amount) / abs(total)
+            )
+            position.quantity = total
+        position.last_price = price
+        position.quote_usd = quote_usd
+
+        day = _day(timestamp)
+        if day != self.day:
+            if day < self.day:
+                return realized
+            self.day, self.realized_today = day, 0.0
+        self.realized_today += realized * quote_usd
+        return realized
+
+    def _roll_day(self) -> None:
+        today = _day(time.time())
+        if today != self.day:
+            self.day, self.realized_today = today, 0.0
+
+    def reserve(self, symbol: str, side: str, amount: float, price: float,
+                quote_usd: float = 1.0) -> Reservation:
+        """Check an order against the limits and hold its notional.
+
+        ``price`` is in the quote currency and ``quote_usd`` converts it to
+        dollars. Raises ``RiskLimitExceeded`` if the order is larger than
+        ``max_order_usd``, would take the unfilled notional of open orders
+        past ``max_open_notional_usd``, or today's realized loss has
+        reached ``daily_loss_limit_usd``.
+        """
+        self._load()
+        self._roll_day()
+        if side not in ("buy", "sell"):
+            raise ValueError(f"Unknown order side {side}")
+        if amount <= 0 or price <= 0 or quote_usd <= 0:
+            raise ValueError("Order amount, price and quote price must be positive")
+
+        notional = amount * price * quote_usd
+        if notional > settings.max_order_usd:
+            raise RiskLimitExceeded(
+                f"Order notional ${notional:,.2f} exceeds max_order_usd ${settings.max_order_usd:,.2f}"
+            )
+        if -self.realized_today >= settings.daily_loss_limit_usd:
+            raise RiskLimitExceeded(
+                f"Daily realized loss ${-self.realized_today:,.2f} has reached "
+                f"daily_loss_limit_usd ${settings.daily_loss_limit_usd:,.2f}"
+            )
+        if self.open_notional + notional > settings.max_open_notional_usd:
+            raise RiskLimitExceeded(
+                f"Open order notional ${self.open_notional + notional:,.2f} would exceed "
+                f"max_open_notional_usd ${settings.max_open_notional_usd:,.2f}"
+            )
+
+        reservation = Reservation(next(self._ids), symbol, side, amount, price, quote_usd)
+        self.reservations[reservation.id] = reservation
+        self.open_notional += notional
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        """Drop a reservation whose order was not placed or is done."""
+        if self.reservations.pop(reservation.id, None) is not None:
+            self.open_notional -= reservation.notional
+
+    def record_fill(self, reservation: Reservation, filled: float, price: float,
+                    fee: float = 0.0, done: bool = True) -> float:
+        """Journal an order's fills against its reservation.
+
+        ``filled``, ``price`` and ``fee`` are cumulative for the order, as
+        ccxt reports them: the filled amount, its average price and the
+        total fee. Only what was filled since the previous call is
+        journaled. The unfilled remainder stays reserved until ``done``.
+        Returns the realized PnL of the new fills in quote currency.
+        """
+        realized = 0.0
+        amount = filled - reservation.filled
+        if amount > 0:
+            cost = filled * price
+            # Average price and fee of the new fills alone
+            fill_price = (cost - reservation.cost) / amount if reservation.filled else price
+            fill_fee = max(fee - reservation.fee, 0.0)
+            held = reservation.notional
+            reservation.filled, reservation.cost, reservation.fee = filled, cost, fee
+            if reservation.id in self.reservations:
+                self.open_notional += reservation.notional - held
+
+            timestamp = time.time()
+            realized = self._apply(reservation.symbol, reservation.side, amount, fill_price, fill_fee,
+                                   timestamp, reservation.quote_usd)
+            self._journal.write(json.dumps(
+                {"t": round(timestamp, 3), "s": reservation.symbol, "d": reservation.side,
+                 "q": amount, "p": fill_price, "f": fill_fee, "u": reservation.quote_usd},
+                separators=(",", ":")
+            ) + "\n")
+            self._records += 1
+        if done:
+            self.release(reservation)
+        return realized
+
+    def compact(self) -> None:
+        """Rewrite the journal as a single snapshot of the current state."""
+        snapshot = {"snapshot": {
+            "day": self.day,
+            "realized": self.realized_today,
+            "positions": {
+                symbol: [p.quantity, p.average_price, p.last_price, p.quote_usd]
+                for symbol, p in self.positions.items() if p.quantity
+            },
+        }}
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(json.dumps(snapshot, separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        if self._journal is not None:
+            self._journal.close()
+        os.replace(tmp, self.path)
+        if self._journal is not None:
+            self._journal = open(self.path, "a", buffering=1)
+        self._records = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Current aggregates, without I/O beyond the first journal load."""
+        self._load()
+        self._roll_day()
+        return {
+            "day": self.day,
+            "realized_pnl_today": self.realized_today,
+            "daily_loss_limit_usd": settings.daily_loss_limit_usd,
+            "max_order_usd": settings.max_order_usd,
+            "max_open_notional_usd": settings.max_open_notional_usd,
+            "open_notional": self.open_notional,
+            "exposure": {s: p.exposure for s, p in self.positions.items() if p.quantity},
+        }
+
+    def close(self) -> None:
+        """Close the journal file."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+
+# Global ledger instance
+_ledger: Optional[RiskLedger] = None
+
+
+def get_risk_ledger() -> RiskLedger:
+    """Get the shared risk ledger instance."""
+    global _ledger
+    if _ledger is None:
+        _ledger = RiskLedger()
+    return _ledger
+
+
+def close_risk_ledger() -> None:
+    """Close the shared ledger's journal if it was opened."""
+    global _ledger
+    if _ledger is not None:
+        _ledger.close()
+        _ledger = None
@@ -1,6 +1,7 @@
 """Solana blockchain client."""
 
-from typing import Dict, Any, Optional
+import asyncio
+from typing import Dict, Any, List, Optional
 from solana.rpc.async_api import AsyncClient
 from solders.keypair import Keypair
 from solders.pubkey import Pubkey as PublicKey
@@ -8,28 +9,42 @@ from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from ..metrics import get_metrics
 
 log = get_logger(__name__)
 settings = get_settings()
 
+TOKEN_PROGRAM_ID = PublicKey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+ASSOCIATED_TOKEN_PROGRAM_ID = PublicKey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNY1JA8knL")
+# getMultipleAccounts accepts at most 100 keys per request
+MAX_MULTIPLE_ACCOUNTS = 100
+# SPL token account layout: mint (32) + owner (32) + amount (u64 little endian)
+TOKEN_AMOUNT_OFFSET = 64
+
 
 class SolanaClient:
     """Solana blockchain client."""
     
-    def __init__(self):
-        """Initialize the Solana client."""
+    def __init__(self, rpc_url: Optional[str] = None):
+        """Initialize the Solana client.
+        
+        The underlying ``AsyncClient`` keeps a pooled HTTP connection for
+        the lifetime of this object; use ``get_solana_client()`` to share
+        one instance and ``close()`` to release it.
+        """
+        self.rpc_url = rpc_url or settings.solana_rpc_url
         self.client = None
         self.keypair = None
         self._initialize_connection()
     
     def _initialize_connection(self):
         """Initialize the Solana connection."""
-        if not settings.solana_rpc_url:
+        if not self.rpc_url:
             log.warning("Solana RPC URL not configured")
             return
         
         try:
-            self.client = AsyncClient(settings.solana_rpc_url)
+            self.client = AsyncClient(self.rpc_url, timeout=settings.solana_rpc_timeout)
             log.info("Solana connection established")
         except Exception as e:
             log.error(f"Failed to initialize Solana connection: {e}")
@@ -46,6 +61,11 @@ class SolanaClient:
                 log.error(f"Failed to initialize Solana keypair: {e}")
                 self.keypair = None
     
+    async def rpc(self, method: str, *args, **kwargs) -> Any:
+        """Call an ``AsyncClient`` method, timed in the ``rpc`` metrics."""
+        with get_metrics().track("rpc", f"solana.{method}"):
+            return await getattr(self.client, method)(*args, **kwargs)
+    
     async def test_connection(self) -> bool:
         """Test the connection to the Solana network."""
         if not self.client:
@@ -53,7 +73,7 @@ class SolanaClient:
         
         try:
             # Test connection by getting latest block height
-            block_height = await self.client.get_block_height()
+            block_height = await self.rpc("get_block_height")
             log.info(f"Solana connection test successful - Latest block: {block_height}")
             return True
         except Exception as e:
@@ -67,7 +87,7 @@ class SolanaClient:
         
         try:
             public_key = PublicKey.from_string(pubkey)
-            balance = await self.client.get_balance(public_key)
+            balance = await self.rpc("get_balance", public_key)
             sol_balance = balance.value / 1e9  # Convert lamports to SOL
             return {
                 "pubkey": pubkey,
@@ -78,3 +98,110 @@ class SolanaClient:
         except Exception as e:
             log.error(f"Failed to get SOL balance for {pubkey}: {e}")
             raise
+    
+    async def _get_multiple_accounts(self, pubkeys: List[PublicKey]) -> List[Any]:
+        """Fetch accounts in chunks of up to 100 keys, sent concurrently."""
+        chunks = [
+            pubkeys[i:i + MAX_MULTIPLE_ACCOUNTS]
+            for i in range(0, len(pubkeys), MAX_MULTIPLE_ACCOUNTS)
+        ]
+        semaphore = asyncio.Semaphore(settings.solana_rpc_concurrency)
+        
+        async def _fetch(chunk):
+            async with semaphore:
+                response = await self.rpc("get_multiple_accounts", chunk)
+                return response.value
+        
+        results = await asyncio.gather(*(_fetch(chunk) for chunk in chunks))
+        return [account for chunk in results for account in chunk]
+    
+    async def get_sol_balances(self, pubkeys: List[str]) -> Dict[str, Any]:
+        """Get SOL balances for many public keys with getMultipleAccounts.
+        
+        Accounts that do not exist have a balance of zero.
+        """
+        if not self.client:
+            raise Exception("Solana client not initialized")
+        
+        try:
+            keys = [PublicKey.from_string(pubkey) for pubkey in pubkeys]
+            accounts = await self._get_multiple_accounts(keys)
+            return {
+                "pubkeys": pubkeys,
+                "balances_lamports": [account.lamports if account else 0 for account in accounts],
+                "currency": "SOL"
+            }
+        except Exception as e:
+            log.error(f"Failed to get SOL balances for {len(pubkeys)} keys: {e}")
+            raise
+    
+    @staticmethod
+    def associated_token_address(owner: PublicKey, mint: PublicKey) -> PublicKey:
+        """Derive the associated token account of ``owner`` for ``mint``."""
+        address, _ = PublicKey.find_program_address(
+            [bytes(owner), bytes(TOKEN_PROGRAM_ID), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID
+        )
+        return address
+    
+    async def get_token_balances(self, owners: List[str], mints: List[str]) -> Dict[str, Any]:
+        """Get SPL token balances for many owners and mints in bulk.
+        
+        Reads each owner's associated token account for every mint through
+        getMultipleAccounts, so the request count scales with
+        ``owners * mints / 100`` rather than one call per owner. Returns a
+        compact table: ``balances[i][j]`` is the raw amount of ``mints[j]``
+        held by ``owners[i]`` (zero when the account does not exist).
+        """
+        if not self.client:
+            raise Exception("Solana client not initialized")
+        
+        try:
+            owner_keys = [PublicKey.from_string(owner) for owner in owners]
+            mint_keys = [PublicKey.from_string(mint) for mint in mints]
+            token_accounts = [
+                self.associated_token_address(owner, mint)
+                for owner in owner_keys for mint in mint_keys
+            ]
+            accounts = await self._get_multiple_accounts(token_accounts)
+            
+            amounts = [
+                int.from_bytes(bytes(account.data)[TOKEN_AMOUNT_OFFSET:TOKEN_AMOUNT_OFFSET + 8], "little")
+                if account else 0
+                for account in accounts
+            ]
+            width = len(mints)
+            return {
+                "owners": owners,
+                "mints": mints,
+                "balances": [amounts[i * width:(i + 1) * width] for i in range(len(owners))]
+            }
+        except Exception as e:
+            log.error(f"Failed to get token balances for {len(owners)} owners: {e}")
+            raise
+    
+    async def close(self):
+        """Close the pooled RPC connection."""
+        if self.client:
+            await self.client.close()
+            self.client = None
+            log.info("Solana connection closed")
+
+
+# Global client instance
+_client: Optional[SolanaClient] = None
+
+
+def get_solana_client() -> SolanaClient:
+    """Get the shared Solana client instance."""
+    global _client
+    if _client is None:
+        _client = SolanaClient()
+    return _client
+
+
+async def close_solana_client() -> None:
+    """Close the shared Solana client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
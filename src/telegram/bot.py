@@ -1,24 +1,48 @@
 """Telegram bot for crypto trading management."""
 
-from typing import Dict, Any
-from telegram import Bot
-from telegram.ext import Application
+import asyncio
+from typing import Dict, Any, List, Optional
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application, CommandHandler, ContextTypes, Updater, filters
 from loguru import logger
 
 from ..config.env import get_settings
 from ..logging import get_logger
+from .outbox import SendQueue
 
 log = get_logger(__name__)
 settings = get_settings()
 
+ALERT_USAGE = "Usage: /alert SYMBOL [above|below] PRICE [note]"
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
 
 class TelegramBot:
-    """Telegram bot for crypto trading management."""
+    """Telegram bot for crypto trading management.
+    
+    Updates arrive by long polling or, in webhook mode, on a local HTTP
+    listener. Either way they go into a bounded queue served by a pool of
+    workers, so a slow command handler only occupies its own worker. When
+    the queue is full, polling waits and webhook posts are refused so that
+    Telegram redelivers them later.
+    
+    Outgoing messages, including fired price alerts, go through a
+    ``SendQueue`` that batches them per chat and paces them to Telegram's
+    rate limits.
+    """
     
     def __init__(self):
         """Initialize the Telegram bot."""
         self.bot = None
         self.application = None
+        self.updater: Optional[Updater] = None
+        self.outbox: Optional[SendQueue] = None
+        self.updates: asyncio.Queue = asyncio.Queue(settings.telegram_update_queue_size)
+        self.rejected = 0
+        self._workers: List[asyncio.Task] = []
+        self._startup: Optional[asyncio.Task] = None
+        self._webhook: Optional[web.AppRunner] = None
         self._initialize_bot()
     
     def _initialize_bot(self):
@@ -28,36 +52,223 @@ class TelegramBot:
             return
         
         try:
-            self.bot = Bot(token=settings.telegram_bot_token)
-            self.application = Application.builder().token(settings.telegram_bot_token).build()
+            self.application = (
+                Application.builder()
+                .token(settings.telegram_bot_token)
+                .base_url(settings.telegram_api_url)
+                .updater(None)
+                .build()
+            )
+            self.bot = self.application.bot
+            if settings.telegram_mode != "webhook":
+                self.updater = Updater(self.bot, self.updates)
+            self.outbox = SendQueue(self.send_message)
+            self._add_handlers()
             log.info("Telegram bot initialized successfully")
         except Exception as e:
             log.error(f"Failed to initialize Telegram bot: {e}")
             self.bot = None
             self.application = None
+            self.updater = None
+            self.outbox = None
+    
+    def _add_handlers(self):
+        """Register command handlers, limited to the owner when one is configured."""
+        owner = filters.User(user_id=settings.owner_telegram_id) if settings.owner_telegram_id else None
+        for command, callback in (
+            ("alert", self.cmd_alert),
+            ("alerts", self.cmd_alerts),
+            ("unalert", self.cmd_unalert),
+        ):
+            self.application.add_handler(CommandHandler(command, callback, filters=owner))
     
     async def start(self):
-        """Start the Telegram bot."""
+        """Start the Telegram bot in the background and return immediately.
+        
+        Startup talks to the Bot API, so it runs as a task rather than
+        holding up the caller; ``wait_started`` awaits it.
+        """
         if not self.application:
             log.warning("Telegram bot not initialized")
             return
-        
+        if self._startup is None:
+            self._startup = asyncio.create_task(self._start())
+    
+    async def wait_started(self) -> bool:
+        """Wait for background startup; returns whether it succeeded."""
+        if self._startup is None:
+            return False
+        try:
+            await asyncio.shield(self._startup)
+            return True
+        except Exception:
+            return False
+    
+    async def _start(self):
         try:
             await self.application.initialize()
             await self.application.start()
-            await self.application.updater.start_polling()
-            log.info("Telegram bot started successfully")
+            await self.outbox.start()
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(settings.telegram_update_workers)
+            ]
+            if self.updater is None:
+                await self._start_webhook()
+            else:
+                await self.updater.initialize()
+                await self.updater.start_polling()
+            log.info(f"Telegram bot started successfully ({settings.telegram_mode} mode)")
         except Exception as e:
             log.error(f"Failed to start Telegram bot: {e}")
             raise
     
-    async def stop(self):
-        """Stop the Telegram bot."""
-        if self.application:
+    async def _start_webhook(self):
+        """Serve the webhook endpoint locally and register its public URL with Telegram."""
+        if not settings.telegram_webhook_url:
+            raise ValueError("TELEGRAM_WEBHOOK_URL is required in webhook mode")
+        app = web.Application()
+        app.router.add_post(settings.telegram_webhook_path, self._on_webhook)
+        self._webhook = web.AppRunner(app, access_log=None)
+        await self._webhook.setup()
+        site = web.TCPSite(self._webhook, settings.telegram_webhook_host, settings.telegram_webhook_port)
+        await site.start()
+        await self.bot.set_webhook(
+            url=settings.telegram_webhook_url,
+            secret_token=settings.telegram_webhook_secret or None,
+            max_connections=settings.telegram_update_workers,
+        )
+        log.info(f"Telegram webhook listening on {settings.telegram_webhook_host}:{self.webhook_port}")
+    
+    @property
+    def webhook_port(self) -> Optional[int]:
+        """Port the webhook listener is bound to, if it is running."""
+        if self._webhook is None or not self._webhook.addresses:
+            return None
+        return self._webhook.addresses[0][1]
+    
+    async def _on_webhook(self, request: web.Request) -> web.Response:
+        if settings.telegram_webhook_secret and \
+                request.headers.get(SECRET_HEADER) != settings.telegram_webhook_secret:
+            return web.Response(status=403)
+        try:
+            update = Update.de_json(await request.json(), self.bot)
+        except Exception:
+            return web.Response(status=400)
+        try:
+            self.updates.put_nowait(update)
+        except asyncio.QueueFull:
+            # Telegram retries updates that were not acknowledged
+            self.rejected += 1
+            return web.Response(status=503)
+        return web.Response()
+    
+    async def _worker(self):
+        while True:
+            update = await self.updates.get()
             try:
-                await self.application.updater.stop()
-                await self.application.stop()
-                await self.application.shutdown()
-                log.info("Telegram bot stopped successfully")
+                await self.application.process_update(update)
             except Exception as e:
-                log.error(f"Failed to stop Telegram bot: {e}")
+                log.error(f"Failed to handle Telegram update: {e}")
+            finally:
+                self.updates.task_done()
+    
+    async def stop(self):
+        """Stop the Telegram bot.
+        
+        New updates stop being accepted first, then queued updates and
+        queued messages are drained for up to ``telegram_drain_seconds``.
+        """
+        if self._startup is None:
+            return
+        if not self._startup.done():
+            self._startup.cancel()
+        await asyncio.gather(self._startup, return_exceptions=True)
+        self._startup = None
+        
+        try:
+            if self.updater is not None and self.updater.running:
+                await self.updater.stop()
+            if self._webhook is not None:
+                await self._webhook.cleanup()
+                self._webhook = None
+            
+            if self._workers:
+                try:
+                    await asyncio.wait_for(self.updates.join(), settings.telegram_drain_seconds)
+                except asyncio.TimeoutError:
+                    log.warning(f"Dropping {self.updates.qsize()} unhandled Telegram updates")
+                for worker in self._workers:
+                    worker.cancel()
+                await asyncio.gather(*self._workers, return_exceptions=True)
+                self._workers = []
+            
+            await self.outbox.stop(settings.telegram_drain_seconds)
+            if self.application.running:
+                await self.application.stop()
+            if self.updater is not None:
+                await self.updater.shutdown()
+            await self.application.shutdown()
+            log.info("Telegram bot stopped successfully")
+        except Exception as e:
+            log.error(f"Failed to stop Telegram bot: {e}")
+    
+    async def send_message(self, chat_id: int, text: str) -> Any:
+        """Send one message right away, bypassing the outbox."""
+        return await self.bot.send_message(chat_id=chat_id, text=text)
+    
+    def notify(self, chat_id: int, text: str) -> None:
+        """Queue a message for batched, rate-limited delivery."""
+        if self.outbox is not None:
+            self.outbox.put(chat_id, text)
+    
+    def notify_alert(self, alert: Dict[str, Any]) -> None:
+        """Alert sink for ``AlertEngine``: queue the notification for the alert's chat."""
+        from ..alerts.engine import format_alert
+        chat_id = alert["chat_id"] or settings.owner_telegram_id
+        if chat_id is not None:
+            self.notify(chat_id, format_alert(alert))
+    
+    async def cmd_alert(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """``/alert SYMBOL [above|below] PRICE [note]``: set a price alert for this chat."""
+        from ..alerts.engine import DIRECTIONS, add_alert
+        args = list(context.args or [])
+        try:
+            symbol = args.pop(0).upper()
+            direction = args.pop(0).lower() if args and args[0].lower() in DIRECTIONS else None
+            threshold = float(args.pop(0))
+        except (IndexError, ValueError):
+            await update.message.reply_text(ALERT_USAGE)
+            return
+        
+        try:
+            alert = await add_alert(update.effective_chat.id, symbol, threshold, direction,
+                                    " ".join(args) or None)
+            await update.message.reply_text(
+                f"Alert {alert['id']} set: {symbol} {alert['direction']} {threshold:g}"
+            )
+        except Exception as e:
+            log.error(f"Failed to add alert: {e}")
+            await update.message.reply_text(f"Could not set alert: {e}")
+    
+    async def cmd_alerts(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """``/alerts``: list this chat's pending alerts."""
+        from ..alerts.engine import get_alert_engine
+        alerts = get_alert_engine().list(update.effective_chat.id)
+        lines = [f"{a['id']}: {a['symbol']} {a['direction']} {a['threshold']:g}" for a in alerts]
+        await update.message.reply_text("\n".join(lines) or "No pending alerts")
+    
+    async def cmd_unalert(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """``/unalert ID``: cancel one of this chat's alerts."""
+        from ..alerts.engine import get_alert_engine
+        engine = get_alert_engine()
+        try:
+            alert_id = int(context.args[0])
+        except (IndexError, TypeError, ValueError):
+            await update.message.reply_text("Usage: /unalert ID")
+            return
+        alert = engine.alerts.get(alert_id)
+        if alert is None or alert["chat_id"] != update.effective_chat.id:
+            await update.message.reply_text(f"No alert {alert_id}")
+            return
+        engine.cancel(alert_id)
+        await update.message.reply_text(f"Alert {alert_id} cancelled")
@@ -0,0 +1,152 @@
+"""Batched, rate-limited outgoing message queue for the Telegram bot."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Telegram rejects longer message texts
+MAX_MESSAGE_CHARS = 4096
+
+Sender = Callable[[int, str], Awaitable[object]]
+
+
+def retry_delay(error: Exception) -> Optional[float]:
+    """Seconds Telegram asked us to wait, if ``error`` is a flood-control error."""
+    retry_after = getattr(error, "retry_after", None)
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after) if retry_after is not None else None
+
+
+class SendQueue:
+    """Per-chat outgoing message queue with coalescing and rate limits.
+
+    ``put`` never blocks. Lines waiting for the same chat are joined into
+    one message, so a burst of alerts for a chat becomes a single send.
+    Sends are spaced to stay under ``rate`` messages per second overall and
+    one message per ``chat_interval`` seconds per chat, matching Telegram's
+    limits. Flood-control replies pause the chat and the whole queue for
+    the requested time and the text is retried.
+    """
+
+    def __init__(self, send: Sender, rate: Optional[float] = None,
+                 chat_interval: Optional[float] = None, max_chars: int = MAX_MESSAGE_CHARS):
+        """Initialize a stopped queue delivering through ``send(chat_id, text)``."""
+        self.send = send
+        self.rate = rate or settings.telegram_rate_per_second
+        self.chat_interval = (
+            settings.telegram_chat_interval if chat_interval is None else chat_interval
+        )
+        self.max_chars = max_chars
+        self._pending: "OrderedDict[int, List[str]]" = OrderedDict()
+        self._next_chat_send: Dict[int, float] = {}
+        self._next_send = 0.0
+        self._busy: Set[int] = set()
+        self._deliveries: Set[asyncio.Task] = set()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def __len__(self) -> int:
+        return sum(len(lines) for lines in self._pending.values())
+
+    def put(self, chat_id: int, text: str) -> None:
+        """Queue a line of text for a chat."""
+        self._pending.setdefault(chat_id, []).append(text[:self.max_chars])
+        self._wake.set()
+
+    async def start(self) -> None:
+        """Start delivering in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Deliver what is queued, waiting at most ``timeout`` seconds, then stop."""
+        if self._task is None:
+            return
+        deadline = time.monotonic() + timeout
+        while (self._pending or self._deliveries) and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        if self._pending:
+            log.warning(f"Dropping {len(self)} undelivered Telegram messages")
+        self._task.cancel()
+        await asyncio.gather(self._task, *self._deliveries, return_exceptions=True)
+        self._task = None
+
+    def _take(self, chat_id: int) -> str:
+        """Remove as many queued lines for a chat as fit in one message."""
+        lines = self._pending[chat_id]
+        size = len(lines[0])
+        count = 1
+        while count < len(lines) and size + 1 + len(lines[count]) <= self.max_chars:
+            size += 1 + len(lines[count])
+            count += 1
+        text = "\n".join(lines[:count])
+        del lines[:count]
+        if not lines:
+            del self._pending[chat_id]
+        self.coalesced += count - 1
+        return text
+
+    async def _run(self) -> None:
+        while True:
+            now = time.monotonic()
+            ready = [
+                chat for chat in self._pending
+                if chat not in self._busy and self._next_chat_send.get(chat, 0.0) <= now
+            ]
+            if not ready:
+                waits = [
+                    self._next_chat_send.get(chat, 0.0) - now
+                    for chat in self._pending if chat not in self._busy
+                ]
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), min(waits) if waits else None)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            for chat in ready:
+                delay = self._next_send - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if chat not in self._pending or self._next_chat_send.get(chat, 0.0) > time.monotonic():
+                    continue
+                text = self._take(chat)
+                self._busy.add(chat)
+                self._next_send = max(self._next_send, time.monotonic()) + 1.0 / self.rate
+                self._next_chat_send[chat] = time.monotonic() + self.chat_interval
+                task = asyncio.create_task(self._deliver(chat, text))
+                self._deliveries.add(task)
+                task.add_done_callback(self._deliveries.discard)
+
+    async def _deliver(self, chat_id: int, text: str) -> None:
+        try:
+            await self.send(chat_id, text)
+            self.sent += 1
+        except Exception as e:
+            delay = retry_delay(e)
+            if delay is None:
+                self.failed += 1
+                log.error(f"Failed to send Telegram message to {chat_id}: {e}")
+            else:
+                log.warning(f"Telegram flood control, retrying chat {chat_id} in {delay:.0f}s")
+                self._pending.setdefault(chat_id, [])[:0] = [text]
+                self._pending.move_to_end(chat_id, last=False)
+                resume = time.monotonic() + delay
+                self._next_chat_send[chat_id] = resume
+                self._next_send = max(self._next_send, resume)
+        finally:
+            self._busy.discard(chat_id)
+            self._wake.set()
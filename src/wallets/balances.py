@@ -0,0 +1,159 @@
+"""Concurrent, deadline-bounded balance lookups for stored wallets."""
+
+import asyncio
+import time
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from ..metrics import get_metrics
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Chain -> (currency, base units per whole coin)
+CURRENCIES = {
+    "evm": ("ETH", 10**18),
+    "solana": ("SOL", 10**9),
+}
+
+BalanceFetcher = Callable[[List[str]], Awaitable[List[Optional[int]]]]
+
+
+async def _evm_balances(addresses: List[str]) -> List[Optional[int]]:
+    from ..evm.evm_client import get_evm_client
+    data = await get_evm_client().get_balances(addresses)
+    return [None if row[0] is None else int(row[0]) for row in data["balances"]]
+
+
+async def _solana_balances(pubkeys: List[str]) -> List[Optional[int]]:
+    from ..solana.solana_client import get_solana_client
+    data = await get_solana_client().get_sol_balances(pubkeys)
+    return data["balances_lamports"]
+
+
+DEFAULT_FETCHERS: Dict[str, BalanceFetcher] = {
+    "evm": _evm_balances,
+    "solana": _solana_balances,
+}
+
+
+class BalanceService:
+    """Native balances for many wallets at once, with a short-lived cache.
+
+    Uncached addresses are split into chunks that are fetched concurrently
+    (bounded by a semaphore) through each chain's bulk balance API. A
+    request waits at most ``deadline`` seconds; chunks still running keep
+    going in the background and fill the cache for the next request, while
+    the current one returns what it has, marking anything older or missing.
+    """
+
+    def __init__(self, fetchers: Optional[Dict[str, BalanceFetcher]] = None,
+                 ttl: Optional[float] = None, chunk_size: Optional[int] = None,
+                 concurrency: Optional[int] = None):
+        """Initialize an empty cache."""
+        self.fetchers = fetchers or DEFAULT_FETCHERS
+        self.ttl = settings.wallet_balance_ttl_seconds if ttl is None else ttl
+        self.chunk_size = chunk_size or settings.wallet_balance_chunk_size
+        self._semaphore = asyncio.Semaphore(concurrency or settings.wallet_balance_concurrency)
+        # (chain, address) -> (raw balance, fetched_at); expired entries are kept as stale fallbacks
+        self._cache: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        self._errors: Dict[Tuple[str, str], str] = {}
+        self._inflight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    async def _fetch_chunk(self, chain: str, addresses: List[str]) -> None:
+        keys = [(chain, address) for address in addresses]
+        try:
+            async with self._semaphore:
+                balances = await self.fetchers[chain](addresses)
+            now = time.monotonic()
+            for key, balance in zip(keys, balances):
+                if balance is None:
+                    self._errors[key] = "balance unavailable"
+                else:
+                    self._cache[key] = (balance, now)
+                    self._errors.pop(key, None)
+        except Exception as e:
+            log.warning(f"Failed to fetch {len(addresses)} {chain} balances: {e}")
+            for key in keys:
+                self._errors[key] = str(e)
+        finally:
+            for key in keys:
+                self._inflight.pop(key, None)
+
+    def _start_fetches(self, wallets: List[Dict[str, Any]], now: float) -> None:
+        """Start chunked fetches for every wallet that is neither fresh nor already in flight."""
+        metrics = get_metrics()
+        missing: Dict[str, List[str]] = {}
+        for wallet in wallets:
+            key = (wallet["chain"], wallet["address"])
+            cached = self._cache.get(key)
+            fresh = bool(cached) and now - cached[1] <= self.ttl
+            metrics.record_cache("wallet_balances", fresh)
+            if fresh:
+                continue
+            if key in self._inflight or wallet["chain"] not in self.fetchers:
+                continue
+            missing.setdefault(wallet["chain"], []).append(wallet["address"])
+
+        for chain, addresses in missing.items():
+            for start in range(0, len(addresses), self.chunk_size):
+                chunk = list(dict.fromkeys(addresses[start:start + self.chunk_size]))
+                task = asyncio.create_task(self._fetch_chunk(chain, chunk))
+                for address in chunk:
+                    self._inflight[(chain, address)] = task
+
+    def _entry(self, wallet: Dict[str, Any], now: float) -> Dict[str, Any]:
+        key = (wallet["chain"], wallet["address"])
+        currency, unit = CURRENCIES.get(wallet["chain"], (None, 1))
+        entry = {**wallet, "balance": None, "currency": currency,
+                 "balance_age_seconds": None, "stale": True}
+
+        cached = self._cache.get(key)
+        if cached:
+            age = now - cached[1]
+            entry["balance"] = str(Decimal(cached[0]) / unit)
+            entry["balance_age_seconds"] = round(age, 3)
+            entry["stale"] = age > self.ttl
+            entry["balance_status"] = "stale" if entry["stale"] else "fresh"
+        elif key in self._inflight:
+            entry["balance_status"] = "pending"
+        else:
+            entry["balance_status"] = "error"
+            entry["balance_error"] = self._errors.get(key, f"Unsupported chain {wallet['chain']}")
+        return entry
+
+    async def enrich(self, wallets: List[Dict[str, Any]],
+                     deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Attach native balances to wallet records, waiting at most ``deadline`` seconds.
+
+        Each record gains ``balance`` (whole coins, as a string), ``currency``,
+        ``balance_age_seconds``, ``stale`` and ``balance_status``: ``fresh``,
+        ``stale`` (an expired cached value), ``pending`` (still being fetched
+        when the deadline passed) or ``error``.
+        """
+        deadline = settings.wallet_balance_deadline_seconds if deadline is None else deadline
+        self._start_fetches(wallets, time.monotonic())
+
+        tasks = {self._inflight[key] for key in ((w["chain"], w["address"]) for w in wallets)
+                 if key in self._inflight}
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=deadline)
+            if pending:
+                log.info(f"Balance deadline passed with {len(pending)} chunks still running")
+
+        now = time.monotonic()
+        return [self._entry(wallet, now) for wallet in wallets]
+
+
+# Global service instance
+_service: Optional[BalanceService] = None
+
+
+def get_balance_service() -> BalanceService:
+    """Get the shared wallet balance service."""
+    global _service
+    if _service is None:
+        _service = BalanceService()
+    return _service
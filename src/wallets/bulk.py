@@ -0,0 +1,124 @@
+"""Bulk wallet generation in worker processes."""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.env import get_settings
+from ..logging import get_logger
+from .store import ID_PREFIXES, WalletStore, get_wallet_store
+
+log = get_logger(__name__)
+settings = get_settings()
+
+
+def generate_keys(chain: str, count: int) -> List[Dict[str, str]]:
+    """Worker entry point: generate ``count`` key pairs for one chain."""
+    if chain == "evm":
+        from eth_account import Account
+        accounts = (Account.create() for _ in range(count))
+        return [{"address": a.address, "private_key": a.key.hex()} for a in accounts]
+
+    from solders.keypair import Keypair
+    keypairs = (Keypair() for _ in range(count))
+    return [{"address": str(k.pubkey()), "private_key": k.secret().hex()} for k in keypairs]
+
+
+# Global worker pool
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _worker_count() -> int:
+    return settings.wallet_gen_workers or os.cpu_count() or 1
+
+
+def get_wallet_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool used for key generation."""
+    global _executor
+    if _executor is None:
+        # Spawn rather than fork: the server process runs an event loop and threads
+        _executor = ProcessPoolExecutor(max_workers=_worker_count(),
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_wallet_executor() -> None:
+    """Stop the key generation pool if it was started."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def create_wallets(chain: str, count: int, store: Optional[WalletStore] = None,
+                         batch_size: Optional[int] = None,
+                         progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Generate ``count`` wallets in worker processes and stream them into the store.
+
+    Keys are generated in batches across the process pool, with at most two
+    batches per worker in flight so memory stays bounded. Each finished
+    batch is inserted in one transaction from a worker thread, so the event
+    loop keeps serving other calls throughout. ``progress`` is called after
+    every batch with the running totals and throughput.
+    """
+    if chain not in ID_PREFIXES:
+        raise ValueError(f"Unknown chain {chain}")
+    if count <= 0:
+        raise ValueError("count must be positive")
+
+    store = store or get_wallet_store()
+    batch_size = batch_size or settings.wallet_gen_batch_size
+    sizes = [min(batch_size, count - start) for start in range(0, count, batch_size)]
+    executor = get_wallet_executor()
+    loop = asyncio.get_running_loop()
+    max_in_flight = 2 * _worker_count()
+
+    started = time.monotonic()
+    created = 0
+    first_id = last_id = None
+    pending = set()
+    queued = iter(sizes)
+
+    def submit() -> bool:
+        size = next(queued, None)
+        if size is None:
+            return False
+        pending.add(loop.run_in_executor(executor, generate_keys, chain, size))
+        return True
+
+    while len(pending) < max_in_flight and submit():
+        pass
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                submit()
+                stored = await store.add_many(chain, future.result())
+                created += len(stored)
+                first_id = first_id or stored[0]["id"]
+                last_id = stored[-1]["id"]
+
+                elapsed = time.monotonic() - started
+                report = {
+                    "chain": chain,
+                    "created": created,
+                    "total": count,
+                    "seconds": round(elapsed, 3),
+                    "wallets_per_second": round(created / elapsed, 1) if elapsed else None,
+                }
+                log.info(f"Generated {created}/{count} {chain} wallets "
+                         f"({report['wallets_per_second']}/s)")
+                if progress:
+                    progress(report)
+    except BaseException:
+        for future in pending:
+            future.cancel()
+        raise
+
+    report["first_id"] = first_id
+    report["last_id"] = last_id
+    return report
@@ -1,38 +1,42 @@
 """EVM wallet management."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from eth_account import Account
 from loguru import logger
 
 from ..logging import get_logger
+from .store import WalletStore, get_wallet_store
 
 log = get_logger(__name__)
 
 
 class EVMWalletManager:
-    """EVM wallet management."""
+    """EVM wallet management backed by the persistent wallet store."""
     
-    def __init__(self):
+    def __init__(self, store: Optional[WalletStore] = None):
         """Initialize the EVM wallet manager."""
-        self.wallets = []
+        self.store = store or get_wallet_store()
     
     async def create_wallet(self) -> Dict[str, Any]:
         """Create a new EVM wallet."""
         try:
             account = Account.create()
-            wallet = {
-                "id": f"evm_{len(self.wallets) + 1}",
-                "address": account.address,
-                "private_key": account.key.hex(),
-                "chain": "evm"
-            }
-            self.wallets.append(wallet)
+            private_key = account.key.hex()
+            wallet = await self.store.add("evm", account.address, private_key)
+            wallet["private_key"] = private_key
             log.info(f"Created EVM wallet: {account.address}")
             return wallet
         except Exception as e:
             log.error(f"Failed to create EVM wallet: {e}")
             raise
     
-    async def list_wallets(self) -> List[Dict[str, Any]]:
-        """List all EVM wallets."""
-        return self.wallets
+    async def create_wallets(self, count: int) -> Dict[str, Any]:
+        """Create many EVM wallets in worker processes; see ``bulk.create_wallets``."""
+        from .bulk import create_wallets
+        return await create_wallets("evm", count, self.store)
+    
+    async def list_wallets(self, limit: Optional[int] = None,
+                           cursor: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List one page of EVM wallets, without key material."""
+        page = await self.store.list("evm", limit, cursor)
+        return page["wallets"]
@@ -1,38 +1,42 @@
 """Solana wallet management."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from solders.keypair import Keypair
 from loguru import logger
 
 from ..logging import get_logger
+from .store import WalletStore, get_wallet_store
 
 log = get_logger(__name__)
 
 
 class SolWalletManager:
-    """Solana wallet management."""
+    """Solana wallet management backed by the persistent wallet store."""
     
-    def __init__(self):
+    def __init__(self, store: Optional[WalletStore] = None):
         """Initialize the Solana wallet manager."""
-        self.wallets = []
+        self.store = store or get_wallet_store()
     
     async def create_wallet(self) -> Dict[str, Any]:
         """Create a new Solana wallet."""
         try:
             keypair = Keypair()
-            wallet = {
-                "id": f"sol_{len(self.wallets) + 1}",
-                "address": str(keypair.pubkey()),
-                "private_key": keypair.secret().hex(),
-                "chain": "solana"
-            }
-            self.wallets.append(wallet)
+            private_key = keypair.secret().hex()
+            wallet = await self.store.add("solana", str(keypair.pubkey()), private_key)
+            wallet["private_key"] = private_key
             log.info(f"Created Solana wallet: {keypair.pubkey()}")
             return wallet
         except Exception as e:
             log.error(f"Failed to create Solana wallet: {e}")
             raise
     
-    async def list_wallets(self) -> List[Dict[str, Any]]:
-        """List all Solana wallets."""
-        return self.wallets
+    async def create_wallets(self, count: int) -> Dict[str, Any]:
+        """Create many Solana wallets in worker processes; see ``bulk.create_wallets``."""
+        from .bulk import create_wallets
+        return await create_wallets("solana", count, self.store)
+    
+    async def list_wallets(self, limit: Optional[int] = None,
+                           cursor: Optional[int] = None) -> List[Dict[str, Any]]:
+        """List one page of Solana wallets, without key material."""
+        page = await self.store.list("solana", limit, cursor)
+        return page["wallets"]
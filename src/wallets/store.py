@@ -0,0 +1,215 @@
+"""Persistent SQLite wallet store with encrypted key material."""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cryptography.fernet import Fernet
+
+from ..config.env import get_settings
+from ..logging import get_logger
+
+log = get_logger(__name__)
+settings = get_settings()
+
+# Chain name -> wallet id prefix
+ID_PREFIXES = {
+    "evm": "evm",
+    "solana": "sol",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wallets (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    chain TEXT NOT NULL,
+    address TEXT NOT NULL,
+    encrypted_key BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS wallets_chain_address ON wallets (chain, address);
+CREATE INDEX IF NOT EXISTS wallets_address ON wallets (address);
+CREATE INDEX IF NOT EXISTS wallets_chain_seq ON wallets (chain, seq);
+"""
+
+COLUMNS = "seq, id, chain, address, created_at"
+
+
+def _row(row: sqlite3.Row) -> Dict[str, Any]:
+    return {"id": row["id"], "chain": row["chain"], "address": row["address"],
+            "created_at": row["created_at"]}
+
+
+class WalletStore:
+    """Durable wallet table backed by SQLite in WAL mode.
+
+    Nothing is loaded into memory: the database is opened on first use and
+    every lookup goes through an index, so start-up cost and lookup cost do
+    not grow with the number of wallets. Private keys are stored encrypted
+    with Fernet and only decrypted by ``private_key()``. Blocking SQLite
+    calls run in a worker thread.
+    """
+
+    def __init__(self, path: Optional[str] = None, encryption_key: Optional[str] = None):
+        """Configure the store; the database is opened lazily."""
+        self.path = Path(path or settings.wallet_db_path)
+        self._encryption_key = encryption_key or settings.wallet_encryption_key
+        self._fernet: Optional[Fernet] = None
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _load_key(self) -> bytes:
+        if self._encryption_key:
+            return self._encryption_key.encode()
+
+        key_path = self.path.with_suffix(".key")
+        if key_path.exists():
+            return key_path.read_bytes().strip()
+
+        log.warning(f"No wallet encryption key configured, generating {key_path}")
+        key = Fernet.generate_key()
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fernet = Fernet(self._load_key())
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(SCHEMA)
+            self._db = db
+        return self._db
+
+    def _execute(self, fn, *args):
+        with self._lock:
+            return fn(self._connect(), *args)
+
+    async def _run(self, fn, *args):
+        return await asyncio.to_thread(self._execute, fn, *args)
+
+    def _insert(self, db: sqlite3.Connection, chain: str,
+                wallets: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        prefix = ID_PREFIXES[chain]
+        now = time.time()
+        with db:
+            (last,) = db.execute("SELECT COALESCE(MAX(seq), 0) FROM wallets").fetchone()
+            rows = [
+                (last + i, f"{prefix}_{last + i}", chain, w["address"],
+                 self._fernet.encrypt(w["private_key"].encode()), now)
+                for i, w in enumerate(wallets, start=1)
+            ]
+            db.executemany(
+                "INSERT INTO wallets (seq, id, chain, address, encrypted_key, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+        return [{"id": r[1], "chain": chain, "address": r[3], "created_at": now} for r in rows]
+
+    async def add_many(self, chain: str, wallets: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Insert wallets (``address`` and ``private_key``) in one transaction.
+
+        Returns the stored records, without key material. The whole batch
+        is rejected if any address already exists for the chain.
+        """
+        if chain not in ID_PREFIXES:
+            raise ValueError(f"Unknown chain {chain}")
+        if not wallets:
+            return []
+        return await self._run(self._insert, chain, wallets)
+
+    async def add(self, chain: str, address: str, private_key: str) -> Dict[str, Any]:
+        """Insert a single wallet."""
+        (wallet,) = await self.add_many(chain, [{"address": address, "private_key": private_key}])
+        return wallet
+
+    async def get(self, wallet_id: str) -> Optional[Dict[str, Any]]:
+        """Look a wallet up by id."""
+        def query(db):
+            return db.execute(f"SELECT {COLUMNS} FROM wallets WHERE id = ?", (wallet_id,)).fetchone()
+        row = await self._run(query)
+        return _row(row) if row else None
+
+    async def get_by_address(self, address: str, chain: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Look a wallet up by address, optionally restricted to one chain."""
+        def query(db):
+            if chain:
+                return db.execute(f"SELECT {COLUMNS} FROM wallets WHERE chain = ? AND address = ?",
+                                  (chain, address)).fetchone()
+            return db.execute(f"SELECT {COLUMNS} FROM wallets WHERE address = ?", (address,)).fetchone()
+        row = await self._run(query)
+        return _row(row) if row else None
+
+    async def list(self, chain: Optional[str] = None, limit: Optional[int] = None,
+                   cursor: Optional[int] = None) -> Dict[str, Any]:
+        """List one page of wallets in creation order.
+
+        Pagination is keyset-based: pass the returned ``next_cursor`` to get
+        the following page, which costs the same however deep it is.
+        """
+        limit = limit or settings.wallet_page_size
+
+        def query(db):
+            sql = f"SELECT {COLUMNS} FROM wallets WHERE seq > ?"
+            args: List[Any] = [cursor or 0]
+            if chain:
+                sql += " AND chain = ?"
+                args.append(chain)
+            sql += " ORDER BY seq LIMIT ?"
+            args.append(limit)
+            return db.execute(sql, args).fetchall()
+
+        rows = await self._run(query)
+        return {
+            "wallets": [_row(row) for row in rows],
+            "next_cursor": rows[-1]["seq"] if len(rows) == limit else None,
+        }
+
+    async def count(self, chain: Optional[str] = None) -> int:
+        """Count stored wallets, optionally for one chain."""
+        def query(db):
+            if chain:
+                return db.execute("SELECT COUNT(*) FROM wallets WHERE chain = ?", (chain,)).fetchone()[0]
+            return db.execute("SELECT COUNT(*) FROM wallets").fetchone()[0]
+        return await self._run(query)
+
+    async def private_key(self, wallet_id: str) -> Optional[str]:
+        """Decrypt and return a wallet's private key."""
+        def query(db):
+            return db.execute("SELECT encrypted_key FROM wallets WHERE id = ?", (wallet_id,)).fetchone()
+        row = await self._run(query)
+        return self._fernet.decrypt(row["encrypted_key"]).decode() if row else None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+# Global store instance
+_store: Optional[WalletStore] = None
+
+
+def get_wallet_store() -> WalletStore:
+    """Get the shared wallet store instance."""
+    global _store
+    if _store is None:
+        _store = WalletStore()
+    return _store
+
+
+def close_wallet_store() -> None:
+    """Close the shared wallet store if it was opened."""
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
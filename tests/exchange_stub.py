@@ -0,0 +1,42 @@
+"""In-memory ccxt exchange stand-ins for exchange client tests."""
+
+import asyncio
+
+import ccxt
+
+
+class TickerExchange:
+    """Counts ticker requests and answers after a short delay.
+
+    Like ccxt, a request naming a symbol outside ``listed`` raises
+    ``BadSymbol``, failing a whole ``fetch_tickers`` batch.
+    """
+
+    has = {"fetchTickers": True}
+    listed = ("BTC/USDT", "ETH/USDT", "SOL/USDT")
+
+    def __init__(self, config):
+        self.markets = {symbol: {} for symbol in self.listed}
+        self.ticker_calls = 0
+        self.tickers_calls = []
+
+    async def load_markets(self):
+        return self.markets
+
+    async def close(self):
+        pass
+
+    def _ticker(self, symbol):
+        if symbol not in self.listed:
+            raise ccxt.BadSymbol(f"binance does not have market symbol {symbol}")
+        return {"last": 100.0, "bid": 99.0, "ask": 101.0, "baseVolume": 5.0, "timestamp": 1}
+
+    async def fetch_ticker(self, symbol):
+        self.ticker_calls += 1
+        await asyncio.sleep(0.01)
+        return self._ticker(symbol)
+
+    async def fetch_tickers(self, symbols):
+        self.tickers_calls.append(list(symbols))
+        await asyncio.sleep(0.01)
+        return {s: self._ticker(s) for s in symbols}
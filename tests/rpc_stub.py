@@ -0,0 +1,59 @@
+"""Local JSON-RPC node stand-in for chain client tests."""
+
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+class JsonRpcStub:
+    """Serves JSON-RPC (single and batch) from per-method handler functions.
+
+    ``handlers`` maps a method name to a callable taking the params list and
+    returning the result. ``delays`` maps a method name to seconds to wait
+    before answering. Every HTTP request body is recorded in ``requests``.
+    """
+
+    def __init__(self, handlers, delays=None):
+        self.handlers = handlers
+        self.delays = delays or {}
+        self.requests = []
+        self.server = None
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/", self._handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.server.close()
+
+    @property
+    def url(self):
+        return str(self.server.make_url("/"))
+
+    @property
+    def calls(self):
+        """Every JSON-RPC call received, flattened across batches."""
+        flat = []
+        for body in self.requests:
+            flat.extend(body if isinstance(body, list) else [body])
+        return flat
+
+    async def _answer(self, call):
+        method = call["method"]
+        await asyncio.sleep(self.delays.get(method, 0))
+        if method not in self.handlers:
+            return {"jsonrpc": "2.0", "id": call["id"],
+                    "error": {"code": -32601, "message": f"Method {method} not found"}}
+        return {"jsonrpc": "2.0", "id": call["id"],
+                "result": self.handlers[method](call.get("params", []))}
+
+    async def _handle(self, request):
+        body = await request.json()
+        self.requests.append(body)
+        if isinstance(body, list):
+            return web.json_response([await self._answer(call) for call in body])
+        return web.json_response(await self._answer(body))
@@ -0,0 +1,54 @@
+"""Local Telegram Bot API stand-in for bot and outbox tests."""
+
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+
+class BotApiStandIn:
+    """Answers getMe, setWebhook, deleteWebhook and sendMessage.
+
+    Sent messages are recorded in ``messages`` as ``(chat_id, text,
+    monotonic time)``. With ``flood_first`` the first sendMessage is
+    refused with a 429 asking to retry after one second.
+    """
+
+    def __init__(self, flood_first=False):
+        self.messages = []
+        self.webhooks = []
+        self.flood_first = flood_first
+        self.server = None
+
+    async def _handle(self, request):
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            data = await request.json()
+        else:
+            data = dict(await request.post())
+        if method == "getMe":
+            return web.json_response({"ok": True, "result": {
+                "id": 1, "is_bot": True, "first_name": "stand-in", "username": "stand_in_bot"}})
+        if method in ("setWebhook", "deleteWebhook"):
+            self.webhooks.append((method, data))
+            return web.json_response({"ok": True, "result": True})
+        if self.flood_first:
+            self.flood_first = False
+            return web.json_response({"ok": False, "error_code": 429,
+                                      "description": "Too Many Requests: retry after 1",
+                                      "parameters": {"retry_after": 1}}, status=429)
+        self.messages.append((int(data["chat_id"]), data["text"], time.monotonic()))
+        return web.json_response({"ok": True, "result": {
+            "message_id": len(self.messages), "date": int(time.time()),
+            "chat": {"id": int(data["chat_id"]), "type": "private"}, "text": data["text"]}})
+
+    async def start(self):
+        """Start serving and return the base URL to configure as ``telegram_api_url``."""
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self._handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url("/bot"))
+
+    async def close(self):
+        await self.server.close()
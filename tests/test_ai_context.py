@@ -0,0 +1,124 @@
+"""Tests for the token-budgeted AI market context builder."""
+
+import json
+
+import numpy as np
+
+from src.ai.context import ContextBuilder, downsample, estimate_tokens, round_sig
+from src.cex.candles import CandleSeries
+from src.indicators.engine import IndicatorEngine, IndicatorParams, get_indicator_engine
+
+KEY = ("binance", "BTC/USDT", "1m")
+
+
+def _series(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 30000 + np.cumsum(rng.normal(0, 25, n))
+    series = CandleSeries(capacity=2000)
+    series.merge([
+        [i * 60_000, c, c + 10, c - 10, c, 1.5] for i, c in enumerate(close.tolist())
+    ])
+    return series
+
+
+def test_downsample_ends_on_newest_close():
+    close = np.arange(100, dtype=float)
+    sampled, step = downsample(close, 8)
+    assert step == 12
+    assert len(sampled) == 8
+    assert sampled[-1] == 99
+    assert np.all(np.diff(sampled) == 12)
+
+    sampled, step = downsample(close[:5], 8)
+    assert step == 1 and len(sampled) == 5
+
+
+def test_round_sig():
+    assert round_sig(30123.456, 3) == 30100
+    assert round_sig(0.00123456, 2) == 0.0012
+    assert round_sig(float("nan"), 3) is None
+
+
+def test_context_fits_budget_and_is_deterministic():
+    series = _series(500)
+    params = IndicatorParams()
+    small = ContextBuilder(IndicatorEngine(), max_points=48).build({KEY: series}, params, budget=128)
+    large = ContextBuilder(IndicatorEngine(), max_points=48).build({KEY: series}, params, budget=2000)
+
+    assert small["tokens"] <= 128
+    assert len(small["markets"]["binance/BTC/USDT/1m"]["close"]) < 48
+    assert len(large["markets"]["binance/BTC/USDT/1m"]["close"]) == 48
+    assert estimate_tokens(large) < estimate_tokens(series.to_dicts()) / 20
+
+    again = ContextBuilder(IndicatorEngine(), max_points=48).build({KEY: series}, params, budget=2000)
+    assert json.dumps(again) == json.dumps(large)
+
+
+def test_market_summary_cached_until_next_candle_closes():
+    series = _series(200)
+    params = IndicatorParams()
+    builder = ContextBuilder(IndicatorEngine())
+
+    first = builder.market(KEY, "1m", series, params, 512)
+    # A change to the open candle does not invalidate the summary
+    last = series.rows()[-1]
+    series.merge([[last[0], last[1], last[2] + 500, last[3], last[4] + 400, 9.0]])
+    assert builder.market(KEY, "1m", series, params, 512) is first
+    assert builder.hits == 1
+
+    # A new candle closes the previous one
+    series.merge([[last[0] + 60_000, 1.0, 1.0, 1.0, 1.0, 1.0]])
+    updated = builder.market(KEY, "1m", series, params, 512)
+    assert updated["t"] == last[0]
+    assert updated["px"] == round_sig(last[4] + 400, builder.digits)
+    assert builder.misses == 2
+
+
+def test_position_deltas_since_previous_build():
+    builder = ContextBuilder(IndicatorEngine())
+    rows = [
+        {"account": "cex:binance", "asset": "BTC", "quantity": 0.5, "value_usd": 15000.0},
+        {"account": "evm:0xabc", "asset": "ETH", "quantity": 2.0, "value_usd": 6000.0},
+    ]
+    assert builder.positions(["BTC/USDT"], rows) == {"BTC": {"qty": 0.5, "usd": 15000.0, "d_qty": 0.0}}
+
+    rows[0] = {**rows[0], "quantity": 0.75}
+    assert builder.positions(["BTC/USDT"], rows)["BTC"]["d_qty"] == 0.25
+
+
+def test_position_baselines_are_kept_per_caller():
+    builder = ContextBuilder(IndicatorEngine())
+    rows = [{"account": "cex:binance", "asset": "BTC", "quantity": 0.5, "value_usd": 15000.0}]
+    builder.positions(["BTC/USDT"], rows, "query_ai")
+    rows[0] = {**rows[0], "quantity": 0.75}
+    assert builder.positions(["BTC/USDT"], rows, "get_ai_context")["BTC"]["d_qty"] == 0.0
+    assert builder.positions(["BTC/USDT"], rows, "query_ai")["BTC"]["d_qty"] == 0.25
+
+
+def test_market_summaries_are_evicted_least_recently_used_first():
+    series = _series(200)
+    params = IndicatorParams()
+    builder = ContextBuilder(IndicatorEngine(), max_entries=2)
+    first = builder.market(KEY, "1m", series, params, 256)
+    builder.market(KEY, "1m", series, params, 512)
+    assert builder.market(KEY, "1m", series, params, 256) is first
+    builder.market(KEY, "1m", series, params, 1024)
+
+    assert builder.market(KEY, "1m", series, params, 256) is first
+    builder.market(KEY, "1m", series, params, 512)
+    assert (builder.hits, builder.misses) == (2, 4)
+
+
+def test_many_series_are_cut_to_the_budget():
+    series = {(venue, "BTC/USDT", "1m"): _series(300) for venue in "abcdefgh"}
+    context = ContextBuilder(IndicatorEngine()).build(series, IndicatorParams(), budget=300)
+
+    assert context["tokens"] <= 300
+    kept, omitted = list(context["markets"]), context["omitted"]
+    assert kept and omitted
+    assert sorted(kept + omitted) == [f"{v}/BTC/USDT/1m" for v in "abcdefgh"]
+    assert max(kept) < min(omitted)
+
+
+def test_builder_keeps_indicator_state_apart_from_the_shared_engine():
+    assert ContextBuilder().indicators is not get_indicator_engine()
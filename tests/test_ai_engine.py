@@ -0,0 +1,143 @@
+"""Tests for AI response caching, concurrency limits and hedging against stub providers."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.ai import engine as ai
+from src.ai.engine import AIDecisionEngine, cache_key
+
+
+class StubProvider:
+    """Local chat-completions (and Gemini) endpoint with a configurable delay."""
+
+    def __init__(self, name, delay=0.0):
+        self.name = name
+        self.delay = delay
+        self.status = 200
+        self.requests = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def _handle(self, request):
+        body = await request.json()
+        self.requests += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        if self.status != 200:
+            return web.json_response({"error": "unavailable"}, status=self.status)
+        text = f"{self.name} answer"
+        if "contents" in body:
+            return web.json_response({"candidates": [{"content": {"parts": [{"text": text}]}}]})
+        return web.json_response({"choices": [{"message": {"content": text}}]})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/chat/completions", self._handle)
+        app.router.add_post("/models/{model}", self._handle)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        return str(self.server.make_url("")).rstrip("/")
+
+
+@pytest.fixture
+async def providers(monkeypatch):
+    openai, gemini = StubProvider("openai"), StubProvider("gemini")
+    monkeypatch.setattr(ai.settings, "openai_api_key", "test")
+    monkeypatch.setattr(ai.settings, "google_api_key", "test")
+    monkeypatch.setattr(ai.settings, "deepseek_api_key", None)
+    monkeypatch.setattr(ai.settings, "openai_base_url", await openai.start())
+    monkeypatch.setattr(ai.settings, "gemini_base_url", await gemini.start())
+    monkeypatch.setattr(ai.settings, "ai_provider_concurrency", 2)
+    engine = AIDecisionEngine()
+    yield engine, openai, gemini
+    await engine.close()
+    await openai.server.close()
+    await gemini.server.close()
+
+
+def test_cache_key_normalizes_whitespace_and_context_order():
+    assert cache_key("  BTC   outlook\n", {"a": 1, "b": 2}) == cache_key("BTC outlook", {"b": 2, "a": 1})
+    assert cache_key("BTC outlook", {"a": 1}) != cache_key("BTC outlook", {"a": 2})
+
+
+async def test_cache_and_per_provider_concurrency(providers):
+    engine, openai, _ = providers
+    openai.delay = 0.05
+
+    answers = await asyncio.gather(*(engine.query_provider("openai", f"prompt {i}") for i in range(6)))
+    assert answers == ["openai answer"] * 6
+    assert openai.max_active == 2
+
+    # Repeats are served from cache; concurrent identical queries share one request
+    await asyncio.gather(*(engine.query_provider("openai", "prompt  0") for _ in range(3)))
+    await asyncio.gather(*(engine.query("fresh prompt", provider="openai", hedge=False) for _ in range(3)))
+    assert openai.requests == 7
+    assert (await engine.query("fresh prompt", provider="openai"))["cached"] is True
+
+
+async def test_cached_answers_are_kept_apart_per_provider(providers):
+    engine, openai, gemini = providers
+    assert await engine.query_provider("openai", "BTC outlook") == "openai answer"
+    assert await engine.query_provider("gemini", "BTC outlook") == "gemini answer"
+    assert await engine.query_provider("openai", "BTC outlook") == "openai answer"
+    assert (openai.requests, gemini.requests) == (1, 1)
+
+    # An unpinned query takes any cached answer, a pinned one only its provider's
+    first = await engine.query("ETH outlook", provider="gemini", hedge=False)
+    assert (await engine.query("ETH outlook"))["cached"] is True
+    pinned = await engine.query("ETH outlook", provider="openai", hedge=False)
+    assert first["provider"] == "gemini"
+    assert pinned == {"provider": "openai", "response": "openai answer", "cached": False, "hedged": False}
+
+
+async def test_slow_primary_is_hedged_to_second_provider(providers, monkeypatch):
+    engine, openai, gemini = providers
+    openai.delay = 0.01
+    for _ in range(ai.MIN_LATENCY_SAMPLES):
+        await engine.query_provider("openai", f"warmup {_}")
+    assert engine.hedge_delay(ai.AIProvider.OPENAI) < 0.1
+
+    # The primary now stalls; the hedge fires after its p90 and wins
+    openai.delay = 1.0
+    started = asyncio.get_running_loop().time()
+    result = await engine.query("ETH outlook", provider="openai", hedge=True)
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert result == {"provider": "gemini", "response": "gemini answer", "cached": False, "hedged": True}
+    assert engine.stats()["hedge_wins"] == 1
+    assert gemini.requests == 1
+
+    # Without hedging the primary's answer is awaited
+    openai.delay = 0.01
+    result = await engine.query("SOL outlook", provider="openai", hedge=False)
+    assert result["provider"] == "openai" and not result["hedged"]
+
+
+async def test_failing_primary_fails_over_without_waiting(providers):
+    engine, openai, gemini = providers
+    openai.status = 429
+    started = asyncio.get_running_loop().time()
+    result = await engine.query("DOGE outlook", provider="openai", hedge=True)
+
+    # The hedge delay defaults to 2 s without latency samples; the failover does not wait for it
+    assert asyncio.get_running_loop().time() - started < 0.5
+    assert result["provider"] == "gemini"
+    assert engine.stats()["failovers"] == 1 and engine.stats()["hedges"] == 0
+
+    with pytest.raises(Exception, match="All AI providers failed"):
+        await engine.query("DOGE outlook", provider="openai", hedge=False)
+
+
+async def test_both_query_paths_share_one_in_flight_request(providers):
+    engine, openai, _ = providers
+    openai.delay = 0.05
+    answers = await asyncio.gather(engine.query_provider("openai", "ADA outlook"),
+                                   engine.query("ADA outlook", provider="openai", hedge=False))
+    assert answers[0] == answers[1]["response"] == "openai answer"
+    assert openai.requests == 1
@@ -0,0 +1,154 @@
+"""Tests for the price alert engine and the Telegram send queue against a local Bot API stand-in."""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from src.alerts import engine as alert_engine
+from src.alerts.engine import AlertEngine, add_alert
+from src.cex import ccxt_client, pool
+from src.cex.ccxt_client import CCXTClient
+from src.telegram import bot as telegram_bot
+from src.telegram.bot import TelegramBot
+from src.telegram.outbox import SendQueue
+from tests.exchange_stub import TickerExchange
+from tests.telegram_stub import BotApiStandIn
+
+
+def test_alerts_fire_once_when_crossed():
+    fired = []
+    engine = AlertEngine(notify=fired.append)
+    engine.on_price("BTC/USDT", 100.0)
+    up = engine.add(1, "BTC/USDT", 110.0)
+    down = engine.add(1, "BTC/USDT", 90.0)
+    assert (up["direction"], down["direction"]) == ("above", "below")
+
+    assert engine.on_price("BTC/USDT", 105.0) == []
+    assert [a["id"] for a in engine.on_price("BTC/USDT", 111.0)] == [up["id"]]
+    assert engine.on_price("BTC/USDT", 120.0) == []
+    assert [a["id"] for a in engine.on_price("BTC/USDT", 80.0)] == [down["id"]]
+    assert [a["price"] for a in fired] == [111.0, 80.0]
+    assert len(engine) == 0 and engine.symbols() == []
+
+    with pytest.raises(ValueError):
+        engine.add(1, "ETH/USDT", 10.0)
+
+
+def test_cancelled_alerts_never_fire():
+    engine = AlertEngine()
+    alerts = [engine.add(1, "ETH/USDT", float(t), "above") for t in range(10)]
+    for alert in alerts[::2]:
+        assert engine.cancel(alert["id"])
+    assert not engine.cancel(alerts[0]["id"])
+    fired = engine.on_price("ETH/USDT", 100.0)
+    assert [a["id"] for a in fired] == [a["id"] for a in alerts[1::2]]
+
+
+def test_matches_linear_scan():
+    rng = random.Random(3)
+    engine = AlertEngine()
+    pending = {}
+    symbols = [f"S{i}/USDT" for i in range(20)]
+    for _ in range(2000):
+        alert = engine.add(rng.randrange(5), rng.choice(symbols), rng.uniform(50, 150),
+                           rng.choice(("above", "below")))
+        pending[alert["id"]] = alert
+    for alert_id in rng.sample(sorted(pending), 300):
+        engine.cancel(alert_id)
+        del pending[alert_id]
+
+    for _ in range(500):
+        symbol, price = rng.choice(symbols), rng.uniform(40, 160)
+        expected = {
+            a["id"] for a in pending.values() if a["symbol"] == symbol and (
+                a["threshold"] <= price if a["direction"] == "above" else a["threshold"] >= price
+            )
+        }
+        fired = {a["id"] for a in engine.on_price(symbol, price)}
+        assert fired == expected
+        for alert_id in fired:
+            del pending[alert_id]
+    assert len(engine) == len(pending)
+
+
+async def test_unpriceable_symbol_does_not_hold_back_other_alerts(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", TickerExchange)
+    client = CCXTClient()
+    # Markets not loaded yet, so the unlisted symbol reaches fetch_tickers
+    client.exchange.markets = None
+    fired = []
+    engine = AlertEngine(notify=fired.append)
+    engine.add(1, "FOO/USDT", 1.0, "above")
+    healthy = engine.add(2, "BTC/USDT", 50.0, "above")
+
+    assert await engine.poll_once(client) == 1
+    assert [a["id"] for a in fired] == [healthy["id"]]
+    assert engine.symbols() == ["FOO/USDT"]
+
+
+async def test_add_alert_refuses_unlisted_symbols(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", TickerExchange)
+    monkeypatch.setattr(pool, "_pool", pool.ExchangePool())
+    monkeypatch.setattr(alert_engine, "_engine", AlertEngine())
+    try:
+        with pytest.raises(ValueError, match="not listed"):
+            await add_alert(1, "FOO/USDT", 1.0, "above")
+        alert = await add_alert(1, "BTC/USDT", 150.0)
+        assert alert["direction"] == "above"
+        assert alert_engine.get_alert_engine().symbols() == ["BTC/USDT"]
+    finally:
+        await alert_engine.stop_alert_engine()
+        await pool.close_exchange_pool()
+
+
+@pytest.fixture
+async def bot_api(monkeypatch):
+    stand_in = BotApiStandIn()
+    monkeypatch.setattr(telegram_bot.settings, "telegram_bot_token", "123:TEST")
+    monkeypatch.setattr(telegram_bot.settings, "telegram_api_url", await stand_in.start())
+    monkeypatch.setattr(telegram_bot.settings, "owner_telegram_id", None)
+    bot = TelegramBot()
+    await bot.bot.initialize()
+    yield bot, stand_in
+    await bot.bot.shutdown()
+    await stand_in.close()
+
+
+async def test_alert_bursts_coalesce_per_chat(bot_api):
+    bot, stand_in = bot_api
+    bot.outbox = SendQueue(bot.send_message, rate=100, chat_interval=0.2)
+    await bot.outbox.start()
+
+    engine = AlertEngine(notify=bot.notify_alert)
+    engine.on_price("BTC/USDT", 100.0)
+    for i in range(50):
+        engine.add(7 if i % 2 else 8, "BTC/USDT", 101.0 + i)
+    engine.on_price("BTC/USDT", 200.0)
+    engine.add(7, "BTC/USDT", 250.0)
+    await asyncio.sleep(0.05)
+    engine.on_price("BTC/USDT", 260.0)
+    await bot.outbox.stop()
+
+    # One message per chat for the burst, then one more for chat 7 after its interval
+    chats = [chat for chat, _, _ in stand_in.messages]
+    assert sorted(chats) == [7, 7, 8]
+    assert sum(text.count("\n") + 1 for _, text, _ in stand_in.messages) == 51
+    sent_at = [at for chat, _, at in stand_in.messages if chat == 7]
+    assert sent_at[1] - sent_at[0] >= 0.2
+    assert bot.outbox.coalesced == 48
+
+
+async def test_flood_control_retries_after_delay(bot_api):
+    bot, stand_in = bot_api
+    stand_in.flood_first = True
+    outbox = SendQueue(bot.send_message, rate=100, chat_interval=0)
+    await outbox.start()
+    started = time.monotonic()
+    outbox.put(5, "hello")
+    await outbox.stop(timeout=3)
+
+    assert [(chat, text) for chat, text, _ in stand_in.messages] == [(5, "hello")]
+    assert stand_in.messages[0][2] - started >= 1.0
+    assert outbox.sent == 1 and outbox.failed == 0
@@ -0,0 +1,89 @@
+"""Tests for the vectorized backtesting engine."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from src.backtest import engine
+from src.backtest.engine import expand_grid, simulate, sma_cross, sweep
+
+HOUR = 3_600_000
+
+
+def _columns(close):
+    close = np.asarray(close, dtype=float)
+    return {"timestamp": np.arange(len(close), dtype=np.int64) * HOUR, "close": close,
+            "high": close, "low": close, "volume": np.ones(len(close))}
+
+
+def test_simulate_charges_costs_and_avoids_lookahead():
+    columns = _columns([100, 110, 121, 121])
+    # Go long on the first close and exit on the third
+    position = np.array([1.0, 1.0, 0.0, 0.0])
+
+    result = simulate(columns, position, fee_rate=0.001, slippage_bps=10, periods_per_year=1)
+
+    cost = 0.002
+    expected = (1 - cost) * 1.1 * (1.1 - cost) - 1
+    assert result["total_return"] == pytest.approx(expected)
+    assert result["trades"] == 2
+    assert result["fees_paid"] == pytest.approx(2 * cost)
+    assert result["max_drawdown"] == pytest.approx(0.0)
+
+
+def test_sma_cross_is_flat_during_warmup():
+    close = np.linspace(100, 200, 50)
+    position = sma_cross(_columns(close), fast=5, slow=10)
+
+    assert (position[:9] == 0).all()
+    assert (position[9:] == 1).all()
+    with pytest.raises(ValueError):
+        sma_cross(_columns(close), fast=10, slow=5)
+
+
+async def test_sweep_ranks_results_in_worker_processes(monkeypatch):
+    monkeypatch.setattr(engine.settings, "backtest_workers", 2)
+    rng = np.random.default_rng(0)
+    columns = _columns(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 2000))))
+    param_sets = expand_grid({"fast": list(range(2, 12)), "slow": [5, 10, 20, 40, 80, 160, 320]})
+    assert len(param_sets) >= engine.MIN_PARALLEL_RUNS
+
+    try:
+        results = await sweep(columns, "sma_cross", param_sets, fee_rate=0.0, slippage_bps=0.0)
+    finally:
+        engine.shutdown_backtest_executor()
+
+    assert len(results) == len(param_sets)
+    scored = [r for r in results if "error" not in r]
+    assert all(a["sharpe"] >= b["sharpe"] for a, b in zip(scored, scored[1:]))
+    # fast >= slow combinations are rejected but still reported
+    assert any("error" in r for r in results)
+    inline = engine.run_backtest(columns, "sma_cross", scored[0]["params"], 0.0, 0.0,
+                                 engine.periods_per_year(columns["timestamp"]))
+    assert inline["sharpe"] == pytest.approx(scored[0]["sharpe"])
+
+
+async def test_small_sweeps_run_off_the_event_loop(monkeypatch):
+    threads = []
+    run_chunk = engine._run_chunk
+
+    def recording_chunk(*args):
+        threads.append(threading.current_thread())
+        return run_chunk(*args)
+
+    monkeypatch.setattr(engine, "_run_chunk", recording_chunk)
+    columns = _columns(np.linspace(100, 200, 100))
+    results = await sweep(columns, "sma_cross", expand_grid({"fast": [2, 3], "slow": [5]}),
+                          sort_by="max_drawdown")
+    assert len(results) == 2
+    assert threads and threads[0] is not threading.main_thread()
+
+    with pytest.raises(ValueError, match="sort_by"):
+        await sweep(columns, "sma_cross", [{}], sort_by="profit")
+
+
+def test_expand_grid_refuses_oversized_grids():
+    assert len(expand_grid({"fast": [1, 2, 3], "slow": [4, 5]}, max_runs=6)) == 6
+    with pytest.raises(ValueError, match="more than the maximum"):
+        expand_grid({"fast": list(range(100)), "slow": list(range(100))}, max_runs=9999)
@@ -0,0 +1,125 @@
+"""Tests for the incremental OHLCV candle cache."""
+
+import time
+
+from src.cex.candles import CandleSeries, CandleStore
+
+MINUTE = 60_000
+
+
+class FakeExchange:
+    """Only what the candle store needs from a ccxt exchange."""
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return 60
+
+
+class FakeClient:
+    """Records get_ohlcv calls and serves candles from a fixed list."""
+
+    def __init__(self, rows):
+        self.exchange = FakeExchange()
+        self.rows = rows
+        self.calls = []
+
+    async def get_ohlcv(self, symbol, timeframe="1h", limit=100, since=None):
+        self.calls.append({"symbol": symbol, "limit": limit, "since": since})
+        rows = [r for r in self.rows if since is None or r[0] >= since]
+        return rows[-limit:] if limit else rows
+
+
+def _candles(start, count, close=1.0):
+    return [[start + i * MINUTE, 1.0, 2.0, 0.5, close, 10.0] for i in range(count)]
+
+
+def test_series_merge_appends_and_refreshes_open_bar():
+    series = CandleSeries(capacity=3)
+    assert series.merge(_candles(0, 2)) == 2
+
+    # Same timestamp overwrites the open bar, newer ones append
+    added = series.merge([[MINUTE, 1.0, 3.0, 0.5, 2.5, 20.0], [2 * MINUTE, 1, 1, 1, 1, 1]])
+    assert added == 1
+    assert series.rows()[1] == [MINUTE, 1.0, 3.0, 0.5, 2.5, 20.0]
+
+    # Bounded ring drops the oldest candles
+    series.merge(_candles(3 * MINUTE, 2))
+    assert len(series) == 3
+    assert series.timestamp[0] == 2 * MINUTE
+    assert series.to_dicts(limit=1)[0]["timestamp"] == 4 * MINUTE
+
+
+async def test_store_fetches_only_newer_candles():
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    client = FakeClient(_candles(now - 9 * MINUTE, 10))
+    store = CandleStore(capacity=100, max_series=4, refresh_seconds=0)
+
+    series = await store.get(client, "binance", "BTC/USDT", "1m", limit=10)
+    assert len(series) == 10
+    assert client.calls[0]["since"] is None
+
+    client.rows.append([now + MINUTE, 1.0, 2.0, 0.5, 3.0, 10.0])
+    series = await store.get(client, "binance", "BTC/USDT", "1m", limit=10)
+    assert client.calls[1]["since"] == now
+    assert len(series) == 11
+    assert series.close[-1] == 3.0
+
+
+async def test_deeper_read_backfills_a_shallow_series():
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    client = FakeClient(_candles(now - 199 * MINUTE, 200))
+    store = CandleStore(capacity=150, max_series=4, refresh_seconds=60)
+
+    assert len(await store.get(client, "binance", "BTC/USDT", "1m", limit=5)) == 5
+    series = await store.get(client, "binance", "BTC/USDT", "1m", limit=100)
+    assert len(series) == 100
+    assert series.timestamp[0] == now - 99 * MINUTE
+    # Deeper than the capacity is capped; shallower reads are served from memory
+    assert len(await store.get(client, "binance", "BTC/USDT", "1m", limit=500)) == 150
+    await store.get(client, "binance", "BTC/USDT", "1m", limit=20)
+    assert [call["limit"] for call in client.calls] == [5, 100, 150]
+
+
+async def test_store_serves_fresh_series_from_memory_and_evicts_lru():
+    now = int(time.time() * 1000)
+    client = FakeClient(_candles(now - 5 * MINUTE, 5))
+    store = CandleStore(capacity=100, max_series=2, refresh_seconds=60)
+
+    await store.get(client, "binance", "BTC/USDT", "1m")
+    await store.get(client, "binance", "BTC/USDT", "1m")
+    assert len(client.calls) == 1
+
+    await store.get(client, "binance", "ETH/USDT", "1m")
+    await store.get(client, "binance", "SOL/USDT", "1m")
+    assert len(store) == 2
+    assert ("binance", "BTC/USDT", "1m") not in store._series
+
+
+class FakePool:
+    """Hands out one fake client per venue and fails for unknown venues."""
+
+    def __init__(self, clients):
+        self.clients = clients
+
+    async def get(self, venue):
+        if venue not in self.clients:
+            raise ValueError(f"Venue {venue} not configured")
+        return self.clients[venue]
+
+
+async def test_store_get_many_returns_partial_results():
+    now = int(time.time() * 1000)
+    client = FakeClient(_candles(now - 5 * MINUTE, 5))
+    client.venue = "binance"
+    store = CandleStore(capacity=100, max_series=8, refresh_seconds=0)
+
+    keys = [
+        ("binance", "BTC/USDT", "1m"),
+        ("binance", "ETH/USDT", "1m"),
+        ("kraken", "BTC/USD", "1m"),
+    ]
+    data = await store.get_many(FakePool({"binance": client}), keys, limit=3)
+
+    assert set(data["candles"]) == {"binance/BTC/USDT/1m", "binance/ETH/USDT/1m"}
+    assert len(data["candles"]["binance/BTC/USDT/1m"]) == 3
+    assert "kraken/BTC/USD/1m" in data["errors"]
@@ -0,0 +1,65 @@
+"""Tests for the shared exchange client pool."""
+
+import pytest
+
+from src.cex import ccxt_client
+from src.cex.pool import ExchangePool
+
+
+class FakeExchange:
+    """Minimal stand-in for a ccxt async exchange."""
+
+    instances = 0
+
+    def __init__(self, config):
+        FakeExchange.instances += 1
+        self.config = config
+        self.markets_loaded = 0
+        self.closed = False
+
+    async def load_markets(self):
+        self.markets_loaded += 1
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_binance(monkeypatch):
+    FakeExchange.instances = 0
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", FakeExchange)
+    monkeypatch.setattr(ccxt_client.settings, "binance_api_key", "key")
+    monkeypatch.setattr(ccxt_client.settings, "binance_secret", "secret")
+    return FakeExchange
+
+
+async def test_pool_reuses_client_per_venue_and_credentials(fake_binance):
+    pool = ExchangePool()
+
+    first = await pool.get()
+    second = await pool.get("binance")
+    other = await pool.get("binance", api_key="other", secret="other")
+
+    assert first is second
+    assert other is not first
+    assert len(pool) == 2
+    assert fake_binance.instances == 2
+
+
+async def test_pool_warms_and_closes_clients(fake_binance):
+    pool = ExchangePool()
+
+    await pool.warm()
+    client = await pool.get()
+    assert client.exchange.markets_loaded == 1
+
+    await pool.close()
+    assert client.exchange.closed
+    assert len(pool) == 0
+
+
+async def test_pool_rejects_unconfigured_venue(fake_binance):
+    pool = ExchangePool()
+
+    with pytest.raises(ValueError):
+        await pool.get("kraken")
@@ -0,0 +1,98 @@
+"""Tests for background chain-head tracking against local node stand-ins."""
+
+import asyncio
+
+from solders.hash import Hash
+
+from src.chain_heads import HeadTracker, evm_head_fetcher, solana_head_fetcher
+from src.evm.evm_client import EVMClient
+from src.solana.solana_client import SolanaClient
+from tests.rpc_stub import JsonRpcStub
+
+
+def _block(number):
+    return {
+        "number": hex(number), "hash": "0x" + f"{number:064x}", "parentHash": "0x" + "00" * 32,
+        "timestamp": hex(1_700_000_000 + number * 12), "baseFeePerGas": hex(10**9 + number),
+        "gasLimit": "0x1c9c380", "gasUsed": "0x0", "transactions": [],
+    }
+
+
+async def test_evm_tracker_publishes_new_blocks_and_backs_off_on_errors():
+    state = {"number": 100, "failures": 2}
+
+    def get_block(params):
+        assert params == ["latest", False]
+        if state["failures"]:
+            state["failures"] -= 1
+            raise RuntimeError("node down")
+        state["number"] += 1
+        return _block(state["number"])
+
+    async with JsonRpcStub({"eth_getBlockByNumber": get_block}) as node:
+        client = EVMClient(node.url)
+        tracker = HeadTracker("ethereum", evm_head_fetcher(client), interval=0.01, max_backoff=0.05)
+        await tracker.start()
+        try:
+            head = await tracker.wait_for_head(timeout=5)
+            assert head["number"] == 101
+            assert head["base_fee"] == 10**9 + 101
+            assert tracker.is_fresh
+
+            seen = []
+            async for head in tracker.subscribe():
+                seen.append(head["number"])
+                if len(seen) == 3:
+                    break
+            assert seen == sorted(seen) and seen[0] > 101
+
+            # Reading the cached head does no I/O
+            calls = len(node.calls)
+            assert tracker.head["number"] >= seen[-1]
+            assert tracker.snapshot()["head"] is tracker.head
+            assert len(node.calls) - calls <= 1
+        finally:
+            await tracker.stop()
+            await client.close()
+
+
+async def test_solana_tracker_reads_slot_and_blockhash():
+    blockhash = Hash.new_unique()
+    slots = iter([500, 500, 502])
+
+    def get_latest_blockhash(params):
+        return {"context": {"slot": next(slots, 502)},
+                "value": {"blockhash": str(blockhash), "lastValidBlockHeight": 900}}
+
+    async with JsonRpcStub({"getLatestBlockhash": get_latest_blockhash}) as node:
+        client = SolanaClient(node.url)
+        tracker = HeadTracker("solana", solana_head_fetcher(client), interval=0.01)
+        try:
+            assert (await tracker.poll_once())["number"] == 500
+            # An unchanged slot is not republished
+            assert await tracker.poll_once() is None
+
+            waiter = asyncio.create_task(tracker.wait_for_head(after=500, timeout=5))
+            await asyncio.sleep(0)
+            await tracker.poll_once()
+            head = await waiter
+            assert head == {"number": 502, "hash": str(blockhash), "last_valid_block_height": 900}
+        finally:
+            await tracker.stop()
+            await client.close()
+
+
+async def test_wait_for_head_spans_several_published_heads():
+    numbers = iter([101, 102, 103, 104])
+
+    async def fetch_head():
+        return {"number": next(numbers)}
+
+    tracker = HeadTracker("ethereum", fetch_head, interval=1)
+    await tracker.poll_once()
+    waiter = asyncio.create_task(tracker.wait_for_head(after=103, timeout=5))
+    for _ in range(3):
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        await tracker.poll_once()
+    assert (await waiter)["number"] == 104
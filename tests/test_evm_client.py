@@ -0,0 +1,120 @@
+"""Tests for the async EVM client against a local JSON-RPC stand-in."""
+
+import asyncio
+
+import pytest
+from eth_abi import decode, encode
+
+from src.evm import evm_client
+from src.evm.evm_client import EVMClient
+from tests.rpc_stub import JsonRpcStub
+
+ADDRESS = "0x" + "11" * 20
+
+
+def _block(params):
+    return {"number": hex(123), "hash": "0x" + "ab" * 32, "parentHash": "0x" + "00" * 32,
+            "timestamp": hex(1700000000), "baseFeePerGas": hex(10**9), "transactions": []}
+
+
+async def test_construction_does_no_io_and_calls_are_async():
+    async with JsonRpcStub({"eth_getBalance": lambda p: hex(2 * 10**18),
+                            "eth_getBlockByNumber": _block}) as node:
+        client = EVMClient(rpc_url=node.url)
+        assert node.requests == []
+
+        try:
+            balance = await client.get_eth_balance(ADDRESS)
+            assert balance["balance_eth"] == 2.0
+            assert await client.test_connection()
+            # Both calls reuse the one pooled session
+            session = client._session
+            await client.get_eth_balance(ADDRESS)
+            assert client._session is session
+        finally:
+            await client.close()
+        assert session.closed
+
+
+async def test_slow_node_times_out_without_blocking_the_loop(monkeypatch):
+    monkeypatch.setattr(evm_client.settings, "evm_rpc_timeout", 0.2)
+    async with JsonRpcStub({"eth_getBalance": lambda p: hex(1)},
+                           delays={"eth_getBalance": 1.0}) as node:
+        client = EVMClient(rpc_url=node.url)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await client.get_eth_balance(ADDRESS)
+        finally:
+            task.cancel()
+            await client.close()
+        assert ticks >= 5
+
+
+TOKEN = "0x" + "aa" * 20
+BROKEN_TOKEN = "0x" + "bb" * 20
+
+
+def _native(address):
+    return int(address[-2:], 16) * 10**18
+
+
+def _token(address):
+    return int(address[-2:], 16) * 1_000_000
+
+
+def _eth_call(params):
+    call = params[0]
+    to, data = call["to"].lower(), bytes.fromhex(call["data"][2:])
+    if to == evm_client.MULTICALL3_ADDRESS.lower():
+        (subcalls,) = decode(["(address,bool,bytes)[]"], data[4:])
+        results = []
+        for target, _, calldata in subcalls:
+            owner = "0x" + calldata[-20:].hex()
+            if target.lower() == evm_client.MULTICALL3_ADDRESS.lower():
+                results.append((True, _native(owner).to_bytes(32, "big")))
+            elif target.lower() == TOKEN:
+                results.append((True, _token(owner).to_bytes(32, "big")))
+            else:
+                results.append((False, b""))
+        return "0x" + encode(["(bool,bytes)[]"], [results]).hex()
+    if to == TOKEN:
+        return hex(_token("0x" + data[-20:].hex()))
+    raise ValueError("execution reverted")
+
+
+@pytest.mark.parametrize("mode", ["batch", "multicall"])
+async def test_get_balances_batches_and_chunks(monkeypatch, mode):
+    monkeypatch.setattr(evm_client.settings, "evm_rpc_batch_size", 4)
+    monkeypatch.setattr(evm_client.settings, "evm_multicall_size", 5)
+    addresses = ["0x" + f"{i:040x}" for i in range(1, 8)]
+
+    def handle_call(params):
+        try:
+            return _eth_call(params)
+        except ValueError:
+            return None
+
+    async with JsonRpcStub({"eth_getBalance": lambda p: hex(_native(p[0])),
+                            "eth_call": handle_call}) as node:
+        client = EVMClient(rpc_url=node.url)
+        try:
+            table = await client.get_balances(addresses, [TOKEN, BROKEN_TOKEN], mode=mode)
+        finally:
+            await client.close()
+
+    assert table["assets"] == ["ETH", TOKEN, BROKEN_TOKEN]
+    assert table["balances"][2] == [str(3 * 10**18), str(3_000_000), None]
+    assert len(table["balances"]) == 7
+    # Every request is a batch within the configured size
+    assert all(isinstance(body, list) and len(body) <= 4 for body in node.requests)
+    expected_calls = 7 * 3 if mode == "batch" else 5  # 21 multicall subcalls in chunks of 5
+    assert len(node.calls) == expected_calls
@@ -0,0 +1,117 @@
+"""Tests for the on-disk candle history store and backfill."""
+
+import time
+
+import pytest
+
+from src.cex.history import HistoryStore
+
+MINUTE = 60_000
+
+
+class FakeExchange:
+    rateLimit = 0
+
+    @staticmethod
+    def parse_timeframe(timeframe):
+        return 60
+
+
+class PagingClient:
+    """Serves a fixed candle list in pages, like fetch_ohlcv with since/limit."""
+
+    venue = "binance"
+
+    def __init__(self, rows):
+        self.exchange = FakeExchange()
+        self.rows = rows
+        self.calls = 0
+
+    async def get_ohlcv(self, symbol, timeframe="1h", limit=100, since=None):
+        self.calls += 1
+        return [r for r in self.rows if r[0] >= since][:limit]
+
+
+def _candles(start, count):
+    return [[start + i * MINUTE, 1.0, 2.0, 0.5, float(i), 10.0] for i in range(count)]
+
+
+async def test_backfill_pages_and_resumes(tmp_path):
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    start = now - 50 * MINUTE
+    client = PagingClient(_candles(start, 51))
+    store = HistoryStore(root=str(tmp_path), page_limit=20)
+
+    result = await store.backfill(client, "BTC/USDT", "1m", since=start)
+    # The still-open candle at ``now`` is not persisted
+    assert result["written"] == 50
+    assert result["pages"] == 3
+
+    client.calls = 0
+    result = await store.backfill(client, "BTC/USDT", "1m", since=start)
+    assert result["written"] == 0
+    assert client.calls == 0
+
+
+async def test_backfill_before_stored_history_is_refused(tmp_path):
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    start = now - 20 * MINUTE
+    client = PagingClient(_candles(start - 10 * MINUTE, 31))
+    store = HistoryStore(root=str(tmp_path))
+    await store.backfill(client, "BTC/USDT", "1m", since=start)
+
+    client.calls = 0
+    with pytest.raises(ValueError, match="before stored history"):
+        await store.backfill(client, "BTC/USDT", "1m", since=start - 10 * MINUTE)
+    assert client.calls == 0
+    assert store.file("binance", "BTC/USDT", "1m").first_timestamp == start
+
+
+async def test_range_reads_from_disk_after_restart(tmp_path):
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    start = now - 30 * MINUTE
+    store = HistoryStore(root=str(tmp_path))
+    await store.backfill(PagingClient(_candles(start, 31)), "ETH/USDT", "1m", since=start)
+
+    reopened = HistoryStore(root=str(tmp_path))
+    candles = reopened.range("binance", "ETH/USDT", "1m", since=start + 10 * MINUTE,
+                             until=start + 15 * MINUTE)
+    assert len(candles) == 5
+    assert isinstance(candles.close, memoryview)
+    assert list(candles.timestamp) == [start + i * MINUTE for i in range(10, 15)]
+    assert candles.tail(2).to_dicts()[-1]["close"] == 14.0
+
+
+def test_partial_append_is_truncated_on_open(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    candle_file = store.file("binance", "BTC/USDT", "1m")
+    candle_file.append(_candles(0, 3))
+    with open(candle_file.path / "timestamp.bin", "ab") as f:
+        f.write(b"\x00" * 12)
+
+    reopened = HistoryStore(root=str(tmp_path)).file("binance", "BTC/USDT", "1m")
+    assert len(reopened) == 3
+    assert reopened.last_timestamp == 2 * MINUTE
+
+
+@pytest.mark.parametrize("venue, symbol, timeframe", [
+    ("binance", "BTC/USDT", "../../.."),
+    ("binance", "BTC/USDT", "2m"),
+    ("binance", "..", "1m"),
+    ("../binance", "BTC/USDT", "1m"),
+    ("kraken", "BTC/USDT", "1m"),
+])
+def test_series_outside_the_store_are_rejected(tmp_path, venue, symbol, timeframe):
+    store = HistoryStore(root=str(tmp_path / "history"))
+    with pytest.raises(ValueError):
+        store.range(venue, symbol, timeframe)
+    with pytest.raises(ValueError):
+        store.file(venue, symbol, timeframe)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_reading_an_unknown_series_creates_nothing(tmp_path):
+    store = HistoryStore(root=str(tmp_path))
+    candles = store.range("binance", "DOGE/USDT", "1h")
+    assert len(candles) == 0 and candles.to_dicts() == []
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,98 @@
+"""Tests for the vectorized indicator engine."""
+
+import numpy as np
+import pytest
+
+from src.indicators.engine import (
+    IndicatorEngine, IndicatorParams, atr, compute_all, compute_batch, ema, rsi, sma,
+)
+
+
+def _random_candles(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    high = close + rng.uniform(0, 1, n)
+    low = close - rng.uniform(0, 1, n)
+    volume = rng.uniform(1, 10, n)
+    timestamp = np.arange(n, dtype=np.int64) * 60_000
+    return timestamp, high, low, close, volume
+
+
+def _ema_loop(x, n, alpha):
+    out = [np.nan] * len(x)
+    value = float(np.mean(x[:n]))
+    out[n - 1] = value
+    for i in range(n, len(x)):
+        value = value + alpha * (x[i] - value)
+        out[i] = value
+    return np.array(out)
+
+
+def test_moving_averages_match_reference_loops():
+    _, _, _, close, _ = _random_candles(600)
+
+    expected_sma = [np.mean(close[i - 19:i + 1]) for i in range(19, 600)]
+    np.testing.assert_allclose(sma(close, 20)[19:], expected_sma)
+    assert np.isnan(sma(close, 20)[:19]).all()
+
+    # Long enough to cross several closed-form blocks
+    np.testing.assert_allclose(ema(close, 20), _ema_loop(close, 20, 2 / 21), equal_nan=True)
+    np.testing.assert_allclose(ema(close, 1), close)
+
+
+def test_rsi_and_atr_use_wilder_smoothing():
+    _, high, low, close, _ = _random_candles(300, seed=1)
+
+    change = np.diff(close)
+    gain = _ema_loop(np.clip(change, 0, None), 14, 1 / 14)
+    loss = _ema_loop(np.clip(-change, 0, None), 14, 1 / 14)
+    expected = 100 - 100 / (1 + gain / loss)
+    np.testing.assert_allclose(rsi(close, 14)[1:], expected, equal_nan=True)
+
+    tr = np.maximum.reduce([high[1:] - low[1:], abs(high[1:] - close[:-1]), abs(low[1:] - close[:-1])])
+    tr = np.concatenate([[high[0] - low[0]], tr])
+    np.testing.assert_allclose(atr(high, low, close, 14), _ema_loop(tr, 14, 1 / 14), equal_nan=True)
+
+
+def test_batch_matches_single_series():
+    params = IndicatorParams()
+    series = {}
+    for seed, length in enumerate([200, 200, 150]):
+        _, high, low, close, volume = _random_candles(length, seed=seed)
+        series[f"s{seed}"] = {"high": high, "low": low, "close": close, "volume": volume}
+
+    results = compute_batch(series, params)
+
+    for key, columns in series.items():
+        single = compute_all(columns["high"], columns["low"], columns["close"],
+                             columns["volume"], params)
+        for name, values in single.items():
+            np.testing.assert_allclose(results[key][name], values, equal_nan=True)
+
+
+def test_engine_updates_incrementally():
+    params = IndicatorParams()
+    timestamp, high, low, close, volume = _random_candles(300, seed=3)
+    engine = IndicatorEngine()
+
+    for end in (200, 201, 205, 240, 300):
+        latest = engine.latest("BTC/USDT", timestamp[:end], high[:end], low[:end],
+                               close[:end], volume[:end], params)
+        full = compute_all(high[:end], low[:end], close[:end], volume[:end], params)
+        for name, values in full.items():
+            assert latest[name] == pytest.approx(values[-1], rel=1e-9), name
+
+    # A trimmed window still lines up with the cached state
+    latest = engine.latest("BTC/USDT", timestamp[50:], high[50:], low[50:], close[50:],
+                           volume[50:], params)
+    assert latest["sma"] == pytest.approx(np.mean(close[-20:]))
+
+
+def test_engine_keeps_at_most_max_states():
+    timestamp, high, low, close, volume = _random_candles(100, seed=4)
+    engine = IndicatorEngine(max_states=3)
+    for period in range(5, 15):
+        engine.latest("BTC/USDT", timestamp, high, low, close, volume, IndicatorParams(sma_period=period))
+    assert len(engine._states) == 3
+    # The most recently used parameter sets are the ones kept
+    assert [key[1] for key in engine._states] == [IndicatorParams(sma_period=p).key() for p in (12, 13, 14)]
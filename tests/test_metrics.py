@@ -0,0 +1,102 @@
+"""Tests for call and cache metrics, the metrics:// resource and the Prometheus endpoint."""
+
+import asyncio
+import json
+import random
+
+import aiohttp
+import pytest
+from fastmcp import Client
+
+from src.evm.evm_client import EVMClient
+from src.metrics import Histogram, Metrics, get_metrics, start_metrics_server, stop_metrics_server
+from src.mcp_crypto_bot.server import app
+from tests.rpc_stub import JsonRpcStub
+
+
+def test_histogram_quantiles_track_exact_ones():
+    rng = random.Random(5)
+    samples = [rng.lognormvariate(-4, 1.2) for _ in range(20000)]
+    histogram = Histogram()
+    for sample in samples:
+        histogram.record(sample)
+
+    ordered = sorted(samples)
+    for q in (0.5, 0.95, 0.99):
+        exact = ordered[int(q * len(ordered))]
+        assert histogram.quantile(q) == pytest.approx(exact, rel=0.1)
+    assert histogram.quantile(1.0) == pytest.approx(ordered[-1])
+    assert Histogram().quantile(0.5) is None
+
+
+async def test_instrument_counts_errors_in_flight_and_cancellations():
+    metrics = Metrics()
+    gate = asyncio.Event()
+
+    @metrics.instrument("tool")
+    async def tool(fail=False, raise_=False):
+        await gate.wait()
+        if raise_:
+            raise RuntimeError("boom")
+        return {"success": not fail}
+
+    calls = [asyncio.create_task(tool()), asyncio.create_task(tool(fail=True)),
+             asyncio.create_task(tool(raise_=True)), asyncio.create_task(tool())]
+    await asyncio.sleep(0)
+    assert metrics.stats("tool", "tool").in_flight == 4
+    calls[3].cancel()
+    gate.set()
+    await asyncio.gather(*calls, return_exceptions=True)
+
+    stats = metrics.snapshot()["calls"]["tool"]["tool"]
+    assert (stats["calls"], stats["errors"], stats["cancelled"], stats["in_flight"]) == (3, 2, 1, 0)
+    assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+    metrics.record_cache("price", True)
+    metrics.record_cache("price", True)
+    metrics.record_cache("price", False)
+    assert metrics.snapshot()["caches"]["price"]["hit_ratio"] == pytest.approx(2 / 3, abs=1e-3)
+
+
+async def test_outbound_rpc_latency_is_recorded_per_chain_and_method():
+    stats = get_metrics().stats("rpc", "ethereum.eth_getBalance")
+    before = stats.calls
+    async with JsonRpcStub({"eth_chainId": lambda params: "0x1", "eth_getBalance": lambda params: "0x10"},
+                           delays={"eth_getBalance": 0.05}) as node:
+        client = EVMClient(node.url)
+        try:
+            for _ in range(3):
+                await client.get_eth_balance("0x" + "11" * 20)
+        finally:
+            await client.close()
+    assert stats.calls == before + 3
+    assert stats.latency.quantile(0.5) >= 0.05
+
+
+async def test_metrics_resource_and_prometheus_endpoint():
+    async with Client(app) as client:
+        for _ in range(3):
+            await client.call_tool("get_status", {})
+        contents = await client.read_resource("metrics://")
+    snapshot = json.loads(contents[0].text)
+    assert snapshot["calls"]["tool"]["get_status"]["calls"] >= 3
+    assert set(snapshot["calls"]) >= {"tool", "resource", "exchange", "rpc", "ai"}
+
+    port = await start_metrics_server(host="127.0.0.1", port=0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"http://127.0.0.1:{port}/metrics") as response:
+                assert response.status == 200
+                assert response.headers["Content-Type"].startswith("text/plain")
+                text = await response.text()
+    finally:
+        await stop_metrics_server()
+
+    labels = 'kind="tool",name="get_status"'
+    buckets = [line for line in text.splitlines()
+               if line.startswith(f"mcp_call_duration_seconds_bucket{{{labels},")]
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)
+    assert buckets[-1].startswith(f'mcp_call_duration_seconds_bucket{{{labels},le="+Inf"}}')
+    assert f"mcp_call_duration_seconds_count{{{labels}}} {counts[-1]}" in text
+    assert f"mcp_calls_in_flight{{{labels}}} 0" in text
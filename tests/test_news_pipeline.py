@@ -0,0 +1,98 @@
+"""Tests for news deduplication, symbol matching and replay throughput."""
+
+import json
+import random
+import time
+
+import pytest
+
+from src.news_trading.matcher import SymbolMatcher
+from src.news_trading.pipeline import NearDuplicateFilter, NewsPipeline, headline_words
+from src.news_trading import sources
+from src.news_trading.sources import jsonl_source, replay_path
+
+MARKETS = {
+    "BTC/USDT": {"base": "BTC", "quote": "USDT", "spot": True, "active": True},
+    "BTC/USDC": {"base": "BTC", "quote": "USDC", "spot": True, "active": True},
+    "ETH/BTC": {"base": "ETH", "quote": "BTC", "spot": True, "active": True},
+    "ETH/USDT": {"base": "ETH", "quote": "USDT", "spot": True, "active": True},
+    "SHIB/USDT": {"base": "SHIB", "quote": "USDT", "spot": True, "active": True},
+    "ONE/USDT": {"base": "ONE", "quote": "USDT", "spot": True, "active": True},
+    "OLD/USDT": {"base": "OLD", "quote": "USDT", "spot": True, "active": False},
+}
+
+
+def test_matcher_maps_tickers_and_names_to_preferred_markets():
+    matcher = SymbolMatcher.from_markets(MARKETS)
+
+    assert matcher.match("Bitcoin and ETH rally as inflows return") == ["BTC/USDT", "ETH/USDT"]
+    assert matcher.match("Shiba Inu burns tokens") == ["SHIB/USDT"]
+    # Tickers need upper case; ambiguous ones need a cashtag
+    assert matcher.match("eth is mentioned in passing") == []
+    assert matcher.match("ONE more thing") == []
+    assert matcher.match("$ONE jumps 20%") == ["ONE/USDT"]
+    assert matcher.match("OLD token relisted") == []
+
+
+def test_dedup_catches_exact_and_near_duplicates():
+    dedup = NearDuplicateFilter(threshold=0.6, window=100)
+    first = headline_words("SEC approves spot bitcoin ETF applications from BlackRock and Fidelity")
+    assert not dedup.seen(first)
+    assert dedup.seen(list(first))
+    assert dedup.seen(headline_words(
+        "SEC approves spot bitcoin ETF applications from BlackRock and Fidelity today"
+    ))
+    assert not dedup.seen(headline_words("Ethereum developers schedule next network upgrade"))
+
+
+def test_dedup_forgets_headlines_outside_window():
+    dedup = NearDuplicateFilter(window=2)
+    for title in ("alpha beta gamma", "delta epsilon zeta", "eta theta iota"):
+        assert not dedup.seen(headline_words(title))
+    assert len(dedup) == 2
+    assert not dedup.seen(headline_words("alpha beta gamma"))
+
+
+async def test_replay_pipeline_throughput(tmp_path):
+    rng = random.Random(7)
+    subjects = ["BTC", "ETH", "Bitcoin", "Shiba Inu", "the market"]
+    verbs = ["surges", "plunges", "holds steady", "rallies", "drops"]
+    path = tmp_path / "news.jsonl"
+    n = 20_000
+    with open(path, "w") as f:
+        for i in range(n):
+            title = f"{rng.choice(subjects)} {rng.choice(verbs)} as traders eye report {i}"
+            f.write(json.dumps({"title": title, "source": "replay", "published": 1_700_000_000 + i}) + "\n")
+        f.write("not json\n[1, 2]\n1\nnull\n")
+        f.write('{"title": "BTC overflows", "published": 1e400}\n{"title": "ETH", "published": NaN}\n')
+
+    pipeline = NewsPipeline(SymbolMatcher.from_markets(MARKETS))
+    started = time.perf_counter()
+    events = [event async for event in pipeline.run(jsonl_source(str(path)))]
+    elapsed = time.perf_counter() - started
+
+    stats = pipeline.stats()
+    assert stats["items"] == n
+    assert stats["events"] == len(events)
+    assert stats["duplicates"] + stats["unmatched"] + stats["filtered"] + stats["events"] == n
+    assert events[0]["published"] == 1_700_000_000_000
+    assert all(-1 <= e["score"] <= 1 for e in events)
+    assert any(e["score"] > 0 for e in events) and any(e["score"] < 0 for e in events)
+    assert n / elapsed > 5_000
+
+
+@pytest.mark.parametrize("name", ["", ".", "../secrets.jsonl", "a/../../x.jsonl", "/etc/passwd"])
+def test_replay_path_stays_inside_the_replay_dir(tmp_path, monkeypatch, name):
+    monkeypatch.setattr(sources.settings, "news_replay_dir", str(tmp_path / "news"))
+    with pytest.raises(ValueError):
+        replay_path(name)
+
+
+def test_replay_path_resolves_names_under_the_replay_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(sources.settings, "news_replay_dir", str(tmp_path))
+    (tmp_path / "day").mkdir()
+    (tmp_path / "day" / "link.jsonl").symlink_to(tmp_path.parent / "elsewhere.jsonl")
+
+    assert replay_path("day/one.jsonl") == tmp_path.resolve() / "day" / "one.jsonl"
+    with pytest.raises(ValueError):
+        replay_path("day/link.jsonl")
@@ -0,0 +1,103 @@
+"""Tests for the incremental portfolio engine."""
+
+import random
+
+import pytest
+
+from src.cex import ccxt_client
+from src.cex.ccxt_client import CCXTClient
+from src.portfolio.engine import PortfolioEngine
+
+
+class PricedExchange:
+    """Serves fixed balances and tickers for a few markets."""
+
+    has = {"fetchTickers": True}
+    markets = {"BTC/USDT": {}, "ETH/USDT": {}}
+    prices = {"BTC/USDT": 50_000.0, "ETH/USDT": 2_000.0}
+
+    def __init__(self, config):
+        self.tickers_calls = []
+
+    async def fetch_balance(self):
+        return {"total": {"BTC": 0.5, "ETH": 2.0, "USDT": 100.0, "XYZ": 7.0, "DOGE": 0.0}}
+
+    async def fetch_tickers(self, symbols):
+        self.tickers_calls.append(list(symbols))
+        return {s: {"last": self.prices[s], "bid": None, "ask": None, "baseVolume": 0,
+                    "timestamp": 1} for s in symbols}
+
+
+def _assert_consistent(engine):
+    incremental = (engine.total_usd, dict(engine.by_account), dict(engine.by_asset))
+    engine.revalue()
+    assert incremental[0] == pytest.approx(engine.total_usd)
+    for account, value in engine.by_account.items():
+        assert incremental[1].get(account, 0.0) == pytest.approx(value, abs=1e-6)
+
+
+def test_incremental_updates_match_full_revaluation():
+    rng = random.Random(0)
+    engine = PortfolioEngine()
+    accounts = [f"evm:0x{i:040x}" for i in range(50)] + ["cex:binance"]
+    assets = ["BTC", "ETH", "SOL", "USDT", "XYZ"]
+
+    for step in range(2000):
+        if rng.random() < 0.5:
+            engine.set_quantity(rng.choice(accounts), rng.choice(assets), rng.choice([0.0, rng.uniform(0, 10)]))
+        else:
+            engine.set_price(rng.choice(assets[:3]), rng.uniform(1, 100))
+        if step % 500 == 0:
+            _assert_consistent(engine)
+    _assert_consistent(engine)
+    assert engine.unpriced() == ["XYZ"] or "XYZ" not in engine.assets()
+
+    # A tick with an unchanged price or quantity touches nothing
+    updates = engine.updates
+    engine.set_prices(dict(engine.prices))
+    assert engine.updates == updates
+
+
+def test_holdings_replace_and_account_totals():
+    engine = PortfolioEngine()
+    engine.set_holdings("cex:binance", {"BTC": 1.0, "USDT": 500.0})
+    engine.set_holdings("solana:abc", {"SOL": 10.0})
+    engine.set_prices({"BTC": 60_000.0, "SOL": 150.0})
+
+    summary = engine.summary()
+    assert summary["total_usd"] == pytest.approx(62_000.0)
+    assert summary["by_account"] == {"cex:binance": 60_500.0, "solana:abc": 1_500.0}
+
+    # Dropping an asset removes its position and value
+    assert engine.set_holdings("cex:binance", {"USDT": 500.0}) == 1
+    assert engine.total_usd == pytest.approx(2_000.0)
+    assert [row["asset"] for row in engine.positions()] == ["SOL", "USDT"]
+
+
+async def test_exchange_sync_and_balance_total_usd(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", PricedExchange)
+    client = CCXTClient()
+
+    balance = await client.get_balance()
+    assert balance["total_usd"] == pytest.approx(0.5 * 50_000 + 2 * 2_000 + 100)
+    assert balance["unpriced"] == ["XYZ"]
+    # Only listed markets were requested, in one batch
+    assert client.exchange.tickers_calls == [["BTC/USDT", "ETH/USDT"]]
+
+    engine = PortfolioEngine()
+    assert await engine.sync_exchange(client) == 4
+    await engine.refresh_prices(client)
+    assert engine.total_usd == pytest.approx(balance["total_usd"])
+    assert engine.unpriced() == ["XYZ"]
+
+
+async def test_refresh_prices_on_a_cold_cache_skips_unlisted_assets(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", PricedExchange)
+    client = CCXTClient()
+    engine = PortfolioEngine()
+    engine.set_holdings("cex:binance", {"BTC": 0.5, "XYZ": 7.0, "USDT": 100.0})
+
+    assert await engine.refresh_prices(client) == 1
+    assert engine.total_usd == pytest.approx(0.5 * 50_000 + 100)
+    assert engine.unpriced() == ["XYZ"]
+    assert client.exchange.tickers_calls == [["BTC/USDT"]]
@@ -0,0 +1,52 @@
+"""Tests for price request coalescing and caching in CCXTClient."""
+
+import asyncio
+
+import pytest
+
+from src.cex import ccxt_client
+from src.cex.ccxt_client import CCXTClient
+from tests.exchange_stub import TickerExchange
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", TickerExchange)
+    monkeypatch.setattr(ccxt_client.settings, "price_cache_ttl_seconds", 60.0)
+    return CCXTClient()
+
+
+async def test_concurrent_get_price_shares_one_request(client):
+    prices = await asyncio.gather(*(client.get_price("BTC/USDT") for _ in range(10)))
+
+    assert client.exchange.ticker_calls == 1
+    assert all(p["price"] == 100.0 for p in prices)
+
+    # Served from the TTL cache afterwards
+    await client.get_price("BTC/USDT")
+    assert client.exchange.ticker_calls == 1
+
+
+async def test_get_prices_batches_missing_symbols(client, monkeypatch):
+    await client.get_price("BTC/USDT")
+
+    prices = await client.get_prices(["BTC/USDT", "ETH/USDT", "SOL/USDT", "BAD/USDT"])
+
+    assert set(prices) == {"BTC/USDT", "ETH/USDT", "SOL/USDT"}
+    # The unlisted symbol is left out before the batch is sent
+    assert client.exchange.tickers_calls == [["ETH/USDT", "SOL/USDT"]]
+
+    monkeypatch.setattr(ccxt_client.settings, "price_cache_ttl_seconds", 0.0)
+    await client.get_price("BTC/USDT")
+    assert client.exchange.ticker_calls == 2
+
+
+async def test_unlisted_symbol_does_not_fail_the_batch_before_markets_load(client):
+    client.exchange.markets = None
+
+    prices = await client.get_prices(["BTC/USDT", "XYZ/USDT", "ETH/USDT"])
+
+    assert set(prices) == {"BTC/USDT", "ETH/USDT"}
+    # The failed batch is retried symbol by symbol
+    assert client.exchange.tickers_calls == [["BTC/USDT", "XYZ/USDT", "ETH/USDT"]]
+    assert client.exchange.ticker_calls == 3
@@ -0,0 +1,220 @@
+"""Tests for the pre-trade risk gate and fill ledger."""
+
+import asyncio
+import time
+
+import pytest
+
+from src.cex import ccxt_client
+from src.cex.ccxt_client import CCXTClient
+from src.risk import ledger as risk
+from src.risk.ledger import RiskLedger, RiskLimitExceeded
+
+
+class OrderExchange:
+    """Fills every order at the requested price after a short delay."""
+
+    has = {"fetchTickers": True}
+
+    def __init__(self, config):
+        self.orders = []
+
+    async def fetch_ticker(self, symbol):
+        return {"last": 10.0, "bid": 9.9, "ask": 10.1, "baseVolume": 1.0, "timestamp": 1}
+
+    async def create_order(self, symbol, type, side, amount, price):
+        await asyncio.sleep(0.01)
+        self.orders.append((symbol, side, amount, price))
+        return {"id": str(len(self.orders)), "filled": amount, "average": price or 10.0,
+                "fee": {"cost": 0.0}}
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(risk.settings, "max_order_usd", 100.0)
+    monkeypatch.setattr(risk.settings, "daily_loss_limit_usd", 10.0)
+
+
+def test_ledger_enforces_limits_and_tracks_pnl(tmp_path, limits):
+    ledger = RiskLedger(str(tmp_path / "journal.jsonl"))
+
+    with pytest.raises(RiskLimitExceeded):
+        ledger.reserve("BTC/USDT", "buy", 1, 150.0)
+
+    buy = ledger.reserve("ETH/USDT", "buy", 2, 50.0)
+    assert ledger.open_notional == 100.0
+    ledger.record_fill(buy, 2, 50.0, fee=0.1)
+    assert ledger.open_notional == 0.0
+    assert ledger.summary()["exposure"] == {"ETH/USDT": 100.0}
+
+    sell = ledger.reserve("ETH/USDT", "sell", 2, 45.0)
+    assert ledger.record_fill(sell, 2, 45.0) == pytest.approx(-10.0)
+    assert ledger.realized_today == pytest.approx(-10.1)
+
+    # The daily loss limit now blocks every new order
+    with pytest.raises(RiskLimitExceeded, match="daily_loss_limit_usd"):
+        ledger.reserve("ETH/USDT", "buy", 1, 1.0)
+    ledger.close()
+
+    # Replaying the journal (and a compacted snapshot) restores the state
+    for _ in range(2):
+        reopened = RiskLedger(str(tmp_path / "journal.jsonl"))
+        summary = reopened.summary()
+        assert summary["realized_pnl_today"] == pytest.approx(-10.1)
+        assert summary["exposure"] == {}
+        reopened.compact()
+        reopened.close()
+    assert len((tmp_path / "journal.jsonl").read_text().splitlines()) == 1
+
+
+def test_gate_overhead_is_sub_millisecond(tmp_path, limits):
+    ledger = RiskLedger(str(tmp_path / "journal.jsonl"))
+    started = time.perf_counter()
+    for i in range(5000):
+        reservation = ledger.reserve("BTC/USDT", "buy" if i % 2 else "sell", 0.001, 50.0)
+        ledger.record_fill(reservation, 0.001, 50.0)
+    assert (time.perf_counter() - started) / 5000 < 0.0005
+    ledger.close()
+
+
+async def test_place_order_passes_through_the_gate(tmp_path, monkeypatch, limits):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", OrderExchange)
+    monkeypatch.setattr(risk, "_ledger", RiskLedger(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setattr(ccxt_client.settings, "live", False)
+    client = CCXTClient()
+
+    # Market orders are sized at the cached price; dry runs hold nothing
+    with pytest.raises(RiskLimitExceeded):
+        await client.place_order("SOL/USDT", "buy", "market", 11)
+    assert (await client.place_order("SOL/USDT", "buy", "market", 5))["status"] == "dry_run"
+    assert risk._ledger.open_notional == 0.0
+
+    with pytest.raises(Exception, match="Live trading is disabled"):
+        await client.place_order("SOL/USDT", "buy", "market", 5, dry_run=False)
+
+    monkeypatch.setattr(ccxt_client.settings, "live", True)
+    monkeypatch.setattr(ccxt_client.settings, "am_i_sure", "YES")
+    orders = [client.place_order("SOL/USDT", "buy", "limit", 1, 20.0, dry_run=False) for _ in range(4)]
+    await asyncio.gather(*orders)
+    assert len(client.exchange.orders) == 4
+    assert risk._ledger.summary()["exposure"] == {"SOL/USDT": 80.0}
+    risk._ledger.close()
+
+
+class QuotedExchange(OrderExchange):
+    """Prices ETH/BTC and BTC/USDT; anything else has no market."""
+
+    PRICES = {"ETH/BTC": 0.05, "BTC/USDT": 50_000.0}
+
+    async def fetch_ticker(self, symbol):
+        if symbol not in self.PRICES:
+            raise Exception(f"binance does not have market symbol {symbol}")
+        last = self.PRICES[symbol]
+        return {"last": last, "bid": last, "ask": last, "baseVolume": 1.0, "timestamp": 1}
+
+
+async def test_non_usd_quotes_are_converted_to_usd(tmp_path, monkeypatch, limits):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", QuotedExchange)
+    monkeypatch.setattr(ccxt_client.settings, "cex_ticker_batch_ms", 0)
+    monkeypatch.setattr(risk, "_ledger", RiskLedger(str(tmp_path / "journal.jsonl")))
+    client = CCXTClient()
+
+    # 30 ETH at 0.05 BTC is 1.5 BTC, about $75,000
+    with pytest.raises(RiskLimitExceeded, match="max_order_usd"):
+        await client.place_order("ETH/BTC", "buy", "limit", 30, 0.05)
+    assert (await client.place_order("ETH/BTC", "buy", "limit", 0.01, 0.05))["status"] == "dry_run"
+    with pytest.raises(RiskLimitExceeded, match="Cannot price XYZ"):
+        await client.place_order("ETH/XYZ", "buy", "limit", 0.01, 1.0)
+    risk._ledger.close()
+
+
+def test_realized_pnl_and_open_notional_are_in_usd(tmp_path, limits, monkeypatch):
+    monkeypatch.setattr(risk.settings, "max_open_notional_usd", 150.0)
+    ledger = RiskLedger(str(tmp_path / "journal.jsonl"))
+
+    buy = ledger.reserve("ETH/BTC", "buy", 0.02, 0.05, quote_usd=50_000.0)
+    assert buy.notional == pytest.approx(50.0)
+    ledger.record_fill(buy, 0.02, 0.05)
+    sell = ledger.reserve("ETH/BTC", "sell", 0.02, 0.049, quote_usd=50_000.0)
+    ledger.record_fill(sell, 0.02, 0.049)
+    # 0.00002 BTC lost is $1
+    assert ledger.realized_today == pytest.approx(-1.0)
+
+    # Orders in flight together may not pass max_open_notional_usd
+    held = [ledger.reserve("SOL/USDT", "buy", 1, 70.0) for _ in range(2)]
+    with pytest.raises(RiskLimitExceeded, match="max_open_notional_usd"):
+        ledger.reserve("SOL/USDT", "buy", 1, 70.0)
+    ledger.release(held[0])
+    ledger.reserve("SOL/USDT", "buy", 1, 70.0)
+    ledger.close()
+
+    reopened = RiskLedger(str(tmp_path / "journal.jsonl"))
+    assert reopened.summary()["realized_pnl_today"] == pytest.approx(-1.0)
+    reopened.close()
+
+
+def test_partial_fills_keep_the_remainder_reserved(tmp_path, limits):
+    ledger = RiskLedger(str(tmp_path / "journal.jsonl"))
+    order = ledger.reserve("SOL/USDT", "buy", 10, 10.0)
+
+    ledger.record_fill(order, 4, 10.0, fee=0.1, done=False)
+    assert ledger.open_notional == pytest.approx(60.0)
+    assert ledger.summary()["exposure"] == {"SOL/USDT": 40.0}
+
+    # Cumulative average 10.6 over 10 means the last 6 filled at 11
+    ledger.record_fill(order, 10, 10.6, fee=0.25, done=False)
+    ledger.record_fill(order, 10, 10.6, fee=0.25)
+    assert ledger.open_notional == 0.0
+    assert ledger.positions["SOL/USDT"].last_price == pytest.approx(11.0)
+    assert ledger.realized_today == pytest.approx(-0.25)
+    ledger.close()
+
+
+class RestingExchange(OrderExchange):
+    """Rests limit orders on the book and fills them over later fetch_order calls."""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.fills = [0.0, 0.5, 1.0]
+
+    async def fetch_ticker(self, symbol):
+        return {"last": None, "bid": 9.9, "ask": 10.1, "baseVolume": 1.0, "timestamp": 1}
+
+    async def create_order(self, symbol, type, side, amount, price):
+        self.orders.append((symbol, side, amount, price))
+        return {"id": "7", "status": "open", "filled": 0.0, "average": None, "price": price}
+
+    async def fetch_order(self, id, symbol):
+        filled = self.fills.pop(0) if len(self.fills) > 1 else self.fills[0]
+        return {"id": id, "status": "closed" if filled == 1.0 else "open", "filled": filled,
+                "average": 20.0 if filled else None, "price": 20.0, "fee": {"cost": 0.0}}
+
+
+async def test_resting_orders_are_reconciled_until_filled(tmp_path, monkeypatch, limits):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", RestingExchange)
+    monkeypatch.setattr(risk, "_ledger", RiskLedger(str(tmp_path / "journal.jsonl")))
+    monkeypatch.setattr(ccxt_client.settings, "live", True)
+    monkeypatch.setattr(ccxt_client.settings, "am_i_sure", "YES")
+    monkeypatch.setattr(ccxt_client.settings, "order_reconcile_seconds", 0.01)
+    client = CCXTClient()
+
+    await client.place_order("SOL/USDT", "buy", "limit", 1, 20.0, dry_run=False)
+    assert risk._ledger.open_notional == pytest.approx(20.0)
+    assert risk._ledger.summary()["exposure"] == {}
+
+    for _ in range(100):
+        if client._reconciler is None:
+            break
+        await asyncio.sleep(0.01)
+    assert client._open_orders == {}
+    assert risk._ledger.open_notional == 0.0
+    assert risk._ledger.summary()["exposure"] == {"SOL/USDT": 20.0}
+
+    # Without a last trade a market buy is sized at the ask
+    reservations = []
+    reserve = risk._ledger.reserve
+    monkeypatch.setattr(risk._ledger, "reserve",
+                        lambda *args: reservations.append(args) or reserve(*args))
+    await client.place_order("SOL/USDT", "buy", "market", 1)
+    assert reservations[0][3] == 10.1
+    risk._ledger.close()
@@ -0,0 +1,62 @@
+"""Tests for weight-aware exchange request scheduling."""
+
+import asyncio
+
+from src.cex import ccxt_client
+from src.cex.ccxt_client import CCXTClient
+from src.cex.scheduler import BALANCE, MARKET_DATA, ORDER, RateLimitScheduler, binance_weight
+from tests.exchange_stub import TickerExchange
+
+
+async def test_orders_are_granted_before_queued_data_reads():
+    # 600 weight per minute refills 10 per second
+    scheduler = RateLimitScheduler(weight_per_minute=600, orders_per_10s=10, order_reserve=0.1)
+    scheduler.weight.tokens = scheduler.reserve
+    granted = []
+
+    async def request(name, priority, weight):
+        await scheduler.acquire(priority, weight)
+        granted.append(name)
+
+    # Data reads may not touch the order reserve, so they queue
+    tasks = [asyncio.create_task(request(f"ticker{i}", MARKET_DATA, 2)) for i in range(3)]
+    tasks.append(asyncio.create_task(request("balance", BALANCE, 2)))
+    await asyncio.sleep(0)
+    assert granted == []
+
+    # An order arriving behind them is granted at once from the reserve
+    await asyncio.wait_for(request("order", ORDER, 1), 0.05)
+    assert granted == ["order"]
+
+    await asyncio.wait_for(asyncio.gather(*tasks), 2)
+    assert granted == ["order", "ticker0", "ticker1", "ticker2", "balance"]
+    assert scheduler.stats()["granted"] == {ORDER: 1, MARKET_DATA: 3, BALANCE: 1}
+
+
+def test_weights_and_reported_usage():
+    assert binance_weight("fetch_order_book", "BTC/USDT", 1000) == 50
+    assert binance_weight("fetch_order_book", "BTC/USDT") == 5
+    assert binance_weight("fetch_tickers", ["BTC/USDT"] * 30) == 40
+    assert binance_weight("fetch_tickers") == 80
+
+    scheduler = RateLimitScheduler(weight_per_minute=6000, orders_per_10s=100)
+    scheduler.observe("5900")
+    assert scheduler.weight.tokens <= 100.1
+
+
+async def test_single_price_requests_are_batched(monkeypatch):
+    monkeypatch.setattr(ccxt_client.ccxt, "binance", TickerExchange)
+    monkeypatch.setattr(ccxt_client.settings, "price_cache_ttl_seconds", 60.0)
+    monkeypatch.setattr(ccxt_client.settings, "cex_ticker_batch_ms", 5.0)
+    client = CCXTClient()
+
+    prices = await asyncio.gather(
+        *(client.get_price(s) for s in ["BTC/USDT", "ETH/USDT", "SOL/USDT", "ETH/USDT", "BAD/USDT"]),
+        return_exceptions=True,
+    )
+
+    assert [p["price"] for p in prices[:4]] == [100.0] * 4
+    assert isinstance(prices[4], KeyError)
+    assert client.exchange.tickers_calls == [["BTC/USDT", "ETH/USDT", "SOL/USDT"]]
+    assert client.exchange.ticker_calls == 0
+    assert client.scheduler.stats()["granted"][MARKET_DATA] >= 1
@@ -0,0 +1,33 @@
+"""Tests for the MCP server lifespan, driven through an in-memory fastmcp client."""
+
+from fastmcp import Client
+
+from src.alerts.engine import AlertEngine
+from src.cex import pool
+from src.mcp_crypto_bot import server
+
+
+async def test_lifespan_warms_and_closes_the_exchange_pool(monkeypatch):
+    events = []
+
+    async def warm(self):
+        events.append("warm")
+
+    async def close_exchange_pool():
+        events.append("close")
+
+    async def start(self, client, interval=None):
+        events.append("alerts")
+
+    monkeypatch.setattr(server.settings, "warm_on_start", True)
+    monkeypatch.setattr(server.settings, "chain_head_tracking", False)
+    monkeypatch.setattr(server.settings, "telegram_bot_token", None)
+    monkeypatch.setattr(pool.ExchangePool, "warm", warm)
+    monkeypatch.setattr(pool, "close_exchange_pool", close_exchange_pool)
+    monkeypatch.setattr(AlertEngine, "start", start)
+
+    async with Client(server.app) as client:
+        assert events == ["warm", "alerts"]
+        result = await client.call_tool("get_status", {})
+        assert result.data["success"] is True
+    assert events == ["warm", "alerts", "close"]
@@ -0,0 +1,55 @@
+"""Tests for bulk Solana reads against a local JSON-RPC stand-in."""
+
+import base64
+
+from solders.keypair import Keypair
+
+from src.solana.solana_client import SolanaClient, TOKEN_PROGRAM_ID
+from tests.rpc_stub import JsonRpcStub
+
+SYSTEM_PROGRAM = "11111111111111111111111111111111"
+
+
+def _account(lamports, data=b"", owner=SYSTEM_PROGRAM):
+    return {"lamports": lamports, "owner": owner, "executable": False, "rentEpoch": 0,
+            "space": len(data), "data": [base64.b64encode(data).decode(), "base64"]}
+
+
+async def test_sol_and_token_balances_use_chunked_multiple_accounts():
+    owners = [Keypair().pubkey() for _ in range(150)]
+    mint = Keypair().pubkey()
+    lamports = {str(owner): i * 1000 for i, owner in enumerate(owners) if i % 3}
+    token_accounts = {
+        str(SolanaClient.associated_token_address(owner, mint)): (bytes(mint) + bytes(owner)
+                                                                  + (i * 7).to_bytes(8, "little")
+                                                                  + bytes(93))
+        for i, owner in enumerate(owners[:10])
+    }
+
+    def get_multiple_accounts(params):
+        keys = params[0]
+        assert len(keys) <= 100
+        value = []
+        for key in keys:
+            if key in lamports:
+                value.append(_account(lamports[key]))
+            elif key in token_accounts:
+                value.append(_account(2039280, token_accounts[key], owner=str(TOKEN_PROGRAM_ID)))
+            else:
+                value.append(None)
+        return {"context": {"slot": 1}, "value": value}
+
+    async with JsonRpcStub({"getMultipleAccounts": get_multiple_accounts}) as node:
+        client = SolanaClient(rpc_url=node.url)
+        try:
+            sol = await client.get_sol_balances([str(o) for o in owners])
+            tokens = await client.get_token_balances([str(o) for o in owners], [str(mint)])
+        finally:
+            await client.close()
+
+    assert sol["balances_lamports"][:4] == [0, 1000, 2000, 0]
+    assert len(sol["balances_lamports"]) == 150
+    assert tokens["balances"][3] == [21]
+    assert tokens["balances"][20] == [0]
+    # 150 keys per query -> two getMultipleAccounts requests each
+    assert [c["method"] for c in node.calls] == ["getMultipleAccounts"] * 4
@@ -0,0 +1,46 @@
+"""Startup regression tests: the server answers get_status without loading exchange or chain SDKs."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.mcp_crypto_bot.startup import profile_imports
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Runs the real lifespan through an in-memory client, then lists loaded heavy SDKs
+GET_STATUS = """
+import asyncio, json, sys
+from fastmcp import Client
+from src.mcp_crypto_bot.server import app
+from src.mcp_crypto_bot.startup import HEAVY_MODULES
+
+async def main():
+    async with Client(app) as client:
+        result = await client.call_tool("get_status", {})
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(json.dumps({"status": result.data, "loaded": loaded}))
+
+asyncio.run(main())
+"""
+
+
+def test_get_status_loads_no_exchange_or_chain_sdks():
+    env = dict(os.environ, WARM_ON_START="false", TELEGRAM_BOT_TOKEN="", MARKET_STREAM="false")
+    result = subprocess.run([sys.executable, "-c", GET_STATUS], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    assert report["status"]["success"] is True
+    assert report["loaded"] == []
+
+
+def test_profile_reports_import_cost():
+    profile = profile_imports(top=5)
+    assert profile["total_ms"] > 0
+    assert "fastmcp" in profile["packages"]
+    assert len(profile["slowest"]) == 5
+    assert profile["slowest"][0]["module"] == "src.mcp_crypto_bot.server"
+    assert profile["heavy"] == []
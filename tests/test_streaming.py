@@ -0,0 +1,94 @@
+"""Tests for the websocket market data stream against a local replay server."""
+
+import asyncio
+import json
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from src.cex.streaming import MarketStream, OrderBook
+
+# Frames recorded from the Binance combined stream, trimmed to one symbol
+RECORDED_FRAMES = [
+    {"stream": "btcusdt@ticker", "data": {"e": "24hrTicker", "E": 1700000000000, "s": "BTCUSDT",
+                                          "c": "100.5", "b": "100.0", "a": "101.0", "v": "12.5"}},
+    {"stream": "btcusdt@trade", "data": {"e": "trade", "E": 1700000000001, "s": "BTCUSDT",
+                                         "t": 1, "p": "100.5", "q": "0.2", "T": 1700000000001,
+                                         "m": True}},
+    {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "s": "BTCUSDT", "U": 95,
+                                               "u": 99, "b": [["90.0", "1.0"]], "a": []}},
+    {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "s": "BTCUSDT", "U": 100,
+                                               "u": 102, "b": [["100.0", "2.0"]], "a": []}},
+    {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "s": "BTCUSDT", "U": 103,
+                                               "u": 104, "b": [],
+                                               "a": [["101.0", "0"], ["102.0", "3.0"]]}},
+    # Sequence gap: 105..109 were lost, forcing a resync
+    {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "s": "BTCUSDT", "U": 110,
+                                               "u": 111, "b": [["100.0", "9.0"]], "a": []}},
+    {"stream": "btcusdt@depth@100ms", "data": {"e": "depthUpdate", "s": "BTCUSDT", "U": 121,
+                                               "u": 121, "b": [["99.0", "5.0"]], "a": []}},
+]
+
+SNAPSHOTS = [
+    {"bids": [[100.0, 1.0]], "asks": [[101.0, 1.0]], "nonce": 100},
+    {"bids": [[100.0, 7.0]], "asks": [[102.0, 3.0]], "nonce": 120},
+]
+
+
+async def _replay(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    for frame in RECORDED_FRAMES:
+        await ws.send_str(json.dumps(frame))
+        await asyncio.sleep(0.02)
+    async for _ in ws:
+        pass
+    return ws
+
+
+async def _wait_for(condition, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_order_book_detects_gaps():
+    book = OrderBook("BTC/USDT")
+    book.load_snapshot(SNAPSHOTS[0])
+
+    assert book.apply({"U": 95, "u": 100, "b": [], "a": []})
+    assert not book.apply({"U": 102, "u": 103, "b": [], "a": []})
+    assert book.apply({"U": 99, "u": 101, "b": [["99.5", "1"]], "a": []})
+    assert book.top(1)["bids"] == [[100.0, 1.0]]
+
+
+async def test_stream_replays_frames_and_resyncs_on_gap():
+    app = web.Application()
+    app.router.add_get("/stream", _replay)
+    server = TestServer(app)
+    await server.start_server()
+
+    calls = []
+
+    async def snapshot(symbol):
+        calls.append(symbol)
+        return SNAPSHOTS[min(len(calls), len(SNAPSHOTS)) - 1]
+
+    stream = MarketStream(["BTC/USDT"], snapshot, url=str(server.make_url("/stream")),
+                          reconnect_delay=0.01)
+    try:
+        await stream.start()
+        await _wait_for(lambda: stream.books["BTC/USDT"].last_update_id == 121)
+
+        assert len(calls) >= 2
+        assert stream.get_ticker("BTC/USDT")["price"] == 100.5
+        assert stream.get_trades("BTC/USDT")[0]["side"] == "sell"
+        book = stream.get_order_book("BTC/USDT", depth=5)
+        assert book["bids"] == [[100.0, 7.0], [99.0, 5.0]]
+        assert book["asks"] == [[102.0, 3.0]]
+    finally:
+        await stream.stop()
+        await server.close()
+
+    assert stream.get_ticker("BTC/USDT") is None
@@ -0,0 +1,146 @@
+"""Tests for the Telegram bot's webhook mode and update worker queue."""
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from fastmcp import Client
+from telegram.ext import CommandHandler
+
+from src.alerts import engine as alert_engine
+from src.mcp_crypto_bot import server
+from src.telegram import bot as telegram_bot
+from src.telegram.bot import SECRET_HEADER, TelegramBot
+from tests.telegram_stub import BotApiStandIn
+
+
+def _command(update_id, text="/slow"):
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": 5, "type": "private"},
+            "from": {"id": 5, "is_bot": False, "first_name": "owner"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text)}],
+        },
+    }
+
+
+async def _webhook_settings(monkeypatch, stand_in):
+    for name, value in {
+        "telegram_bot_token": "123:TEST",
+        "telegram_api_url": await stand_in.start(),
+        "owner_telegram_id": None,
+        "telegram_mode": "webhook",
+        "telegram_webhook_url": "https://bot.example/telegram/webhook",
+        "telegram_webhook_port": 0,
+        "telegram_webhook_secret": "s3cret",
+        "telegram_update_workers": 4,
+        "telegram_update_queue_size": 8,
+    }.items():
+        monkeypatch.setattr(telegram_bot.settings, name, value)
+
+
+@pytest.fixture
+async def webhook_bot(monkeypatch):
+    stand_in = BotApiStandIn()
+    await _webhook_settings(monkeypatch, stand_in)
+    bot = TelegramBot()
+    handled = []
+
+    async def slow(update, context):
+        await asyncio.sleep(0.2)
+        handled.append(update.update_id)
+
+    bot.application.add_handler(CommandHandler("slow", slow))
+    await bot.start()
+    assert await bot.wait_started()
+    url = f"http://127.0.0.1:{bot.webhook_port}/telegram/webhook"
+    yield bot, stand_in, url, handled
+    await bot.stop()
+    await stand_in.close()
+
+
+async def _post(session, url, payload, secret="s3cret"):
+    async with session.post(url, json=payload, headers={SECRET_HEADER: secret}) as response:
+        return response.status
+
+
+async def test_webhook_acknowledges_fast_and_handles_concurrently(webhook_bot):
+    bot, stand_in, url, handled = webhook_bot
+    assert stand_in.webhooks[0][0] == "setWebhook"
+
+    async with aiohttp.ClientSession() as session:
+        assert await _post(session, url, _command(1), secret="wrong") == 403
+        started = time.monotonic()
+        statuses = await asyncio.gather(*(_post(session, url, _command(i)) for i in range(8)))
+        acked = time.monotonic() - started
+    assert statuses == [200] * 8
+    assert acked < 0.2
+
+    await asyncio.wait_for(bot.updates.join(), 2)
+    assert sorted(handled) == list(range(8))
+    # Eight 0.2 s handlers on four workers take two rounds
+    assert time.monotonic() - started < 0.6
+
+
+async def test_full_queue_refuses_and_stop_drains(webhook_bot):
+    bot, stand_in, url, handled = webhook_bot
+    async with aiohttp.ClientSession() as session:
+        statuses = [await _post(session, url, _command(i)) for i in range(16)]
+    # Four updates are with the workers and eight fit in the queue
+    assert statuses.count(200) == 12
+    assert statuses.count(503) == 4
+    assert bot.rejected == 4
+
+    await bot.stop()
+    assert len(handled) == 12
+    assert bot.webhook_port is None
+
+
+async def test_server_lifespan_starts_the_bot_and_drains_it_on_exit(monkeypatch):
+    stand_in = BotApiStandIn()
+    await _webhook_settings(monkeypatch, stand_in)
+    monkeypatch.setattr(server.settings, "warm_on_start", False)
+    monkeypatch.setattr(server.settings, "metrics_port", None)
+    monkeypatch.setattr(server.settings, "market_stream", False)
+    monkeypatch.setattr(alert_engine, "_engine", None)
+
+    bots = []
+    handled = []
+    init = TelegramBot.__init__
+
+    def recording_init(self):
+        init(self)
+        bots.append(self)
+
+        async def slow(update, context):
+            await asyncio.sleep(0.2)
+            handled.append(update.update_id)
+
+        self.application.add_handler(CommandHandler("slow", slow))
+
+    monkeypatch.setattr(TelegramBot, "__init__", recording_init)
+
+    try:
+        async with Client(server.app):
+            for _ in range(200):
+                if bots and await bots[0].wait_started():
+                    break
+                await asyncio.sleep(0.01)
+            bot = bots[0]
+            assert stand_in.webhooks[0][0] == "setWebhook"
+            assert alert_engine.get_alert_engine().notify == bot.notify_alert
+
+            url = f"http://127.0.0.1:{bot.webhook_port}/telegram/webhook"
+            async with aiohttp.ClientSession() as session:
+                statuses = [await _post(session, url, _command(i)) for i in range(4)]
+            assert statuses == [200] * 4
+        # Leaving the lifespan stops the bot after its queued updates are handled
+        assert sorted(handled) == list(range(4))
+        assert bot.webhook_port is None
+    finally:
+        await stand_in.close()
@@ -0,0 +1,55 @@
+"""Tests for concurrent wallet balance enrichment."""
+
+import asyncio
+import time
+
+from src.wallets.balances import BalanceService
+
+
+def _wallets(chain, count):
+    return [{"id": f"{chain}_{i}", "chain": chain, "address": f"{chain}-{i}"} for i in range(count)]
+
+
+async def test_enrich_fetches_chains_concurrently_under_a_deadline():
+    calls = {"evm": 0, "solana": 0}
+
+    async def evm(addresses):
+        calls["evm"] += 1
+        await asyncio.sleep(0.05)
+        return [int(a.split("-")[1]) * 10**18 for a in addresses]
+
+    async def solana(addresses):
+        calls["solana"] += 1
+        await asyncio.sleep(0.3)
+        return [10**9] * len(addresses)
+
+    service = BalanceService({"evm": evm, "solana": solana}, ttl=0.5, chunk_size=100, concurrency=32)
+    wallets = _wallets("evm", 1500) + _wallets("solana", 500)
+
+    started = time.monotonic()
+    result = await service.enrich(wallets, deadline=0.15)
+    assert time.monotonic() - started < 0.3
+
+    by_id = {w["id"]: w for w in result}
+    assert by_id["evm_7"]["balance"] == "7" and by_id["evm_7"]["currency"] == "ETH"
+    assert by_id["evm_7"]["balance_status"] == "fresh" and not by_id["evm_7"]["stale"]
+    # Solana missed the deadline: partial result, marked and still fetching
+    assert by_id["solana_3"]["balance_status"] == "pending" and by_id["solana_3"]["balance"] is None
+    assert calls == {"evm": 15, "solana": 5}
+
+    # The background fetch fills the cache; a repeat call makes no new requests
+    await asyncio.sleep(0.3)
+    result = await service.enrich(wallets, deadline=0.15)
+    assert calls == {"evm": 15, "solana": 5}
+    assert {w["balance_status"] for w in result} == {"fresh"}
+    assert result[-1]["balance"] == "1"
+
+    # Once expired, a failing refresh serves the old value marked stale
+    async def failing(addresses):
+        raise RuntimeError("node down")
+
+    service.fetchers["evm"] = failing
+    await asyncio.sleep(0.5)
+    result = await service.enrich(_wallets("evm", 2) + [{"id": "x", "chain": "evm", "address": "new"}])
+    assert result[1]["balance_status"] == "stale" and result[1]["balance"] == "1"
+    assert result[2]["balance_status"] == "error" and result[2]["balance_error"] == "node down"
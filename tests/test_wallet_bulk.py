@@ -0,0 +1,54 @@
+"""Tests for bulk wallet generation in worker processes."""
+
+import asyncio
+import time
+
+from cryptography.fernet import Fernet
+from eth_account import Account
+
+from src.wallets import bulk
+from src.wallets.store import WalletStore
+
+
+async def test_bulk_generation_streams_batches_without_blocking_the_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk.settings, "wallet_gen_workers", 2)
+    store = WalletStore(str(tmp_path / "wallets.db"), Fernet.generate_key().decode())
+    reports = []
+
+    # The loop must keep ticking while keys are generated
+    gaps = []
+
+    async def heartbeat():
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            gaps.append(now - last)
+            last = now
+
+    ticker = asyncio.create_task(heartbeat())
+    try:
+        report = await bulk.create_wallets("evm", 1050, store, batch_size=200,
+                                           progress=reports.append)
+        sol = await bulk.create_wallets("solana", 10, store)
+    finally:
+        ticker.cancel()
+        bulk.shutdown_wallet_executor()
+
+    try:
+        assert report["created"] == 1050
+        assert (report["first_id"], report["last_id"]) == ("evm_1", "evm_1050")
+        # One report per batch, in completion order
+        progress = [r["created"] for r in reports]
+        assert len(progress) == 6 and progress == sorted(progress) and progress[-1] == 1050
+        assert report["wallets_per_second"] > 0
+        assert sol["created"] == 10
+        assert await store.count("evm") == 1050
+
+        # Keys round-trip and match their addresses
+        wallet = await store.get("evm_500")
+        key = await store.private_key("evm_500")
+        assert Account.from_key(key).address == wallet["address"]
+        assert max(gaps) < 0.5
+    finally:
+        store.close()
@@ -0,0 +1,69 @@
+"""Tests for the persistent wallet store."""
+
+import sqlite3
+
+import pytest
+from cryptography.fernet import Fernet
+
+from src.wallets.evm_wallets import EVMWalletManager
+from src.wallets.sol_wallets import SolWalletManager
+from src.wallets.store import WalletStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = WalletStore(str(tmp_path / "wallets.db"), Fernet.generate_key().decode())
+    yield store
+    store.close()
+
+
+async def test_bulk_insert_lookup_and_pagination(store):
+    wallets = [{"address": f"0x{i:040x}", "private_key": f"{i:064x}"} for i in range(250)]
+    stored = await store.add_many("evm", wallets)
+    await store.add("solana", "So11111111111111111111111111111111111111112", "ab" * 32)
+
+    assert stored[0]["id"] == "evm_1" and stored[-1]["id"] == "evm_250"
+    assert await store.count() == 251
+    assert await store.count("evm") == 250
+
+    assert (await store.get("evm_42"))["address"] == f"0x{41:040x}"
+    assert (await store.get_by_address(f"0x{7:040x}"))["id"] == "evm_8"
+    assert await store.get("evm_999") is None
+    assert await store.private_key("evm_3") == f"{2:064x}"
+
+    seen, cursor = [], None
+    while True:
+        page = await store.list("evm", limit=100, cursor=cursor)
+        seen.extend(w["id"] for w in page["wallets"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"evm_{i}" for i in range(1, 251)]
+
+    # Duplicate addresses reject the whole batch
+    with pytest.raises(sqlite3.IntegrityError):
+        await store.add_many("evm", [{"address": "0xnew", "private_key": "00"}, wallets[0]])
+    assert await store.get_by_address("0xnew") is None
+
+
+async def test_keys_are_encrypted_and_store_survives_reopen(tmp_path):
+    path = tmp_path / "wallets.db"
+    store = WalletStore(str(path))
+    manager = SolWalletManager(store)
+    created = await manager.create_wallet()
+    await EVMWalletManager(store).create_wallet()
+    store.close()
+
+    # Closing checkpoints the WAL into the main database file
+    assert created["private_key"].encode() not in path.read_bytes()
+    # The generated key file is reused on reopen
+    assert (tmp_path / "wallets.key").exists()
+
+    reopened = WalletStore(str(path))
+    try:
+        listed = await SolWalletManager(reopened).list_wallets()
+        assert [w["address"] for w in listed] == [created["address"]]
+        assert "private_key" not in listed[0]
+        assert await reopened.private_key(created["id"]) == created["private_key"]
+    finally:
+        reopened.close()